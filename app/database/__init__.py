@@ -1,18 +1,17 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-
-# Create SQLite database engine
-DATABASE_URL = "sqlite:///jobs.db"
-engine = create_engine(DATABASE_URL)
-
-# Create session factory
-SessionFactory = sessionmaker(bind=engine)
-Session = scoped_session(SessionFactory)
+from .engine import get_engine, get_scoped_session
 
 # Initialize the database
 def init_db():
     from .models import Base
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
 def get_session():
-    return Session()
\ No newline at end of file
+    return get_scoped_session()()
+
+def __getattr__(name):
+    # `engine` and `Session` resolve to the shared, Config-driven instances on first use
+    if name == 'engine':
+        return get_engine()
+    if name == 'Session':
+        return get_scoped_session()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,383 @@
+"""Incrementally maintained job and application counts (SQLite).
+
+`job_aggregates` holds one counter per (dimension, key): totals, jobs per
+source, per posting day, per company and per location (keyed by their IDs
+in the lookup tables), per job type and per state, salary sums and counts
+per pay period, and applications per status. Triggers on `jobs` and
+`job_applications` adjust the counters as rows are written, so every
+write path (upserts, ORM, raw SQL) keeps them current and /about or the
+stats API read a handful of rows instead of scanning the table.
+
+Only active jobs are counted, except `total/jobs`. The `distinct`
+dimension tracks how many companies and locations currently have at
+least one active job.
+
+Run `python -m app.database.aggregates` to rebuild the counters from
+scratch (after restoring a backup, or to check for drift).
+"""
+import argparse
+import sys
+import weakref
+from typing import Dict, Any, List
+
+from sqlalchemy import text
+
+AGGREGATE_TABLE = 'job_aggregates'
+
+# Per-job counters: dimension, key expression ({row} is new/old), condition
+JOB_DIMENSIONS = [
+    ('total', "'jobs'", '1'),
+    ('total', "'active'", '{row}.is_active'),
+    ('total', "'us_software'", "{row}.is_active AND {row}.is_us AND {row}.role_family = 'software'"),
+    ('source', "coalesce({row}.source, '')", '{row}.is_active'),
+    ('day', 'date({row}.posted_date)', '{row}.is_active AND {row}.posted_date IS NOT NULL'),
+]
+# Dimensions whose number of non-zero keys is kept under `distinct`
+DISTINCT_DIMENSIONS = ('company', 'location')
+# Counters that stay at zero instead of being removed
+PERMANENT_DIMENSIONS = ('total', 'distinct')
+JOB_COLUMNS = 'source, posted_date, is_active, is_us, role_family'
+
+def _increment(dimension: str, key: str, condition: str, amount: str = '1') -> List[str]:
+    statements = [
+        f"INSERT INTO {AGGREGATE_TABLE}(dimension, key, count) SELECT '{dimension}', {key}, {amount} WHERE {condition} "
+        f"ON CONFLICT(dimension, key) DO UPDATE SET count = count + {amount};"
+    ]
+    if dimension in DISTINCT_DIMENSIONS:
+        statements.append(
+            f"UPDATE {AGGREGATE_TABLE} SET count = count + 1 WHERE dimension = 'distinct' AND key = '{dimension}' "
+            f"AND {condition} AND (SELECT count FROM {AGGREGATE_TABLE} WHERE dimension = '{dimension}' AND key = {key}) = 1;"
+        )
+    return statements
+
+def _decrement(dimension: str, key: str, condition: str, amount: str = '1') -> List[str]:
+    statements = [
+        f"UPDATE {AGGREGATE_TABLE} SET count = count - {amount} WHERE dimension = '{dimension}' AND key = {key} AND {condition};"
+    ]
+    if dimension in DISTINCT_DIMENSIONS:
+        statements.append(
+            f"UPDATE {AGGREGATE_TABLE} SET count = count - 1 WHERE dimension = 'distinct' AND key = '{dimension}' "
+            f"AND {condition} AND (SELECT count FROM {AGGREGATE_TABLE} WHERE dimension = '{dimension}' AND key = {key}) = 0;"
+        )
+    if dimension not in PERMANENT_DIMENSIONS:
+        statements.append(
+            f"DELETE FROM {AGGREGATE_TABLE} WHERE dimension = '{dimension}' AND key = {key} AND count <= 0;"
+        )
+    return statements
+
+def _job_statements(change, row: str) -> str:
+    statements = []
+    for dimension, key, condition in JOB_DIMENSIONS:
+        statements += change(dimension, key.format(row=row), condition.format(row=row))
+    return '\n        '.join(statements)
+
+def _status_statements(change, row: str) -> str:
+    return '\n        '.join(change('status', f"coalesce({row}.status, '')", '1'))
+
+CREATE_STATEMENTS: List[str] = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {AGGREGATE_TABLE} (
+        dimension TEXT NOT NULL,
+        key TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, key)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    INSERT OR IGNORE INTO {AGGREGATE_TABLE}(dimension, key, count) VALUES
+        ('total', 'jobs', 0), ('total', 'active', 0), ('total', 'us_software', 0),
+        ('distinct', 'company', 0), ('distinct', 'location', 0)
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_aggregates_ai AFTER INSERT ON jobs BEGIN
+        {_job_statements(_increment, 'new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_aggregates_ad AFTER DELETE ON jobs BEGIN
+        {_job_statements(_decrement, 'old')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_aggregates_au AFTER UPDATE OF {JOB_COLUMNS} ON jobs BEGIN
+        {_job_statements(_decrement, 'old')}
+        {_job_statements(_increment, 'new')}
+    END
+    """,
+]
+
+# job_applications is created after jobs, so its triggers are registered on that table
+APPLICATION_CREATE_STATEMENTS: List[str] = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS job_applications_aggregates_ai AFTER INSERT ON job_applications BEGIN
+        {_status_statements(_increment, 'new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS job_applications_aggregates_ad AFTER DELETE ON job_applications BEGIN
+        {_status_statements(_decrement, 'old')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS job_applications_aggregates_au AFTER UPDATE OF status ON job_applications BEGIN
+        {_status_statements(_decrement, 'old')}
+        {_status_statements(_increment, 'new')}
+    END
+    """,
+]
+
+DROP_STATEMENTS: List[str] = [
+    "DROP TRIGGER IF EXISTS jobs_aggregates_au",
+    "DROP TRIGGER IF EXISTS jobs_aggregates_ad",
+    "DROP TRIGGER IF EXISTS jobs_aggregates_ai",
+    f"DROP TABLE IF EXISTS {AGGREGATE_TABLE}",
+]
+
+APPLICATION_DROP_STATEMENTS: List[str] = [
+    "DROP TRIGGER IF EXISTS job_applications_aggregates_au",
+    "DROP TRIGGER IF EXISTS job_applications_aggregates_ad",
+    "DROP TRIGGER IF EXISTS job_applications_aggregates_ai",
+]
+
+def _rebuild_job_dimension(dimension: str, key: str, condition: str, amount: str = '1') -> str:
+    total = 'count(*)' if amount == '1' else f"sum({amount.format(row='jobs')})"
+    return f"""
+        INSERT INTO {AGGREGATE_TABLE}(dimension, key, count)
+        SELECT '{dimension}', {key.format(row='jobs')}, {total} FROM jobs
+        WHERE {condition.format(row='jobs')} GROUP BY 2
+        ON CONFLICT(dimension, key) DO UPDATE SET count = count + excluded.count
+    """
+
+RECOUNT_DISTINCT = f"""
+    UPDATE {AGGREGATE_TABLE} SET count = (
+        SELECT count(*) FROM {AGGREGATE_TABLE} AS keys WHERE keys.dimension = {AGGREGATE_TABLE}.key
+    ) WHERE dimension = 'distinct'
+    """
+
+REBUILD_STATEMENTS: List[str] = [
+    f"DELETE FROM {AGGREGATE_TABLE}",
+    CREATE_STATEMENTS[1],
+] + [_rebuild_job_dimension(*dimension) for dimension in JOB_DIMENSIONS] + [
+    RECOUNT_DISTINCT,
+    f"""
+    INSERT INTO {AGGREGATE_TABLE}(dimension, key, count)
+    SELECT 'status', coalesce(status, ''), count(*) FROM job_applications WHERE 1 GROUP BY 2
+    """,
+]
+
+# Near duplicates (see dedup.py) among the us_software jobs, which listing totals
+# subtract. Kept apart from JOB_DIMENSIONS, which migration 0006 rebuilds from
+# before jobs had a canonical_id column.
+DUPLICATE_DIMENSION = (
+    'total', "'us_software_duplicates'",
+    "{row}.is_active AND {row}.is_us AND {row}.role_family = 'software' AND {row}.canonical_id IS NOT NULL"
+)
+DUPLICATE_COLUMNS = 'canonical_id, is_active, is_us, role_family'
+
+def _duplicate_statements(change, row: str) -> str:
+    dimension, key, condition = DUPLICATE_DIMENSION
+    return '\n        '.join(change(dimension, key.format(row=row), condition.format(row=row)))
+
+DUPLICATE_CREATE_STATEMENTS: List[str] = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_duplicates_ai AFTER INSERT ON jobs BEGIN
+        {_duplicate_statements(_increment, 'new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_duplicates_ad AFTER DELETE ON jobs BEGIN
+        {_duplicate_statements(_decrement, 'old')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_duplicates_au AFTER UPDATE OF {DUPLICATE_COLUMNS} ON jobs BEGIN
+        {_duplicate_statements(_decrement, 'old')}
+        {_duplicate_statements(_increment, 'new')}
+    END
+    """,
+]
+
+DUPLICATE_DROP_STATEMENTS: List[str] = [
+    "DROP TRIGGER IF EXISTS jobs_duplicates_au",
+    "DROP TRIGGER IF EXISTS jobs_duplicates_ad",
+    "DROP TRIGGER IF EXISTS jobs_duplicates_ai",
+]
+
+DUPLICATE_REBUILD_STATEMENTS: List[str] = [
+    f"DELETE FROM {AGGREGATE_TABLE} WHERE dimension = 'total' AND key = 'us_software_duplicates'",
+    _rebuild_job_dimension(*DUPLICATE_DIMENSION),
+]
+
+# Per company and per location, keyed by their IDs in the lookup tables (see
+# lookups.py). Apart from JOB_DIMENSIONS for the same reason as duplicates:
+# the ID columns arrived with migration 0009.
+ENCODED_DIMENSIONS = [
+    ('company', 'CAST({row}.company_id AS TEXT)', '{row}.is_active AND {row}.company_id IS NOT NULL'),
+    ('location', 'CAST({row}.location_id AS TEXT)', '{row}.is_active AND {row}.location_id IS NOT NULL'),
+]
+ENCODED_COLUMNS = 'company_id, location_id, is_active'
+
+def _encoded_statements(change, row: str) -> str:
+    statements = []
+    for dimension, key, condition in ENCODED_DIMENSIONS:
+        statements += change(dimension, key.format(row=row), condition.format(row=row))
+    return '\n        '.join(statements)
+
+ENCODED_CREATE_STATEMENTS: List[str] = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_encoded_ai AFTER INSERT ON jobs BEGIN
+        {_encoded_statements(_increment, 'new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_encoded_ad AFTER DELETE ON jobs BEGIN
+        {_encoded_statements(_decrement, 'old')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_encoded_au AFTER UPDATE OF {ENCODED_COLUMNS} ON jobs BEGIN
+        {_encoded_statements(_decrement, 'old')}
+        {_encoded_statements(_increment, 'new')}
+    END
+    """,
+]
+
+ENCODED_DROP_STATEMENTS: List[str] = [
+    "DROP TRIGGER IF EXISTS jobs_encoded_au",
+    "DROP TRIGGER IF EXISTS jobs_encoded_ad",
+    "DROP TRIGGER IF EXISTS jobs_encoded_ai",
+]
+
+ENCODED_REBUILD_STATEMENTS: List[str] = [
+    f"DELETE FROM {AGGREGATE_TABLE} WHERE dimension IN ('company', 'location')",
+] + [_rebuild_job_dimension(*dimension) for dimension in ENCODED_DIMENSIONS] + [RECOUNT_DISTINCT]
+
+# Job statistics (JobRepository.get_job_statistics): per job type and state,
+# and salary sums and counts per pay period, whose averages are sum / count.
+# The `count` column holds the sums too, in whole cents, so adding and
+# subtracting salaries stays exact integer arithmetic. Added by migration
+# 0011; sums are in cents since 0013.
+SALARY = "{row}.is_active AND {row}.salary_period IS NOT NULL AND {row}.salary_%s IS NOT NULL"
+SALARY_CENTS = "CAST(round({row}.salary_%s * 100) AS INTEGER)"
+STATISTICS_DIMENSIONS = [
+    ('job_type', "coalesce({row}.job_type, '')", '{row}.is_active', '1'),
+    ('state', '{row}.state', '{row}.is_active AND {row}.state IS NOT NULL', '1'),
+    ('salary_min_count', '{row}.salary_period', SALARY % 'min', '1'),
+    ('salary_min_sum', '{row}.salary_period', SALARY % 'min', SALARY_CENTS % 'min'),
+    ('salary_max_count', '{row}.salary_period', SALARY % 'max', '1'),
+    ('salary_max_sum', '{row}.salary_period', SALARY % 'max', SALARY_CENTS % 'max'),
+]
+SALARY_DIMENSIONS = [dimension for dimension, *_ in STATISTICS_DIMENSIONS if dimension.startswith('salary_')]
+STATISTICS_COLUMNS = 'is_active, job_type, state, salary_period, salary_min, salary_max'
+
+def _statistics_statements(change, row: str) -> str:
+    statements = []
+    for dimension, key, condition, amount in STATISTICS_DIMENSIONS:
+        statements += change(dimension, key.format(row=row), condition.format(row=row), amount.format(row=row))
+    return '\n        '.join(statements)
+
+STATISTICS_CREATE_STATEMENTS: List[str] = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_statistics_ai AFTER INSERT ON jobs BEGIN
+        {_statistics_statements(_increment, 'new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_statistics_ad AFTER DELETE ON jobs BEGIN
+        {_statistics_statements(_decrement, 'old')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_statistics_au AFTER UPDATE OF {STATISTICS_COLUMNS} ON jobs BEGIN
+        {_statistics_statements(_decrement, 'old')}
+        {_statistics_statements(_increment, 'new')}
+    END
+    """,
+]
+
+STATISTICS_DROP_STATEMENTS: List[str] = [
+    "DROP TRIGGER IF EXISTS jobs_statistics_au",
+    "DROP TRIGGER IF EXISTS jobs_statistics_ad",
+    "DROP TRIGGER IF EXISTS jobs_statistics_ai",
+]
+
+STATISTICS_REBUILD_STATEMENTS: List[str] = [
+    f"DELETE FROM {AGGREGATE_TABLE} WHERE dimension IN "
+    f"({', '.join(repr(dimension[0]) for dimension in STATISTICS_DIMENSIONS)})",
+] + [_rebuild_job_dimension(*dimension) for dimension in STATISTICS_DIMENSIONS]
+
+_available = weakref.WeakKeyDictionary()
+
+def aggregates_available(bind) -> bool:
+    """Whether the bound database maintains job_aggregates (cached per engine)"""
+    engine = getattr(bind, 'engine', bind)
+    if engine.dialect.name != 'sqlite':
+        return False
+    if engine not in _available:
+        with engine.connect() as conn:
+            _available[engine] = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': AGGREGATE_TABLE}
+            ).first() is not None
+    return _available[engine]
+
+def rebuild(connection):
+    """Recompute every counter from the jobs and job_applications tables"""
+    for statement in (REBUILD_STATEMENTS + DUPLICATE_REBUILD_STATEMENTS + ENCODED_REBUILD_STATEMENTS
+                      + STATISTICS_REBUILD_STATEMENTS):
+        connection.exec_driver_sql(statement)
+
+def counts(session, dimension: str, limit: int = None) -> Dict[str, int]:
+    """Counters for one dimension, largest first"""
+    query = f"SELECT key, count FROM {AGGREGATE_TABLE} WHERE dimension = :dimension ORDER BY count DESC"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    return {key: count for key, count in session.execute(text(query), {'dimension': dimension})}
+
+def counter(session, dimension: str, key: str) -> int:
+    """A single counter (0 if it has never been set)"""
+    value = session.execute(
+        text(f"SELECT count FROM {AGGREGATE_TABLE} WHERE dimension = :dimension AND key = :key"),
+        {'dimension': dimension, 'key': key}
+    ).scalar()
+    return value or 0
+
+def listed_total(session) -> int:
+    """Jobs the web listing shows: us_software less the near duplicates it hides"""
+    return counter(session, 'total', 'us_software') - counter(session, 'total', 'us_software_duplicates')
+
+def salaries(session, period: str) -> Dict[str, float]:
+    """Salary sums and counts (salary_min_sum, salary_min_count, ...) of active jobs paid per `period`"""
+    rows = session.execute(
+        text(f"SELECT dimension, count FROM {AGGREGATE_TABLE} WHERE dimension IN "
+             f"({', '.join(map(repr, SALARY_DIMENSIONS))}) AND key = :period"),
+        {'period': period}
+    )
+    return {dimension: value / 100 if dimension.endswith('_sum') else value for dimension, value in rows}
+
+def days(session, since: str) -> Dict[str, int]:
+    """Active jobs per posting day from `since` (YYYY-MM-DD) on, oldest first"""
+    rows = session.execute(
+        text(f"SELECT key, count FROM {AGGREGATE_TABLE} WHERE dimension = 'day' AND key >= :since ORDER BY key"),
+        {'since': since}
+    )
+    return {key: count for key, count in rows}
+
+def main(argv=None) -> int:
+    from .engine import get_engine
+
+    parser = argparse.ArgumentParser(description='Rebuild the job_aggregates counters')
+    parser.parse_args(argv)
+
+    engine = get_engine()
+    if not aggregates_available(engine):
+        print(f"{AGGREGATE_TABLE} does not exist; run `alembic upgrade head` first")
+        return 1
+    with engine.begin() as conn:
+        rebuild(conn)
+        rows = conn.exec_driver_sql(f"SELECT count(*) FROM {AGGREGATE_TABLE}").scalar()
+    print(f"Rebuilt {rows} counters")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
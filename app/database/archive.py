@@ -0,0 +1,194 @@
+"""Hot/cold tiering: move old postings out of the jobs table.
+
+Listings only show recent postings, but every scan, index and the /about
+counters still pay for years of expired ones. Postings older than
+ARCHIVE_AFTER_DAYS that no JobApplication refers to are moved to a cold
+archive: a separate SQLite file next to the database (`jobs.db` ->
+`jobs_archive.db`) with the same `jobs` schema, full-text index included,
+so the same repository code can query it. The full-text index is then
+merged and freed pages are returned to the filesystem with an incremental
+VACUUM, keeping the hot file small enough to stay in cache.
+
+Queries opt in to the archive (see JobRepository.search/get_by_id with
+`include_archive=True`). Archived rows keep their IDs, and the newest job is
+never archived, so SQLite can't hand an archived ID out again.
+
+Run `python -m app.database.archive` to archive now; `--vacuum` runs a
+one-off full VACUUM, which also switches databases created before the
+auto_vacuum pragma to incremental mode.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from sqlalchemy import select, func, exists, text, bindparam
+from sqlalchemy.orm import Session
+
+from config.config import Config
+from .cache_store import bump_data_version
+from .engine import get_engine
+from .models import Base, Job, JobApplication, DescriptionDictionary, Company, CompanyAlias, Location
+from . import fts, dedup
+
+ARCHIVE_SCHEMA = 'archive'
+# Archived rows keep their company_id/location_id, so the archive gets a copy of these
+LOOKUP_TABLES = (Company, CompanyAlias, Location)
+
+def archive_path(db_path: str) -> str:
+    """The archive file that goes with a database file"""
+    root, ext = os.path.splitext(db_path)
+    return f"{root}_archive{ext or '.db'}"
+
+def archive_uri(bind) -> Optional[str]:
+    """SQLAlchemy URI of the archive for a file-based SQLite engine (None otherwise)"""
+    engine = getattr(bind, 'engine', bind)
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return None
+    return f"sqlite:///{archive_path(os.path.abspath(engine.url.database))}"
+
+def archive_session(bind) -> Optional[Session]:
+    """A new session on the archive next to `bind`'s database, or None if there is none yet"""
+    uri = archive_uri(bind)
+    if uri is None or not os.path.exists(uri[len('sqlite:///'):]):
+        return None
+    return Session(bind=get_engine(uri))
+
+def _ensure_schema(archive_engine):
+    """Create the archive's tables, and add columns the hot jobs table gained since"""
+    Base.metadata.create_all(archive_engine, tables=[Job.__table__, DescriptionDictionary.__table__] +
+                             [table.__table__ for table in LOOKUP_TABLES])
+    with archive_engine.begin() as conn:
+        existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(jobs)")}
+        for column in Job.__table__.columns:
+            if column.name not in existing:
+                conn.exec_driver_sql(
+                    f"ALTER TABLE jobs ADD COLUMN {column.name} {column.type.compile(dialect=archive_engine.dialect)}"
+                )
+
+def incremental_vacuum(engine, pages: int = 0) -> Dict[str, Any]:
+    """Release up to `pages` free pages (0 = all) back to the filesystem
+
+    Only works once the database is in auto_vacuum=INCREMENTAL mode.
+    """
+    with engine.connect() as conn:
+        mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        free_before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        if mode != 2:
+            logging.warning("auto_vacuum is not INCREMENTAL; run `python -m app.database.archive --vacuum` once")
+        else:
+            # Each freed page is a result row, and sqlite3's execute() stops at
+            # the first row of a statement without columns; executescript() doesn't
+            conn.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({pages})")
+        conn.commit()
+        free_after = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+        page_count = conn.exec_driver_sql("PRAGMA page_count").scalar()
+    return {
+        'auto_vacuum': mode,
+        'freed_pages': free_before - free_after,
+        'database_bytes': page_size * page_count
+    }
+
+def full_vacuum(engine):
+    """Rebuild the database file (applies a changed auto_vacuum mode)"""
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"PRAGMA auto_vacuum = {Config.SQLITE_AUTO_VACUUM}")
+        conn.exec_driver_sql("VACUUM")
+
+def archive_jobs(engine, older_than_days: int = None, batch_size: int = None, vacuum: bool = True) -> Dict[str, Any]:
+    """Move old, unreferenced jobs into the archive; returns counts and timings
+
+    Each batch is copied and deleted in one transaction. With WAL a crash can
+    still commit the copy without the delete; the next run replaces the
+    archived copy, so nothing is lost or duplicated.
+    """
+    started = time.perf_counter()
+    older_than_days = Config.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or Config.ARCHIVE_BATCH_SIZE
+    uri = archive_uri(engine)
+    if uri is None:
+        raise ValueError("Archiving needs a file-based SQLite database")
+    _ensure_schema(get_engine(uri))
+
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    candidates = select(Job.id)\
+        .where(Job.posted_date < cutoff)\
+        .where(Job.id < select(func.max(Job.id)).scalar_subquery())\
+        .where(~exists().where(JobApplication.job_id == Job.id))\
+        .limit(batch_size)
+    columns = ', '.join(column.name for column in Job.__table__.columns)
+    ids = bindparam('ids', expanding=True)
+    # Drop an older archived copy of the same posting (or of this row) first so triggers stay in step
+    clear = text(f"DELETE FROM {ARCHIVE_SCHEMA}.jobs WHERE id IN :ids "
+                 f"OR job_key IN (SELECT job_key FROM main.jobs WHERE id IN :ids)").bindparams(ids)
+    copy = text(f"INSERT INTO {ARCHIVE_SCHEMA}.jobs ({columns}) "
+                f"SELECT {columns} FROM main.jobs WHERE id IN :ids").bindparams(ids)
+    delete = text("DELETE FROM main.jobs WHERE id IN :ids").bindparams(ids)
+    # Near duplicates of an archived job are re-pointed at the oldest of them that is left
+    orphans = text("SELECT canonical_id, min(id) FROM main.jobs WHERE canonical_id IN :ids "
+                   "GROUP BY canonical_id").bindparams(ids)
+    relink = text("UPDATE main.jobs SET canonical_id = nullif(:new, id) WHERE canonical_id = :old")
+
+    archived = batches = 0
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (uri[len('sqlite:///'):],))
+        conn.commit()
+        try:
+            # Archived descriptions stay compressed, so they need their dictionaries
+            with conn.begin():
+                conn.exec_driver_sql(f"INSERT OR IGNORE INTO {ARCHIVE_SCHEMA}.{DescriptionDictionary.__tablename__} "
+                                     f"SELECT * FROM main.{DescriptionDictionary.__tablename__}")
+                for table in LOOKUP_TABLES:
+                    conn.exec_driver_sql(f"INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.{table.__tablename__} "
+                                         f"SELECT * FROM main.{table.__tablename__}")
+            while True:
+                with conn.begin():
+                    batch = list(conn.execute(candidates).scalars())
+                    if not batch:
+                        break
+                    conn.execute(clear, {'ids': batch})
+                    conn.execute(copy, {'ids': batch})
+                    conn.execute(delete, {'ids': batch})
+                    promoted = [{'old': old, 'new': new} for old, new in conn.execute(orphans, {'ids': batch})]
+                    if promoted:
+                        conn.execute(relink, promoted)
+                    dedup.forget(conn, batch)
+                archived += len(batch)
+                batches += 1
+        finally:
+            conn.exec_driver_sql(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+            conn.commit()
+
+    result = {'archived': archived, 'batches': batches, 'cutoff': cutoff.isoformat()}
+    if archived:
+        bump_data_version()
+    if vacuum and archived:
+        if fts.fts_available(engine):
+            with engine.begin() as conn:
+                fts.optimize(conn)
+        result.update(incremental_vacuum(engine))
+    result['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    logging.info(f"Archived {archived} jobs posted before {cutoff:%Y-%m-%d}: {result}")
+    return result
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Move old job postings into the archive database')
+    parser.add_argument('--days', type=int, default=Config.ARCHIVE_AFTER_DAYS, help='archive jobs posted more than this many days ago')
+    parser.add_argument('--batch-size', type=int, default=Config.ARCHIVE_BATCH_SIZE)
+    parser.add_argument('--vacuum', action='store_true', help='run a full VACUUM afterwards (switches on incremental auto_vacuum)')
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    result = archive_jobs(engine, older_than_days=args.days, batch_size=args.batch_size)
+    print(f"Archived {result['archived']} jobs in {result['duration_ms']}ms")
+    if args.vacuum:
+        full_vacuum(engine)
+        print("Vacuumed database")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
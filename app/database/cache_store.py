@@ -0,0 +1,300 @@
+"""Cross-process result store for the web cache, and the global data version.
+
+Under gunicorn each worker is a separate process, so a per-process cache
+fills once per worker and the scheduler's writes can't reach it. These
+stores are shared by every process on the host (SQLiteCacheStore, a WAL
+file read through mmap) or on the network (RedisCacheStore, any client
+with the redis-py interface). They hold opaque bytes with a TTL; the web
+tier pickles results into them (see app/web/cache.py).
+
+The data version is a counter in the same store. The ingest queue bumps it
+after every batch that inserted or updated jobs, as do snapshot publishing
+and archiving; the web cache puts it in every key, so
+results computed before a bump are never served again and simply age out.
+Application status changes bump a second counter, and every bump records
+its time, so the web tier can answer conditional requests from these
+counters alone (see app/web/conditional.py).
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config.config import Config
+
+DATA_VERSION = 'data_version'
+APPLICATIONS_VERSION = 'applications_version'
+DATA_MODIFIED = 'data_modified'  # unix time of the last bump of either version
+STATE = (DATA_VERSION, APPLICATIONS_VERSION, DATA_MODIFIED)
+
+class SQLiteCacheStore:
+    """Entries in a SQLite file shared by every process on the host
+
+    Reads are a primary-key lookup on a memory-mapped WAL database. Writes
+    keep a running byte total and, once it passes `max_bytes`, drop the
+    entries closest to expiry (expired ones first) in the same transaction;
+    reads don't write, so eviction is by expiry rather than by recency.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, busy_timeout: float = 5.0,
+                 mmap_size: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_expires ON cache_entries (expires)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection (sqlite3 connections are not shared across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        """The stored bytes, or None if absent or expired"""
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl_seconds: float):
+        """Store bytes for `ttl_seconds`, evicting to stay within max_bytes"""
+        if len(value) > self.max_bytes:
+            return
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            previous = conn.execute("SELECT size FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO cache_entries (key, value, expires, size) VALUES (?, ?, ?, ?)",
+                         (key, value, time.time() + ttl_seconds, len(value)))
+            total = self._add(conn, 'bytes', len(value) - (previous[0] if previous else 0))
+            while total > self.max_bytes:
+                victims = conn.execute(
+                    "SELECT key, size FROM cache_entries WHERE key != ? ORDER BY expires LIMIT 64", (key,)
+                ).fetchall()
+                if not victims:
+                    break
+                conn.executemany("DELETE FROM cache_entries WHERE key = ?", [(victim,) for victim, _ in victims])
+                total = self._add(conn, 'bytes', -sum(size for _, size in victims))
+                self._add(conn, 'evictions', len(victims))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def delete(self, key: str):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute("DELETE FROM cache_entries WHERE key = ? RETURNING size", (key,)).fetchone()
+            if row:
+                self._add(conn, 'bytes', -row[0])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def clear(self):
+        """Delete every entry (counters, the data version included, are kept)"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("DELETE FROM cache_counters WHERE name = 'bytes'")
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _add(self, conn: sqlite3.Connection, name: str, amount: int) -> int:
+        return conn.execute(
+            "INSERT INTO cache_counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value RETURNING value",
+            (name, amount)
+        ).fetchone()[0]
+
+    def incr(self, name: str) -> int:
+        """Atomically increment a counter, returning the new value"""
+        return self._add(self._connection(), name, 1)
+
+    def bump(self, name: str) -> int:
+        """Increment a version counter and stamp DATA_MODIFIED with the time, atomically"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = self._add(conn, name, 1)
+            conn.execute("INSERT OR REPLACE INTO cache_counters (name, value) VALUES (?, ?)",
+                         (DATA_MODIFIED, int(time.time())))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return version
+
+    def counter(self, name: str) -> int:
+        row = self._connection().execute("SELECT value FROM cache_counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def counters(self, names) -> Dict[str, int]:
+        """Several counters read together (missing ones are 0)"""
+        rows = self._connection().execute(
+            f"SELECT name, value FROM cache_counters WHERE name IN ({', '.join('?' * len(names))})", tuple(names)
+        )
+        values = dict(rows)
+        return {name: values.get(name, 0) for name in names}
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connection()
+        counters = dict(conn.execute("SELECT name, value FROM cache_counters"))
+        return {
+            'backend': self.name,
+            'entries': conn.execute("SELECT count(*) FROM cache_entries").fetchone()[0],
+            'bytes': counters.get('bytes', 0),
+            'max_bytes': self.max_bytes,
+            'evictions': counters.get('evictions', 0),
+            **{name: counters.get(name, 0) for name in STATE}
+        }
+
+class RedisCacheStore:
+    """Entries in Redis (or anything speaking its protocol), shared across hosts
+
+    Takes any client with the redis-py methods get/mget/set(px=)/delete/
+    incr/scan_iter/pipeline. Keys are prefixed so several deployments can share a
+    server; bound its memory with the server's maxmemory and an
+    allkeys-lru or volatile-lru policy.
+    """
+
+    name = 'redis'
+
+    def __init__(self, client, prefix: str = 'jobs:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = 'jobs:') -> 'RedisCacheStore':
+        """Connect with redis-py, which is only needed for this backend"""
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("WEB_CACHE_BACKEND=redis needs the redis package (pip install redis)") from e
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float):
+        self.client.set(self.prefix + key, value, px=max(1, int(ttl_seconds * 1000)))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        """Delete every entry under the prefix (the version counters are kept)"""
+        keep = {(self.prefix + name).encode() for name in STATE}
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            if (key.encode() if isinstance(key, str) else key) not in keep:
+                self.client.delete(key)
+
+    def incr(self, name: str) -> int:
+        return int(self.client.incr(self.prefix + name))
+
+    def bump(self, name: str) -> int:
+        """Increment a version counter and stamp DATA_MODIFIED with the time, in one MULTI/EXEC"""
+        pipe = self.client.pipeline()
+        pipe.incr(self.prefix + name)
+        pipe.set(self.prefix + DATA_MODIFIED, int(time.time()))
+        return int(pipe.execute()[0])
+
+    def counter(self, name: str) -> int:
+        return int(self.client.get(self.prefix + name) or 0)
+
+    def counters(self, names) -> Dict[str, int]:
+        values = self.client.mget([self.prefix + name for name in names])
+        return {name: int(value or 0) for name, value in zip(names, values)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'prefix': self.prefix, **self.counters(STATE)}
+
+def create_store(name: str = None, path: str = None, url: str = None, max_bytes: int = None):
+    """Build the shared store selected in Config
+
+    'memory' keeps results per process (see app/web/cache.py) but still
+    shares the data version through the SQLite store.
+    """
+    name = (name or Config.WEB_CACHE_BACKEND).lower()
+    if name in ('sqlite', 'memory'):
+        return SQLiteCacheStore(path or Config.WEB_CACHE_PATH,
+                                max_bytes or int(Config.WEB_CACHE_MAX_MB * 1024 * 1024))
+    if name == 'redis':
+        return RedisCacheStore.from_url(url or Config.WEB_CACHE_REDIS_URL)
+    raise ValueError(f"Unknown web cache backend: {name}")
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """The process-wide store from Config, created on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_store()
+    return _store
+
+def data_version(store=None) -> Optional[int]:
+    """The current data version (None if the store is unreachable)"""
+    try:
+        return (store or get_store()).counter(DATA_VERSION)
+    except Exception as e:
+        logging.debug(f"Could not read the web cache data version: {e}")
+        return None
+
+def data_state(store=None) -> Optional[Dict[str, int]]:
+    """Both versions and the time of the last bump, read together (None if the store is unreachable)"""
+    try:
+        return (store or get_store()).counters(STATE)
+    except Exception as e:
+        logging.debug(f"Could not read the web cache data state: {e}")
+        return None
+
+def bump_data_version(store=None, name: str = DATA_VERSION) -> Optional[int]:
+    """Mark every cached result as stale; returns the new version (None if the store is unreachable)
+
+    Called after writes, so a failure is logged rather than raised: the
+    data is already committed, and cached results still expire by TTL.
+    Pass name=APPLICATIONS_VERSION after application changes, which only
+    affect HTTP validators, not cached query results.
+    """
+    try:
+        return (store or get_store()).bump(name)
+    except Exception as e:
+        logging.warning(f"Could not bump the web cache {name}: {e}")
+        return None
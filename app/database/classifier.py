@@ -0,0 +1,92 @@
+"""Classify postings once at ingest instead of matching text on every request.
+
+The web tier only shows US software engineering jobs. Deciding that with
+`location ILIKE '%United States%' AND (title ILIKE ... OR ...)` means several
+wildcard scans per row per request, so the answer is computed here from the
+title and location and stored in indexed columns (`is_us`, `role_family`,
+`is_remote`).
+
+Run `python -m app.database.classifier` to classify rows that predate the
+columns, or with `--all` to reclassify everything after changing the
+keyword lists below.
+"""
+import argparse
+import re
+import sys
+from typing import Dict, Any, Optional, List
+
+SOFTWARE_JOB_KEYWORDS = [
+    'software engineer',
+    'software developer',
+    'full stack developer',
+    'backend engineer',
+    'java developer'
+]
+
+# Checked in order; the first family with a matching title phrase wins
+ROLE_FAMILIES: Dict[str, List[str]] = {
+    'software': SOFTWARE_JOB_KEYWORDS,
+    'data': ['data engineer', 'data scientist', 'machine learning engineer', 'ml engineer'],
+    'devops': ['devops engineer', 'site reliability engineer', 'platform engineer', 'cloud engineer'],
+}
+OTHER_FAMILY = 'other'
+
+US_LOCATION_KEYWORDS = ['united states']
+REMOTE_KEYWORDS = ['remote', 'work from home']
+
+CLASSIFICATION_FIELDS = ('is_us', 'role_family', 'is_remote')
+
+def _phrase_pattern(phrases: List[str]) -> str:
+    # Longest first so overlapping phrases resolve to the most specific one
+    return '|'.join(re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True))
+
+# One alternation per question: each title/location is scanned once, with a
+# named group telling which family matched
+FAMILY_PATTERN = re.compile(
+    '|'.join(f'(?P<{family}>{_phrase_pattern(phrases)})' for family, phrases in ROLE_FAMILIES.items()),
+    re.IGNORECASE
+)
+US_PATTERN = re.compile(_phrase_pattern(US_LOCATION_KEYWORDS), re.IGNORECASE)
+REMOTE_PATTERN = re.compile(_phrase_pattern(REMOTE_KEYWORDS), re.IGNORECASE)
+
+def role_family(title: Optional[str]) -> str:
+    """Role family of a job title, or 'other' if it matches none"""
+    if not title:
+        return OTHER_FAMILY
+    matched = {match.lastgroup for match in FAMILY_PATTERN.finditer(title)}
+    for family in ROLE_FAMILIES:
+        if family in matched:
+            return family
+    return OTHER_FAMILY
+
+def classify(title: Optional[str], location: Optional[str]) -> Dict[str, Any]:
+    """Classification columns for a posting
+
+    `is_us` is None when the location is unknown, so a re-scrape without a
+    location keeps the stored value.
+    """
+    return {
+        'is_us': bool(US_PATTERN.search(location)) if location is not None else None,
+        'role_family': role_family(title),
+        'is_remote': bool(REMOTE_PATTERN.search(f"{title or ''} {location or ''}"))
+    }
+
+def main(argv=None) -> int:
+    from . import get_session
+    from .repository import JobRepository
+
+    parser = argparse.ArgumentParser(description='Backfill job classification columns')
+    parser.add_argument('--all', action='store_true', help='reclassify every job, not just unclassified ones')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    session = get_session()
+    try:
+        counts = JobRepository(session).backfill_classification(batch_size=args.batch_size, reclassify=args.all)
+    finally:
+        session.close()
+    print(f"Classified {counts['updated']} jobs")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
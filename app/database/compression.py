@@ -0,0 +1,262 @@
+"""Compressed storage for job descriptions.
+
+Descriptions are most of a row's bytes, and much of each one is boilerplate
+shared with thousands of other postings (benefits, EEO statements, "about
+us"). They are stored as raw DEFLATE with a preset dictionary trained on our
+own corpus, which catches that shared text even in short descriptions.
+
+On SQLite the work happens in two SQL functions registered on every
+connection, so all write paths (ORM, upserts, archive copies) and the FTS
+triggers agree on the format:
+
+    job_compress(text) -> blob   compress with the newest dictionary
+    job_text(value)    -> text   decompress; plain text passes through
+
+Connections opened outside SQLAlchemy (the sqlite3 shell, scripts using
+the sqlite3 module) don't have them, and the FTS triggers need job_text()
+to index a row: such clients can read, but writes that fire the triggers
+fail until register_functions() is called on the connection.
+
+A compressed value is `b'Z'`, the 4-byte ID of its row in
+`description_dictionaries`, then the DEFLATE stream. Dictionaries are never
+changed or deleted, so every value stays readable after retraining. Values
+stored before compression was enabled remain plain text until
+`python -m app.database.compression compress` rewrites them.
+"""
+import argparse
+import hashlib
+import logging
+import re
+import sqlite3
+import struct
+import sys
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, text, Text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+DICTIONARY_TABLE = 'description_dictionaries'
+MAGIC = b'Z'
+HEADER = struct.Struct('>cI')
+DICTIONARY_SIZE = 32 * 1024  # DEFLATE's window; a longer dictionary is never used
+MIN_LENGTH = 64  # shorter texts are stored as they are
+LEVEL = 6
+# Key of job_compress()'s cached newest dictionary in the pooled connection's info
+NEWEST_DICTIONARY = 'newest_description_dictionary'
+
+SEGMENT = re.compile(r'[^.!?\n]+[.!?\n]?')
+
+def compress(text: Optional[str], dictionary_id: int = 0, dictionary: bytes = b'') -> Optional[object]:
+    """Compressed blob for `text`, or `text` itself when compression doesn't pay"""
+    if text is None or not isinstance(text, str) or len(text) < MIN_LENGTH:
+        return text
+    if dictionary:
+        compressor = zlib.compressobj(LEVEL, zlib.DEFLATED, -15, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(LEVEL, zlib.DEFLATED, -15)
+    data = HEADER.pack(MAGIC, dictionary_id) + compressor.compress(text.encode('utf-8')) + compressor.flush()
+    return data if len(data) < len(text) else text
+
+def digest(text: Optional[str]) -> Optional[bytes]:
+    """Short hash of a description, compared instead of the stored text (which would need decompressing)"""
+    if text is None:
+        return None
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+def decompress(value, dictionaries: Dict[int, bytes]) -> Optional[str]:
+    """Text of a stored description; `dictionaries` maps IDs to dictionary bytes"""
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value[:1] != MAGIC:
+        return value.decode('utf-8')
+    _, dictionary_id = HEADER.unpack_from(value)
+    if dictionary_id:
+        decompressor = zlib.decompressobj(-15, zdict=dictionaries[dictionary_id])
+    else:
+        decompressor = zlib.decompressobj(-15)
+    return (decompressor.decompress(value[HEADER.size:]) + decompressor.flush()).decode('utf-8')
+
+def train_dictionary(samples: Iterable[str], size: int = DICTIONARY_SIZE) -> bytes:
+    """Build a preset dictionary from sentences that recur across descriptions
+
+    Sentences are ranked by the bytes they would save (length times the
+    number of descriptions containing them). DEFLATE reaches the end of the
+    dictionary most cheaply, so the best ones go last.
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update({segment.strip() for segment in SEGMENT.findall(sample or '') if len(segment.strip()) >= 20})
+    ranked = sorted(
+        ((segment, count) for segment, count in counts.items() if count > 1),
+        key=lambda item: len(item[0]) * item[1],
+        reverse=True
+    )
+    chosen, used = [], 0
+    for segment, _ in ranked:
+        encoded = segment.encode('utf-8') + b' '
+        if used + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        used += len(encoded)
+    return b''.join(reversed(chosen))
+
+def register_functions(dbapi_connection, info: Optional[dict] = None):
+    """Register job_compress()/job_text() on a sqlite3 connection, bound to its dictionary table"""
+    dictionaries: Dict[int, bytes] = {}
+
+    def load(dictionary_id: int) -> bytes:
+        if dictionary_id not in dictionaries:
+            row = dbapi_connection.execute(
+                f"SELECT data FROM {DICTIONARY_TABLE} WHERE id = ?", (dictionary_id,)
+            ).fetchone()
+            if row is None:
+                raise LookupError(f"Description dictionary {dictionary_id} is missing")
+            dictionaries[dictionary_id] = bytes(row[0])
+        return dictionaries[dictionary_id]
+
+    # The newest dictionary's ID, as of the database's data_version when it was read
+    current = {'version': None, 'id': 0}
+    if info is not None:
+        info[NEWEST_DICTIONARY] = current
+
+    def newest() -> int:
+        """The newest dictionary, re-read only after another connection has committed
+
+        data_version doesn't change for this connection's own commits, so
+        code that adds a dictionary calls forget_newest_dictionary().
+        """
+        version = dbapi_connection.execute("PRAGMA data_version").fetchone()[0]
+        if version != current['version']:
+            try:
+                row = dbapi_connection.execute(f"SELECT max(id) FROM {DICTIONARY_TABLE}").fetchone()
+            except sqlite3.OperationalError:
+                row = None  # table not created yet
+            current.update(version=version, id=row[0] if row and row[0] else 0)
+        return current['id']
+
+    def job_compress(text):
+        if text is None or not isinstance(text, str) or len(text) < MIN_LENGTH:
+            return text
+        dictionary_id = newest()
+        return compress(text, dictionary_id, load(dictionary_id) if dictionary_id else b'')
+
+    def job_text(value):
+        if isinstance(value, bytes) and value[:1] == MAGIC:
+            dictionary_id = HEADER.unpack_from(value)[1]
+            if dictionary_id:
+                load(dictionary_id)
+        return decompress(value, dictionaries)
+
+    dbapi_connection.create_function('job_compress', 1, job_compress)
+    dbapi_connection.create_function('job_text', 1, job_text, deterministic=True)
+
+@event.listens_for(Engine, 'connect')
+def register_sqlite_functions(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        register_functions(dbapi_connection, connection_record.info if connection_record is not None else None)
+
+def forget_newest_dictionary(connection):
+    """Make job_compress() on this connection look up the newest dictionary again (after adding one)"""
+    current = connection.info.get(NEWEST_DICTIONARY)
+    if current is not None:
+        current['version'] = None
+
+class compressed(FunctionElement):
+    """job_compress(value) on SQLite; the value unchanged elsewhere"""
+    type = Text()
+    inherit_cache = True
+
+class decompressed(FunctionElement):
+    """job_text(value) on SQLite; the value unchanged elsewhere"""
+    type = Text()
+    inherit_cache = True
+
+@compiles(compressed)
+@compiles(decompressed)
+def _passthrough(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+@compiles(compressed, 'sqlite')
+def _compress_sqlite(element, compiler, **kw):
+    return f"job_compress({compiler.process(element.clauses, **kw)})"
+
+@compiles(decompressed, 'sqlite')
+def _decompress_sqlite(element, compiler, **kw):
+    return f"job_text({compiler.process(element.clauses, **kw)})"
+
+class CompressedText(TypeDecorator):
+    """Text column stored compressed on SQLite, read back as text"""
+    impl = Text
+    cache_ok = True
+
+    def bind_expression(self, bindvalue):
+        return compressed(bindvalue)
+
+    def column_expression(self, column):
+        return decompressed(column)
+
+def compress_stored(engine, batch_size: int = 1000) -> int:
+    """Compress descriptions stored as plain text (rows written before compression); returns the count"""
+    updated, last_id = 0, 0
+    while True:
+        with engine.begin() as conn:
+            ids = conn.execute(text(
+                "SELECT id FROM jobs WHERE id > :after AND typeof(description) = 'text' "
+                "AND length(description) >= :min ORDER BY id LIMIT :limit"
+            ), {'after': last_id, 'min': MIN_LENGTH, 'limit': batch_size}).scalars().all()
+            if not ids:
+                return updated
+            conn.execute(text(
+                f"UPDATE jobs SET description = job_compress(description) WHERE id IN ({','.join(map(str, ids))})"
+            ))
+        last_id = ids[-1]
+        updated += len(ids)
+
+def train(engine, samples: int = 5000) -> int:
+    """Train a dictionary on the newest descriptions and make it current; returns its ID (0 if none)"""
+    from .models import DescriptionDictionary
+
+    with engine.begin() as conn:
+        texts = conn.execute(text(
+            "SELECT job_text(description) FROM jobs WHERE description IS NOT NULL ORDER BY id DESC LIMIT :limit"
+        ), {'limit': samples}).scalars().all()
+        dictionary = train_dictionary(texts)
+        if not dictionary:
+            return 0
+        result = conn.execute(DescriptionDictionary.__table__.insert().values(data=dictionary, sample_size=len(texts)))
+        forget_newest_dictionary(conn)
+    logging.info(f"Trained a {len(dictionary)} byte description dictionary from {len(texts)} descriptions")
+    return result.inserted_primary_key[0]
+
+def main(argv=None) -> int:
+    from .engine import get_engine
+
+    parser = argparse.ArgumentParser(description='Train the description dictionary and compress stored descriptions')
+    commands = parser.add_subparsers(dest='command', required=True)
+    train_command = commands.add_parser('train', help='train a new dictionary from a sample of descriptions')
+    train_command.add_argument('--samples', type=int, default=5000)
+    compress_command = commands.add_parser('compress', help='rewrite descriptions still stored as plain text')
+    compress_command.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if args.command == 'train':
+        dictionary_id = train(engine, samples=args.samples)
+        if not dictionary_id:
+            print("Not enough repeated text to train a dictionary")
+            return 1
+        print(f"Trained dictionary {dictionary_id}; new descriptions use it from now on")
+        return 0
+
+    updated = compress_stored(engine, batch_size=args.batch_size)
+    print(f"Compressed {updated} descriptions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,51 @@
+from flask import current_app, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import inspect
+from sqlalchemy.sql import Select, TextClause
+from sqlalchemy.sql.util import find_tables
 
-# Initialize SQLAlchemy instance
-db = SQLAlchemy()
\ No newline at end of file
+from .engine import get_engine
+from .models import Base
+from .snapshots import LIVE_TABLES
+
+class SnapshotRoutingSession(Session):
+    """Session that serves reads in GET/HEAD requests from the app's read snapshot
+
+    Active when the app has a SnapshotReader in `app.extensions['snapshots']`
+    (WEB_SNAPSHOTS). The snapshot is picked once per request, so a request
+    never mixes two; writes, flushes and LIVE_TABLES go to the live database.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_snapshot(mapper, clause):
+            if 'snapshot' not in self.info:
+                self.info['snapshot'] = current_app.extensions['snapshots'].engine()
+            if self.info['snapshot'] is not None:
+                return self.info['snapshot']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_snapshot(self, mapper, clause) -> bool:
+        if not has_request_context() or request.method not in ('GET', 'HEAD') or self._flushing:
+            return False
+        if current_app.extensions.get('snapshots') is None:
+            return False
+        if clause is not None and not isinstance(clause, (Select, TextClause)):
+            return False
+        tables = find_tables(clause, include_joins=True) if clause is not None else []
+        if mapper is not None:
+            tables.append(inspect(mapper).local_table)
+        return not any(table.name in LIVE_TABLES for table in tables if hasattr(table, 'name'))
+
+def start_snapshot_request():
+    """Let the next read pick up the newest snapshot (before_request hook)"""
+    db.session.info.pop('snapshot', None)
+
+class SharedEngineSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy extension that reuses the process-wide pooled engine"""
+
+    def _make_engine(self, bind_key, options, app):
+        return get_engine(options['url'])
+
+# Initialize SQLAlchemy instance on the shared models
+db = SharedEngineSQLAlchemy(model_class=Base, session_options={'class_': SnapshotRoutingSession})
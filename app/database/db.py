@@ -1,14 +1,12 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 import os
-from datetime import datetime
-import shutil
-from pathlib import Path
-from typing import Optional
+from typing import Dict, Any
 
-from .database_init import db
+from config.config import Config
+from .backup import create_backup
+from .engine import get_engine, get_scoped_session
+from .models import Base
 
 class Database:
     def __init__(self, db_uri: str, db_path: str):
@@ -21,12 +19,9 @@ class Database:
         self.db_path = db_path
         self._ensure_data_directory()
         
-        # Use the configured SQLAlchemy URI
-        self.engine = create_engine(db_uri, echo=False)
-        
-        # Create session factory
-        session_factory = sessionmaker(bind=self.engine)
-        self.Session = scoped_session(session_factory)
+        # Reuse the process-wide engine and session registry for this URI
+        self.engine = get_engine(db_uri)
+        self.Session = get_scoped_session(db_uri)
 
     def _ensure_data_directory(self):
         """Ensure the database directory exists"""
@@ -35,7 +30,7 @@ class Database:
     def create_tables(self):
         """Create all tables in the database"""
         try:
-            db.create_all()
+            Base.metadata.create_all(bind=self.engine)
             logging.info("Database tables created successfully")
         except SQLAlchemyError as e:
             logging.error(f"Error creating database tables: {e}")
@@ -45,22 +40,21 @@ class Database:
         """Get a new database session"""
         return self.Session()
 
-    def backup_database(self) -> str:
-        """Create a backup of the database"""
+    def backup_database(self, incremental: bool = False) -> Dict[str, Any]:
+        """Back up the database with the SQLite online backup API
+
+        Returns the backup manifest (name, kind, size_bytes, duration_ms, ...);
+        see app/database/backup.py.
+        """
         try:
-            # Close any open sessions
-            self.Session.remove()
+            # The same directory as the backup CLI, so chains and BACKUP_KEEP retention are shared
+            backup_dir = Config.BACKUP_DIRECTORY
+            manifest = create_backup(self.db_path, backup_dir, incremental=incremental,
+                                     keep=Config.BACKUP_KEEP, step_pages=Config.BACKUP_STEP_PAGES)
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_dir = os.path.join(os.path.dirname(self.db_path), 'backups')
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            backup_path = os.path.join(backup_dir, f"jobs_db_backup_{timestamp}.db")
-            shutil.copy2(self.db_path, backup_path)
-            
-            logging.info(f"Database backed up successfully to {backup_path}")
-            return backup_path
+            logging.info(f"Database backed up successfully to {os.path.join(backup_dir, manifest['data'])}")
+            return manifest
             
         except Exception as e:
             logging.error(f"Backup error: {e}")
-            raise
\ No newline at end of file
+            raise
@@ -0,0 +1,235 @@
+"""Cross-source near-duplicate detection with MinHash and LSH.
+
+The same opening is posted on several job boards with slightly different
+titles and locations, so exact identity (job_key) stores it once per board.
+Postings from the same board are never merged: a board lists an opening
+once, and identical cards there are separate openings.
+At ingest every new posting gets a MinHash signature over normalized title,
+company, location and description shingles. The signature is split into
+BANDS bands; each band hashes to a bucket key, and postings sharing a bucket
+with the new one are candidates. A candidate from another source but the
+same (normalized) company whose signatures agree on at least
+DEDUP_THRESHOLD of their values is a near duplicate, and the new posting's `canonical_id` is set to the
+candidate's canonical job (the first one seen). Listings show only jobs
+whose `canonical_id` is NULL.
+
+Signatures and bucket keys are stored in `job_signatures` and
+`job_lsh_buckets`, so the index survives restarts and a lookup is a handful
+of primary-key seeks however many jobs there are. Signatures are computed
+when a posting is first stored; later edits don't move it between buckets.
+
+Run `python -m app.database.dedup` to index jobs stored before detection
+existed (in ID order, so the oldest posting stays canonical).
+"""
+import argparse
+import hashlib
+import logging
+import random
+import re
+import struct
+import sys
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, bindparam, select
+
+from config.config import Config
+from .fields import parse_location
+from .lookups import normalize_company
+from .models import Job, JobSignature, JobLshBucket
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS  # 16 bands of 4 rows: pairs above ~0.5 similarity share a bucket
+MIN_SHINGLES = 3  # fewer than this (e.g. a bare title) is too little to compare
+MAX_CANDIDATES = 50  # candidates checked per posting, most shared buckets first
+CHUNK_SIZE = 500  # keys or IDs per IN (...) lookup
+
+SIGNATURE = struct.Struct(f'<{NUM_PERM}I')
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: stored signatures are only comparable with ones made by the same permutations
+_random = random.Random(20261019)
+PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+WORD = re.compile(r'[a-z0-9]+')
+TITLE_WORDS = {'sr': 'senior', 'jr': 'junior', 'eng': 'engineer', 'engr': 'engineer', 'dev': 'developer', 'mgr': 'manager'}
+
+def words(value: Optional[str]) -> List[str]:
+    return WORD.findall((value or '').lower())
+
+def shingles(job_data: Dict[str, Any]) -> Set[str]:
+    """Normalized features of a posting: title/company/location words and description word 3-grams
+
+    Location is compared as parsed city and state, so "Austin, Texas" and
+    "Austin, TX, United States" agree.
+    """
+    features = {f"t:{TITLE_WORDS.get(word, word)}" for word in words(job_data.get('title'))}
+    company = normalize_company(job_data.get('company'))
+    if company:
+        features.add(f"c:{company}")
+    city, state = job_data.get('city'), job_data.get('state')
+    if not (city or state):
+        city, state = parse_location(job_data.get('location'))
+    features.update(f"l:{word}" for word in words(f"{city or ''} {state or ''}"))
+    description = words(job_data.get('description'))
+    features.update(' '.join(description[i:i + 3]) for i in range(len(description) - 2))
+    return features
+
+def signature(features: Set[str]) -> Optional[Tuple[int, ...]]:
+    """MinHash signature of a feature set (None if it is too small to compare)"""
+    if len(features) < MIN_SHINGLES:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=4).digest(), 'little')
+              for feature in features]
+    return tuple(min([(a * value + b) % _PRIME for value in hashes]) & _MAX_HASH for a, b in PERMUTATIONS)
+
+def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: the share of signature values that agree"""
+    return sum(a == b for a, b in zip(first, second)) / NUM_PERM
+
+def band_keys(values: Tuple[int, ...]) -> List[int]:
+    """One bucket key per band: the band number in the top bits, a hash of its rows below"""
+    packed = SIGNATURE.pack(*values)
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(packed[band * ROWS * 4:(band + 1) * ROWS * 4], digest_size=7).digest()
+        keys.append((band << 56) | int.from_bytes(digest, 'little'))
+    return keys
+
+def _origin(job_data: Dict[str, Any]) -> Tuple[str, str]:
+    return normalize_company(job_data.get('company')), (job_data.get('source') or '').lower()
+
+def _comparable(first: Tuple[str, str], second: Tuple[str, str]) -> bool:
+    """Same company, different (or unknown) source"""
+    return first[0] == second[0] and (not first[1] or not second[1] or first[1] != second[1])
+
+def _chunks(values: Iterable, size: int = CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+# Built once: these run for every ingested job, and compiled statements are cached
+_signatures = JobSignature.__table__
+_buckets = JobLshBucket.__table__
+_jobs = Job.__table__
+FIND_SIGNATURES = select(_signatures.c.job_id, _signatures.c.signature)\
+    .where(_signatures.c.job_id.in_(bindparam('ids', expanding=True)))
+FIND_BUCKETS = select(_buckets.c.key, _buckets.c.job_id)\
+    .where(_buckets.c.key.in_(bindparam('keys', expanding=True)))
+FIND_CANDIDATES = select(_signatures.c.job_id, _signatures.c.signature, _jobs.c.canonical_id, _jobs.c.company, _jobs.c.source)\
+    .join(_jobs, _jobs.c.id == _signatures.c.job_id)\
+    .where(_signatures.c.job_id.in_(bindparam('ids', expanding=True)))
+DELETE_BUCKET = _buckets.delete().where(and_(_buckets.c.key == bindparam('k'), _buckets.c.job_id == bindparam('j')))
+DELETE_SIGNATURES = _signatures.delete().where(_signatures.c.job_id.in_(bindparam('ids', expanding=True)))
+LINK = _jobs.update().where(_jobs.c.id == bindparam('_id')).values(canonical_id=bindparam('_canonical_id'))
+
+def forget(connection, job_ids: List[int]):
+    """Drop the signatures and bucket entries of `job_ids` (on a Session or Connection)"""
+    entries = []
+    for chunk in _chunks(job_ids):
+        for job_id, data in connection.execute(FIND_SIGNATURES, {'ids': chunk}):
+            entries += [{'k': key, 'j': job_id} for key in band_keys(SIGNATURE.unpack(data))]
+    if entries:
+        connection.execute(DELETE_BUCKET, entries)
+        for chunk in _chunks({entry['j'] for entry in entries}):
+            connection.execute(DELETE_SIGNATURES, {'ids': chunk})
+
+def link_duplicates(session, jobs: List[Tuple[int, Dict[str, Any]]], threshold: float = None) -> int:
+    """Index newly stored jobs and point near duplicates at their canonical job
+
+    `jobs` is (id, job data) pairs in insertion order; a job can match one
+    earlier in the same list. Runs in the session's transaction and returns
+    the number of jobs linked as duplicates.
+    """
+    threshold = Config.DEDUP_THRESHOLD if threshold is None else threshold
+    entries = []
+    for job_id, job_data in jobs:
+        values = signature(shingles(job_data))
+        if values is not None:
+            entries.append((job_id, _origin(job_data), values, band_keys(values)))
+    if not entries:
+        return 0
+    connection = session.connection()
+    forget(connection, [entry[0] for entry in entries])  # SQLite can reuse the ID of a deleted newest row
+
+    # Every stored job sharing a bucket with the batch, then their signatures, in a few round trips
+    buckets = defaultdict(list)
+    for chunk in _chunks({key for entry in entries for key in entry[3]}):
+        for key, job_id in connection.execute(FIND_BUCKETS, {'keys': chunk}):
+            buckets[key].append(job_id)
+    known = {}
+    for chunk in _chunks({job_id for ids in buckets.values() for job_id in ids}):
+        for job_id, data, canonical_id, company, source in connection.execute(FIND_CANDIDATES, {'ids': chunk}):
+            known[job_id] = (SIGNATURE.unpack(data), canonical_id or job_id, _origin({'company': company, 'source': source}))
+
+    links = []
+    for job_id, origin, values, keys in entries:
+        shared = Counter(candidate for key in keys for candidate in buckets.get(key, ()) if candidate != job_id)
+        best = None
+        for candidate, _ in shared.most_common(MAX_CANDIDATES):
+            if candidate not in known or not _comparable(origin, known[candidate][2]):
+                continue
+            score = similarity(values, known[candidate][0])
+            if score >= threshold and (best is None or score > best[0]):
+                best = (score, known[candidate][1])
+        canonical_id = best[1] if best else job_id
+        if best:
+            links.append({'_id': job_id, '_canonical_id': canonical_id})
+        known[job_id] = (values, canonical_id, origin)
+        for key in keys:
+            buckets[key].append(job_id)
+
+    connection.execute(_signatures.insert(), [
+        {'job_id': job_id, 'signature': SIGNATURE.pack(*values)} for job_id, _, values, _ in entries
+    ])
+    connection.execute(_buckets.insert(), [
+        {'key': key, 'job_id': job_id} for job_id, _, _, keys in entries for key in keys
+    ])
+    if links:
+        connection.execute(LINK, links)
+    return len(links)
+
+def backfill(session, batch_size: int = 1000, threshold: float = None) -> Dict[str, int]:
+    """Index jobs that have no signature yet, oldest first; returns counts"""
+    counts = {'indexed': 0, 'duplicates': 0}
+    try:
+        last_id = 0
+        while True:
+            rows = session.query(Job.id, Job.source, Job.title, Job.company, Job.location, Job.city, Job.state, Job.description)\
+                .outerjoin(JobSignature, JobSignature.job_id == Job.id)\
+                .filter(Job.id > last_id, JobSignature.job_id.is_(None))\
+                .order_by(Job.id)\
+                .limit(batch_size)\
+                .all()
+            if not rows:
+                break
+            counts['duplicates'] += link_duplicates(session, [(row.id, row._asdict()) for row in rows], threshold)
+            session.commit()
+            counts['indexed'] += len(rows)
+            last_id = rows[-1].id
+        return counts
+    except Exception as e:
+        session.rollback()
+        logging.error(f"Error indexing jobs for duplicate detection: {e}")
+        raise
+
+def main(argv=None) -> int:
+    from . import get_session
+
+    parser = argparse.ArgumentParser(description='Index stored jobs for near-duplicate detection')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--threshold', type=float, default=Config.DEDUP_THRESHOLD,
+                        help='estimated similarity at which two postings are the same job')
+    args = parser.parse_args(argv)
+
+    session = get_session()
+    try:
+        counts = backfill(session, batch_size=args.batch_size, threshold=args.threshold)
+    finally:
+        session.close()
+    print(f"Indexed {counts['indexed']} jobs, {counts['duplicates']} linked as duplicates")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
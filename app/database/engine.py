@@ -0,0 +1,207 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from config.config import Config
+
+class PoolMetrics:
+    """Checkout counters and wait times for a connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait: float):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'timeouts': self.timeouts,
+                'checked_out': self.checked_out,
+                'max_checked_out': self.max_checked_out,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3)
+            }
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self.metrics.record_checkin()
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """The SQLite performance profile from Config (None skips a pragma)"""
+    return {
+        # auto_vacuum first: it can only change before the database has tables
+        'auto_vacuum': Config.SQLITE_AUTO_VACUUM,
+        'journal_mode': Config.SQLITE_JOURNAL_MODE,
+        'synchronous': Config.SQLITE_SYNCHRONOUS,
+        'mmap_size': Config.SQLITE_MMAP_SIZE,
+        'cache_size': Config.SQLITE_CACHE_SIZE,
+        'temp_store': Config.SQLITE_TEMP_STORE,
+        'busy_timeout': Config.SQLITE_BUSY_TIMEOUT,
+    }
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Optional[Dict[str, Any]] = None):
+    """Run the pragmas on every new DBAPI connection the engine opens"""
+    pragmas = {name: value for name, value in (pragmas or sqlite_pragmas()).items() if value is not None}
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+def sqlite_settings(engine: Engine) -> Dict[str, Any]:
+    """Current values of the profile's pragmas, as seen by a pooled connection"""
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in sqlite_pragmas()
+        }
+
+def maintain_sqlite(engine: Engine) -> Dict[str, Any]:
+    """Checkpoint the WAL back into the database file and refresh planner statistics
+
+    Long-lived readers can keep the WAL from being reset, so this runs on a
+    timer rather than relying on SQLite's automatic checkpoints alone.
+    """
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        busy, wal_pages, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").first()
+        conn.exec_driver_sql("PRAGMA optimize")
+    result = {
+        'busy': bool(busy),
+        'wal_pages': wal_pages,
+        'checkpointed_pages': checkpointed,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 3)
+    }
+    if busy:
+        logging.warning(f"WAL checkpoint could not finish, readers still active: {result}")
+    return result
+
+_engines: Dict[str, Engine] = {}
+_sessions: Dict[str, scoped_session] = {}
+_lock = threading.Lock()
+
+def _normalize_uri(db_uri=None) -> str:
+    url = make_url(db_uri or Config.SQLALCHEMY_DATABASE_URI)
+    return url.render_as_string(hide_password=False)
+
+def _build_engine(db_uri: str) -> Engine:
+    """Create an engine with the pool settings from Config"""
+    url = make_url(db_uri)
+    kwargs: Dict[str, Any] = {'echo': False}
+
+    if url.get_backend_name() == 'sqlite':
+        kwargs['connect_args'] = {'check_same_thread': False}
+        if url.database in (None, '', ':memory:'):
+            # A private in-memory database only exists on a single connection
+            kwargs['poolclass'] = StaticPool
+            return create_engine(url, **kwargs)
+        directory = os.path.dirname(os.path.abspath(url.database))
+        os.makedirs(directory, exist_ok=True)
+
+    kwargs.update(
+        poolclass=MeteredQueuePool,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_pre_ping=Config.DB_POOL_PRE_PING
+    )
+    engine = create_engine(url, **kwargs)
+    if url.get_backend_name() == 'sqlite':
+        apply_sqlite_pragmas(engine)
+    return engine
+
+def get_engine(db_uri=None) -> Engine:
+    """Get the process-wide engine for `db_uri` (defaults to Config's database)"""
+    key = _normalize_uri(db_uri)
+    engine = _engines.get(key)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = _engines[key] = _build_engine(key)
+    return engine
+
+def get_scoped_session(db_uri=None) -> scoped_session:
+    """Get the thread-local session registry bound to the shared engine"""
+    key = _normalize_uri(db_uri)
+    registry = _sessions.get(key)
+    if registry is None:
+        engine = get_engine(key)
+        with _lock:
+            registry = _sessions.get(key)
+            if registry is None:
+                registry = _sessions[key] = scoped_session(sessionmaker(bind=engine))
+    return registry
+
+def pool_status(db_uri=None) -> Optional[Dict[str, Any]]:
+    """Pool size and checkout metrics for the shared engine"""
+    key = _normalize_uri(db_uri)
+    engine = _engines.get(key)
+    if engine is None:
+        return None
+    pool = engine.pool
+    status = {'pool': pool.status()}
+    if isinstance(pool, MeteredQueuePool):
+        status.update(size=pool.size(), overflow=pool.overflow(), **pool.metrics.to_dict())
+    return status
+
+def dispose_engines():
+    """Close every pooled connection (e.g. after forking worker processes)"""
+    with _lock:
+        for registry in _sessions.values():
+            registry.remove()
+        for engine in _engines.values():
+            engine.dispose()
@@ -0,0 +1,131 @@
+"""Structured columns parsed from the scraped free text, once at ingest.
+
+Salary, location and job type arrive as display strings ("$120K/yr -
+$150K/yr", "Austin, TX, United States"). Parsing them here into
+`salary_min`/`salary_max`/`salary_period`, `city`/`state` and `job_type`
+lets statistics and filters run as indexed aggregates instead of string
+munging in SQL.
+
+Run `python -m app.database.fields` to fill the columns for existing rows.
+"""
+import argparse
+import re
+import sys
+from typing import Dict, Any, Optional, Tuple
+
+STRUCTURED_FIELDS = ('salary_min', 'salary_max', 'salary_period', 'city', 'state', 'job_type')
+
+US_STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois',
+    'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana',
+    'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota',
+    'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma', 'OR': 'Oregon',
+    'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota',
+    'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia',
+    'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming'
+}
+STATE_CODES = {name.lower(): code for code, name in US_STATES.items()}
+COUNTRY_NAMES = {'united states', 'united states of america', 'usa', 'us'}
+NOT_A_CITY = {'remote', 'united states', 'hybrid'}
+
+AMOUNT = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([kKmM])?\b')
+SALARY_PERIODS = [
+    # period, pattern; checked in order
+    ('hour', re.compile(r'/\s*h(?:ou)?r\b|\bhour|\bhourly\b', re.IGNORECASE)),
+    ('day', re.compile(r'/\s*day\b|\ba day\b|\bdaily\b|\bper day\b', re.IGNORECASE)),
+    ('week', re.compile(r'/\s*w(?:ee)?k\b|\bweek', re.IGNORECASE)),
+    ('month', re.compile(r'/\s*mo(?:nth)?\b|\bmonth', re.IGNORECASE)),
+    ('year', re.compile(r'/\s*y(?:ea)?r\b|\byear|\bannual|\bper annum\b', re.IGNORECASE)),
+]
+
+JOB_TYPES = [
+    # stored value, pattern; the same vocabulary as BaseScraper.normalize_job_type
+    ('Full-time', re.compile(r'full[\s-]?time', re.IGNORECASE)),
+    ('Part-time', re.compile(r'part[\s-]?time', re.IGNORECASE)),
+    ('Contract', re.compile(r'\bcontract', re.IGNORECASE)),
+    ('Temporary', re.compile(r'\btemp(?:orary)?\b', re.IGNORECASE)),
+    ('Internship', re.compile(r'\bintern(?:ship)?\b', re.IGNORECASE)),
+]
+
+def parse_salary(salary: Optional[str]) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+    """(min, max, period) from a salary string; a single figure is both min and max
+
+    Without an explicit period, figures under 500 are taken as hourly.
+    """
+    if not salary:
+        return None, None, None
+    amounts = []
+    for number, suffix in AMOUNT.findall(salary):
+        value = float(number.replace(',', ''))
+        if suffix:
+            value *= 1000 if suffix.lower() == 'k' else 1000000
+        amounts.append(value)
+    if not amounts:
+        return None, None, None
+
+    low, high = min(amounts[:2]), max(amounts[:2])
+    period = next((name for name, pattern in SALARY_PERIODS if pattern.search(salary)), None)
+    if period is None:
+        period = 'hour' if high < 500 else 'year'
+    return low, high, period
+
+def parse_location(location: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(city, two-letter state) from a location string; either may be None"""
+    if not location:
+        return None, None
+    parts = [part.strip() for part in location.split(',') if part.strip()]
+    while parts and parts[-1].lower() in COUNTRY_NAMES:
+        parts.pop()
+    if not parts:
+        return None, None
+
+    last = parts[-1]
+    state = last.upper() if last.upper() in US_STATES else STATE_CODES.get(last.lower())
+    if state:
+        parts.pop()
+    city = parts[0] if parts and parts[0].lower() not in NOT_A_CITY else None
+    return city, state
+
+def normalize_job_type(job_type: Optional[str], title: Optional[str] = None) -> Optional[str]:
+    """Canonical job type from the scraped value, else from hints in the title"""
+    if job_type:
+        return next((name for name, pattern in JOB_TYPES if pattern.search(job_type)), 'Other')
+    if title:
+        return next((name for name, pattern in JOB_TYPES if pattern.search(title)), None)
+    return None
+
+def structured_fields(job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Structured column values for a scraped job or stored row"""
+    salary_min, salary_max, salary_period = parse_salary(job_data.get('salary'))
+    city, state = parse_location(job_data.get('location'))
+    return {
+        'salary_min': salary_min,
+        'salary_max': salary_max,
+        'salary_period': salary_period,
+        'city': city,
+        'state': state,
+        'job_type': normalize_job_type(job_data.get('job_type'), job_data.get('title'))
+    }
+
+def main(argv=None) -> int:
+    from . import get_session
+    from .repository import JobRepository
+
+    parser = argparse.ArgumentParser(description='Backfill structured salary/location/type columns')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    session = get_session()
+    try:
+        counts = JobRepository(session).backfill_structured_fields(batch_size=args.batch_size)
+    finally:
+        session.close()
+    print(f"Updated {counts['updated']} jobs")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""SQLite FTS5 index over job title, company and description.
+
+`jobs_fts` is an external-content FTS5 table: it stores only the index and
+reads column values from `jobs` (through a view that decompresses the
+description, see compression.py). Triggers keep it in sync on insert, update
+and delete, so every write path (ORM, upserts, raw SQL) is covered. The
+triggers call job_text(), so writes need a connection it is registered on.
+"""
+import re
+import weakref
+from typing import List, Optional
+
+from sqlalchemy import select, literal_column, text
+
+FTS_TABLE = 'jobs_fts'
+CONTENT_VIEW = 'jobs_fts_content'
+
+CREATE_STATEMENTS: List[str] = [
+    f"""
+    CREATE VIEW IF NOT EXISTS {CONTENT_VIEW} AS
+    SELECT id, title, company, job_text(description) AS description FROM jobs
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, company, description,
+        content='{CONTENT_VIEW}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, job_text(new.description));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, job_text(old.description));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, company, description ON jobs BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, job_text(old.description));
+        INSERT INTO {FTS_TABLE}(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, job_text(new.description));
+    END
+    """,
+]
+
+DROP_STATEMENTS: List[str] = [
+    "DROP TRIGGER IF EXISTS jobs_fts_au",
+    "DROP TRIGGER IF EXISTS jobs_fts_ad",
+    "DROP TRIGGER IF EXISTS jobs_fts_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    f"DROP VIEW IF EXISTS {CONTENT_VIEW}",
+]
+
+REBUILD_STATEMENT = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+# Merges index segments; deletes only leave tombstones until then
+OPTIMIZE_STATEMENT = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+# Prefix lengths jobs_fts has an index for (prefix='2 3'); longer prefixes merge every matching term's doclist
+INDEXED_PREFIXES = (2, 3)
+# Newest jobs match_density() samples
+PROBE_ROWS = 2000
+
+_available = weakref.WeakKeyDictionary()
+
+def match_query(keyword: str, columns: Optional[List[str]] = None) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression of ANDed prefix terms
+
+    Quoting each token keeps user input from being parsed as FTS syntax.
+    Returns None when the keyword has no searchable tokens.
+    """
+    return _expression(TOKEN.findall(keyword.lower()), columns, lambda token: True)
+
+def _expression(tokens: List[str], columns: Optional[List[str]], prefix) -> Optional[str]:
+    if not tokens:
+        return None
+    terms = ' '.join(f'"{token}"*' if prefix(token) else f'"{token}"' for token in tokens)
+    if columns:
+        return f"{{{' '.join(columns)}}} : ({terms})"
+    return terms
+
+def fts_available(bind) -> bool:
+    """Whether the bound database has the jobs_fts index (cached per engine)"""
+    engine = getattr(bind, 'engine', bind)
+    if engine.dialect.name != 'sqlite':
+        return False
+    if engine not in _available:
+        with engine.connect() as conn:
+            _available[engine] = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': FTS_TABLE}
+            ).first() is not None
+    return _available[engine]
+
+def match_density(connection, keyword: str, columns: Optional[List[str]] = None) -> float:
+    """Share of the newest PROBE_ROWS jobs a keyword matches
+
+    Counts matches over a rowid range, which reads only the end of each
+    term's doclist (fts5vocab's document counts read all of it). Tokens
+    longer than the indexed prefixes are probed as whole words, so for them
+    this is a lower bound of what the prefix search matches.
+    """
+    expression = _expression(TOKEN.findall(keyword.lower()), columns, lambda token: len(token) in INDEXED_PREFIXES)
+    max_id = connection.execute(text("SELECT max(id) FROM jobs")).scalar() if expression else None
+    if not max_id:
+        return 0.0
+    sample = min(PROBE_ROWS, max_id)
+    matched = connection.execute(
+        text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query AND rowid > :after"),
+        {'fts_query': expression, 'after': max_id - sample}
+    ).scalar()
+    return matched / sample
+
+def matching_ids(expression: str):
+    """Subquery of job IDs whose indexed text matches an FTS5 expression"""
+    return select(literal_column('rowid'))\
+        .select_from(text(FTS_TABLE))\
+        .where(text(f"{FTS_TABLE} MATCH :fts_query").bindparams(fts_query=expression))
+
+def rebuild(connection):
+    """Re-index every job (after bulk loads or restoring from backup)"""
+    connection.exec_driver_sql(REBUILD_STATEMENT)
+
+def optimize(connection):
+    """Compact the index after many deletes (e.g. archiving)"""
+    connection.exec_driver_sql(OPTIMIZE_STATEMENT)
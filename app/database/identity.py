@@ -0,0 +1,39 @@
+import re
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that carry the posting ID on each job board; all others are tracking noise
+ID_PARAMS = ('jk', 'currentJobId', 'jobListingId', 'jl')
+
+LINKEDIN_ID = re.compile(r'/jobs/view/(?:[^/]*?-)?(\d+)/?$')
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """Normalize a posting URL: lowercase host, no tracking params, fragment or trailing slash"""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if k in ID_PARAMS])
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower() or 'https', parts.netloc.lower(), path, query, ''))
+
+def extract_job_id(url: Optional[str]) -> Optional[str]:
+    """Get the job board's own posting ID from a URL, if it has one"""
+    if not url:
+        return None
+    parts = urlsplit(url)
+    match = LINKEDIN_ID.search(parts.path)
+    if match:
+        return match.group(1)
+    for key, value in parse_qsl(parts.query):
+        if key in ID_PARAMS and value:
+            return value
+    return None
+
+def job_key(job_data: Dict[str, Any]) -> Optional[str]:
+    """Unique identity for a posting: `source:posting-id` when known, else the canonical URL"""
+    url = job_data.get('url')
+    job_id = extract_job_id(url)
+    if job_id:
+        source = (job_data.get('source') or urlsplit(url).netloc or 'unknown').lower()
+        return f"{source}:{job_id}"
+    return canonical_url(url)
@@ -0,0 +1,229 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config.config import Config
+from .cache_store import bump_data_version
+from .records import JobData, as_dict
+from .repository import JobRepository
+
+_STOP = object()
+
+class IngestQueue:
+    """Write-behind ingest stage with a single batching writer thread
+
+    Producers `put()` scraped jobs into a bounded queue and return
+    immediately; the writer upserts them in batches of `batch_size` or every
+    `flush_interval` seconds, whichever comes first. When the queue stays
+    full for `put_timeout` seconds, jobs are appended to a spill file instead
+    of blocking the scraper, and the writer replays the file once it catches
+    up. Failed batches are spilled too, so nothing is dropped on DB errors.
+    Batches that insert or update jobs bump the web cache's data version in `version_store` (the configured
+    store by default; see cache_store.py).
+    """
+
+    def __init__(self,
+                 session_factory: Callable[[], Session],
+                 batch_size: int = None,
+                 flush_interval: float = None,
+                 max_queue: int = None,
+                 put_timeout: float = None,
+                 spill_path: str = None,
+                 version_store=None):
+        self.session_factory = session_factory
+        self.version_store = version_store
+        self.batch_size = batch_size or Config.INGEST_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else Config.INGEST_FLUSH_INTERVAL
+        self.put_timeout = put_timeout if put_timeout is not None else Config.INGEST_PUT_TIMEOUT
+        self.spill_path = spill_path or Config.INGEST_SPILL_PATH
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue or Config.INGEST_QUEUE_SIZE)
+        self._spill_lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.stats = {'enqueued': 0, 'written': 0, 'spilled': 0, 'replayed': 0, 'batches': 0, 'errors': 0}
+        self._counts: Dict[Optional[str], Dict[str, int]] = {}
+
+    # Producer side
+
+    def start(self):
+        """Start the writer thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='ingest-writer', daemon=True)
+        self._thread.start()
+
+    def put(self, job_data: JobData, tag: Optional[str] = None):
+        """Queue one job; spills to disk if the writer is too far behind"""
+        try:
+            self._queue.put((tag, job_data), timeout=self.put_timeout)
+            self._bump('enqueued')
+        except queue.Full:
+            self._spill([(tag, job_data)])
+
+    def put_many(self, jobs: Iterable[JobData], tag: Optional[str] = None):
+        for job_data in jobs:
+            self.put(job_data, tag)
+
+    def flush(self):
+        """Block until everything queued or spilled so far has been written
+
+        Jobs that fail to write again are left in the spill file.
+        """
+        self._queue.join()
+        self._replay_spill()
+
+    def stop(self, timeout: float = None) -> bool:
+        """Drain the queue, write the final batch and stop the writer
+
+        Returns False if the writer is still draining after `timeout`; it
+        keeps running, and start() won't launch a second one beside it.
+        """
+        if not self._thread:
+            return True
+        if not self._stopping:
+            # One sentinel per writer: a second would stop the next writer as soon as it started
+            self._queue.put(_STOP)
+            self._stopping = True
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logging.warning(f"Ingest writer still draining after {timeout}s ({self._queue.qsize()} items queued)")
+            return False
+        self._thread = None
+        return True
+
+    def counts(self, tag: Optional[str] = None) -> Dict[str, int]:
+        """Inserted/updated/unchanged totals written so far for `tag`"""
+        with self._stats_lock:
+            return dict(self._counts.get(tag, {'inserted': 0, 'updated': 0, 'unchanged': 0}))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['queued'] = self._queue.qsize()
+        stats['spill_pending'] = os.path.exists(self.spill_path)
+        return stats
+
+    # Writer side
+
+    def _run(self):
+        self._replay_spill()
+        batch: List[Tuple[Optional[str], JobData]] = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+                self._queue.task_done()
+            elif item is not None:
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                try:
+                    self._write(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                batch = []
+                if self._queue.empty():
+                    self._replay_spill()
+            deadline = time.monotonic() + self.flush_interval
+
+        # Shutdown drain: anything spilled during the run is written before exiting
+        self._replay_spill()
+
+    def _write(self, batch: List[Tuple[Optional[str], JobData]]):
+        by_tag: Dict[Optional[str], List[JobData]] = {}
+        for tag, job_data in batch:
+            by_tag.setdefault(tag, []).append(job_data)
+
+        try:
+            session = self.session_factory()
+        except Exception as e:
+            logging.error(f"No database session for {len(batch)} ingested jobs, spilling to disk: {e}")
+            self._bump('errors')
+            self._spill(batch)
+            return
+        changed = 0
+        try:
+            repository = JobRepository(session)
+            for tag, jobs in by_tag.items():
+                try:
+                    result = repository.upsert_many(jobs, batch_size=self.batch_size)
+                except Exception as e:
+                    logging.error(f"Ingest batch of {len(jobs)} jobs failed, spilling to disk: {e}")
+                    self._bump('errors')
+                    self._spill([(tag, job_data) for job_data in jobs])
+                    continue
+                with self._stats_lock:
+                    totals = self._counts.setdefault(tag, {'inserted': 0, 'updated': 0, 'unchanged': 0})
+                    for key, value in result.items():
+                        totals[key] += value
+                    self.stats['written'] += len(jobs)
+                    self.stats['batches'] += 1
+                changed += result['inserted'] + result['updated']
+        finally:
+            session.close()
+        if changed:
+            # Cached listings in every web worker are now stale
+            bump_data_version(self.version_store)
+
+    # Spill file
+
+    def _spill(self, items: List[Tuple[Optional[str], JobData]]):
+        """Append jobs to the spill file and fsync it"""
+        with self._spill_lock:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for tag, job_data in items:
+                    f.write(json.dumps({'tag': tag, 'job': as_dict(job_data)}, default=str) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        self._bump('spilled', len(items))
+        logging.warning(f"Spilled {len(items)} jobs to {self.spill_path}")
+
+    def _replay_spill(self):
+        """Write back jobs spilled earlier (including by a previous process)"""
+        # The writer and flush() both replay; one at a time, so no job is written twice
+        with self._replay_lock:
+            processing = self.spill_path + '.replay'
+            with self._spill_lock:
+                # A leftover replay file means a previous writer died mid-replay; finish it first
+                if not os.path.exists(processing):
+                    if not os.path.exists(self.spill_path):
+                        return
+                    os.replace(self.spill_path, processing)
+
+            items = []
+            with open(processing, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        items.append((entry.get('tag'), entry['job']))
+            for i in range(0, len(items), self.batch_size):
+                self._write(items[i:i + self.batch_size])
+            os.remove(processing)
+        self._bump('replayed', len(items))
+        logging.info(f"Replayed {len(items)} spilled jobs")
+
+    def _bump(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
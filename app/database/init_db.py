@@ -1,8 +1,8 @@
 from app.database.models import Base
-from app.database import engine
+from app.database.engine import get_engine
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
 if __name__ == '__main__':
-    init_db()
\ No newline at end of file
+    init_db()
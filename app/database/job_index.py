@@ -0,0 +1,490 @@
+"""In-memory columnar index of the web listing subset.
+
+Every listing page runs the same shape of query: the US software subset
+without near duplicates (see queries.apply_job_filters), optionally
+filtered by location or company, in one of three orders, one keyset page at
+a time. With JOB_INDEX on, the web tier keeps that subset in memory and
+answers those pages without SQL:
+
+- columns are flat `array`s ordered by job id; repeated strings (title,
+  company, location, source, ...) are dictionary-encoded, so each distinct
+  value is stored once and rows hold 4-byte codes, and URLs are packed into
+  one UTF-8 buffer;
+- each sort order has a presorted permutation of the rows (and its inverse),
+  so a cursor is a bisect and a page is a short walk;
+- company and location filters are resolved against the few thousand
+  distinct spellings, then served from per-value posting lists, or by
+  walking the permutation when a filter matches most rows.
+
+Pages carry the same cursors as pagination.keyset_page, so a client can
+move between the index and SQL. Keyword searches (full-text) and pages
+that include descriptions are not indexed; JobIndex.page returns None for
+them and the caller runs the SQL query.
+
+The index loads in a background thread at startup (pages run SQL until it
+is ready) and then polls for rows inserted or updated since the last
+refresh (through ix_jobs_updated_at). Changed rows go to a small delta
+segment that shadows the main one; when the delta grows past a sixteenth of
+the index, or rows have been deleted (archiving), the index is rebuilt from
+scratch. Deletions are found by recounting the rows up to the last
+refresh's highest id, which new inserts can't offset.
+"""
+import bisect
+import heapq
+import logging
+import math
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+from functools import partial
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.engine import Engine
+
+from .lookups import normalize_company
+from .models import CompanyAlias, Job
+from .pagination import DEFAULT_SORT, SORT_KEYS, KeysetPage, decode_cursor, page_from_rows
+from .queries import us_software_filter
+
+# Listed columns, in the order rows are read and decoded
+COLUMNS = (Job.id, Job.posted_date, Job.title, Job.company, Job.company_id, Job.location, Job.source, Job.url,
+           Job.salary, Job.salary_min, Job.salary_max, Job.salary_period, Job.city, Job.state, Job.job_type,
+           Job.is_remote)
+FIELDS = tuple(column.key for column in COLUMNS)
+# String columns stored as codes into a per-index dictionary
+DICTIONARY_FIELDS = ('title', 'company', 'location', 'source', 'salary', 'salary_period', 'city', 'state', 'job_type')
+LISTED = and_(us_software_filter(), Job.canonical_id.is_(None))
+JOB_MANAGER = Job.__mapper__.class_manager
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+NO_DATE = -2 ** 63  # NULL posted_date; sorts last by date, as in SQLite
+# Changes are re-read with this much overlap, in case a batch stamped before the last refresh committed after it
+REFRESH_OVERLAP = timedelta(minutes=1)
+COMPACT_MIN_ROWS = 5_000
+LOAD_CHUNK = 10_000
+
+def _micros(value: Optional[datetime]) -> int:
+    return NO_DATE if value is None else (value - EPOCH) // MICROSECOND
+
+def _plain_text(value: str) -> bool:
+    """Whether an ILIKE '%value%' match is a plain case-insensitive substring test"""
+    return value.isascii() and '%' not in value and '_' not in value
+
+class Dictionary:
+    """Distinct values of a string column, each stored once; code 0 is NULL"""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[Optional[str], int] = {None: 0}
+
+    def encode(self, values: Sequence[Optional[str]]) -> Iterable[int]:
+        """Codes for a column of values, adding the ones not seen before"""
+        for value in set(values).difference(self.codes):
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return map(self.codes.__getitem__, values)
+
+class PackedStrings:
+    """Unique strings (URLs) packed into one UTF-8 buffer instead of one object each"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('Q', [0])
+        self.nulls = set()
+
+    def extend(self, values: Sequence[Optional[str]]):
+        for value in values:
+            if value is None:
+                self.nulls.add(len(self.offsets) - 1)
+            else:
+                self.data += value.encode('utf-8')
+            self.offsets.append(len(self.data))
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if i in self.nulls:
+            return None
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode('utf-8')
+
+def _groups(column: array):
+    """Rows grouped by value: (slots ordered by value, {value: (start, end)})"""
+    order = array('I', sorted(range(len(column)), key=column.__getitem__))
+    value_of = lambda slot: column[slot]
+    return order, {value: (bisect.bisect_left(order, value, key=value_of),
+                           bisect.bisect_right(order, value, key=value_of)) for value in set(column)}
+
+class Segment:
+    """Listed jobs as columns ordered by id, with a sorted permutation per sort order"""
+
+    def __init__(self, chunks: Iterable[Sequence], dictionaries: Dict[str, Dictionary]):
+        self.dictionaries = dictionaries
+        self.ids = array('q')
+        self.posted = array('q')
+        self.company_ids = array('q')
+        self.codes = {field: array('I') for field in DICTIONARY_FIELDS}
+        self.urls = PackedStrings()
+        self.salary_min = array('d')
+        self.salary_max = array('d')
+        self.is_remote = array('b')
+        for rows in chunks:
+            if rows:
+                self._extend(rows)
+        self._sort()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _extend(self, rows: Sequence):
+        """Append rows (in COLUMNS order), a column at a time"""
+        columns = dict(zip(FIELDS, zip(*rows)))
+        self.ids.extend(columns['id'])
+        self.posted.extend(map(_micros, columns['posted_date']))
+        self.company_ids.extend(company_id or 0 for company_id in columns['company_id'])
+        for field in DICTIONARY_FIELDS:
+            self.codes[field].extend(self.dictionaries[field].encode(columns[field]))
+        self.urls.extend(columns['url'])
+        self.salary_min.extend(math.nan if value is None else value for value in columns['salary_min'])
+        self.salary_max.extend(math.nan if value is None else value for value in columns['salary_max'])
+        self.is_remote.extend(-1 if value is None else int(value) for value in columns['is_remote'])
+
+    def _sort(self):
+        count = len(self.ids)
+        self.order: Dict[str, array] = {}
+        # Rows arrive in id order and sorts are stable, so ids break ties as in SQL
+        self.order['posted_date'] = array('I', sorted(range(count - 1, -1, -1), key=self.posted.__getitem__,
+                                                      reverse=True))
+        for sort in ('company', 'title'):
+            values, codes = self.dictionaries[sort].values, self.codes[sort]
+            ranks = {code: rank for rank, code in enumerate(sorted(set(codes), key=values.__getitem__))}
+            row_ranks = [ranks[code] for code in codes]
+            self.order[sort] = array('I', sorted(range(count), key=row_ranks.__getitem__))
+        # The inverse permutations: a row's position in each order
+        self.position = {sort: array('I', sorted(range(count), key=order.__getitem__))
+                         for sort, order in self.order.items()}
+        self.by_company = _groups(self.company_ids)
+        self.by_location = _groups(self.codes['location'])
+
+    @staticmethod
+    def postings(groups, values: set):
+        """(slots ordered by value, [(start, end) of each value's rows])"""
+        order, bounds = groups
+        return order, [bounds[value] for value in values if value in bounds]
+
+    def slot_of(self, job_id: int) -> Optional[int]:
+        slot = bisect.bisect_left(self.ids, job_id)
+        return slot if slot < len(self.ids) and self.ids[slot] == job_id else None
+
+    def key(self, sort: str, slot: int) -> tuple:
+        """Sort key of a row, ascending in the permutation's order"""
+        if sort == 'posted_date':
+            return -self.posted[slot], -self.ids[slot]
+        return self.dictionaries[sort].values[self.codes[sort][slot]], self.ids[slot]
+
+    def row(self, slot: int) -> tuple:
+        """The row as read from the database (in COLUMNS order)"""
+        posted = self.posted[slot]
+        data = {field: self.dictionaries[field].values[self.codes[field][slot]] for field in DICTIONARY_FIELDS}
+        data.update(
+            id=self.ids[slot],
+            posted_date=None if posted == NO_DATE else EPOCH + posted * MICROSECOND,
+            company_id=self.company_ids[slot] or None,
+            url=self.urls[slot],
+            salary_min=None if math.isnan(self.salary_min[slot]) else self.salary_min[slot],
+            salary_max=None if math.isnan(self.salary_max[slot]) else self.salary_max[slot],
+            is_remote=None if self.is_remote[slot] < 0 else bool(self.is_remote[slot]),
+        )
+        return tuple(data[field] for field in FIELDS)
+
+    def job(self, slot: int) -> Job:
+        """A transient Job with the listed columns (no description)
+
+        Values go straight into the instance dict: the constructor's
+        attribute events cost more than the rest of the page.
+        """
+        job = JOB_MANAGER.new_instance()
+        job.__dict__.update(zip(FIELDS, self.row(slot)), is_us=True, role_family='software', canonical_id=None)
+        return job
+
+    def candidates(self, sort: str, bound: Optional[tuple], forward: bool, limit: int, alive,
+                   companies: Optional[set], locations: Optional[set]) -> List[int]:
+        """Up to `limit` matching slots after (or before) `bound`, in walk order"""
+        order, position = self.order[sort], self.position[sort]
+        if bound is None:
+            start = 0 if forward else len(order)
+        elif forward:
+            start = bisect.bisect_right(order, bound, key=partial(self.key, sort))
+        else:
+            start = bisect.bisect_left(order, bound, key=partial(self.key, sort))
+
+        def matches(slot):
+            return (alive is None or alive[slot]) \
+                and (companies is None or self.company_ids[slot] in companies) \
+                and (locations is None or self.codes['location'][slot] in locations)
+
+        postings = []
+        if companies is not None:
+            postings.append(self.postings(self.by_company, companies))
+        if locations is not None:
+            postings.append(self.postings(self.by_location, locations))
+        if postings:
+            groups, ranges = min(postings, key=lambda posting: sum(end - start for start, end in posting[1]))
+            matched = sum(end - start for start, end in ranges)
+            # Walking the permutation visits about limit * len / matched rows; the posting lists, `matched`
+            if matched * matched < limit * len(order):
+                slots = chain.from_iterable(groups[slice(*bounds)] for bounds in ranges)
+                if forward:
+                    found = heapq.nsmallest(limit, (position[slot] for slot in slots
+                                                    if position[slot] >= start and matches(slot)))
+                else:
+                    found = heapq.nlargest(limit, (position[slot] for slot in slots
+                                                   if position[slot] < start and matches(slot)))
+                return [order[i] for i in found]
+
+        found = []
+        for i in (range(start, len(order)) if forward else range(start - 1, -1, -1)):
+            slot = order[i]
+            if matches(slot):
+                found.append(slot)
+                if len(found) == limit:
+                    break
+        return found
+
+class IndexState:
+    """One immutable version of the index; refreshes build a new one and swap it in"""
+
+    def __init__(self, main: Segment, alive: bytearray, delta: Segment, aliases: List[tuple],
+                 max_id: int, since: datetime, kept: int):
+        self.main = main
+        self.alive = alive
+        self.delta = delta
+        self.aliases = aliases
+        self.max_id = max_id
+        self.since = since
+        # Rows (listed or not) with ids up to max_id; fewer later means some were deleted
+        self.kept = kept
+
+    def __len__(self):
+        return self.alive.count(1) + len(self.delta)
+
+class JobIndex:
+    """The web listing subset in memory, answering keyset pages without SQL"""
+
+    def __init__(self, version: Optional[Callable[[], Any]] = None):
+        self._state: Optional[IndexState] = None
+        # The data version (see app/database/cache_store.py) read before the last load or refresh
+        self.version = version
+        self.data_version: Any = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self.loaded_at: Optional[datetime] = None
+        self.refreshed_at: Optional[datetime] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._state is not None
+
+    def __len__(self):
+        return len(self._state) if self._state else 0
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first load has finished; returns whether it has"""
+        return self._ready.wait(timeout)
+
+    def _watermark(self, connection):
+        max_id, since = connection.execute(select(func.max(Job.id), func.max(Job.updated_at))).one()
+        return max_id or 0, since or EPOCH
+
+    def _kept(self, connection, max_id: int) -> int:
+        """Rows with ids up to max_id (a range count on the primary key)"""
+        return connection.execute(select(func.count()).select_from(Job.__table__).where(Job.id <= max_id)).scalar()
+
+    def _aliases(self, connection) -> List[tuple]:
+        return connection.execute(select(CompanyAlias.key, CompanyAlias.company_id)).fetchall()
+
+    def load(self, engine: Engine) -> int:
+        """Build the index from scratch; returns the number of listed jobs"""
+        with self._lock:
+            return self._load(engine)
+
+    def _load(self, engine: Engine) -> int:
+        started = time.perf_counter()
+        version = self.version() if self.version else None
+        with engine.connect() as connection:
+            # The watermark is read first: rows written during the load are read again by the next refresh
+            max_id, since = self._watermark(connection)
+            kept = self._kept(connection, max_id)
+            dictionaries = {field: Dictionary() for field in DICTIONARY_FIELDS}
+            result = connection.execution_options(yield_per=LOAD_CHUNK)\
+                .execute(select(*COLUMNS).where(LISTED).order_by(Job.id))
+            main = Segment(result.partitions(), dictionaries)
+            state = IndexState(main, bytearray(b'\x01' * len(main)), Segment([], dictionaries),
+                               self._aliases(connection), max_id, since, kept)
+        self._state = state
+        self.data_version = version
+        self.loaded_at = self.refreshed_at = datetime.utcnow()
+        self._ready.set()
+        logging.info(f"Loaded job index: {len(main)} jobs in {time.perf_counter() - started:.1f}s")
+        return len(main)
+
+    def refresh(self, engine: Engine) -> Dict[str, int]:
+        """Apply rows inserted or updated since the last load or refresh
+
+        Falls back to a full load when rows were deleted or the delta has
+        grown too large. Returns counts of changed rows and delta size.
+        """
+        with self._lock:
+            return self._refresh(engine)
+
+    def _refresh(self, engine: Engine) -> Dict[str, int]:
+        state = self._state
+        if state is None:
+            return {'changed': self._load(engine), 'delta': 0, 'reloaded': 1}
+        version = self.version() if self.version else None
+        with engine.connect() as connection:
+            max_id, since = self._watermark(connection)
+            if self._kept(connection, state.max_id) != state.kept:
+                # Rows the index has seen were deleted (archived) since the last refresh
+                return {'changed': self._load(engine), 'delta': 0, 'reloaded': 1}
+            changed = connection.execute(
+                select(*COLUMNS, LISTED.label('listed'))
+                .where(or_(Job.id > state.max_id, Job.updated_at >= state.since - REFRESH_OVERLAP))
+                .order_by(Job.id)
+            ).fetchall()
+            aliases = self._aliases(connection)
+        inserted = sum(1 for row in changed if state.max_id < row.id <= max_id)
+
+        main, alive = state.main, state.alive
+        delta = {job_id: state.delta.row(slot) for slot, job_id in enumerate(state.delta.ids)}
+        applied = 0
+        for row in changed:
+            wanted = tuple(row[:-1]) if row.listed else None
+            slot = main.slot_of(row.id)
+            shadowed = slot is not None and alive[slot]
+            current = delta.get(row.id) or (main.row(slot) if shadowed else None)
+            if wanted == current:
+                continue
+            applied += 1
+            if shadowed:
+                if alive is state.alive:
+                    alive = bytearray(alive)
+                alive[slot] = 0
+            if wanted is None:
+                delta.pop(row.id, None)
+            else:
+                delta[row.id] = wanted
+        if len(delta) > max(COMPACT_MIN_ROWS, len(main) // 16):
+            return {'changed': self._load(engine), 'delta': 0, 'reloaded': 1}
+
+        if applied:
+            segment = Segment([[delta[job_id] for job_id in sorted(delta)]], main.dictionaries)
+        else:
+            segment = state.delta
+        self._state = IndexState(main, alive, segment, aliases, max(max_id, state.max_id), since,
+                                 state.kept + inserted)
+        self.data_version = version
+        self.refreshed_at = datetime.utcnow()
+        return {'changed': applied, 'delta': len(segment), 'reloaded': 0}
+
+    def page(self, sort: str = DEFAULT_SORT, cursor: Optional[str] = None, per_page: int = 50,
+             keyword: str = '', location: str = '', company: str = '') -> Optional[KeysetPage]:
+        """The keyset page keyset_page would return for apply_job_filters(...)
+
+        Returns None when the index can't answer (not loaded yet, keyword
+        search, or a location pattern with LIKE wildcards), so the caller
+        runs the SQL query. Raises InvalidCursor like keyset_page.
+        """
+        state = self._state
+        if state is None or keyword or not _plain_text(location):
+            return None
+        if sort not in SORT_KEYS:
+            sort = DEFAULT_SORT
+        direction, values = decode_cursor(cursor, sort) if cursor else ('next', None)
+        bound = None
+        if values is not None:
+            bound = self._bound(sort, values)
+            if bound is None:
+                return None
+        forward = direction == 'next'
+        companies = None
+        if company:
+            name = normalize_company(company)
+            if not name:
+                # Suffix-only names ("Inc") match the scraped text, which the index doesn't keep
+                return None
+            companies = {company_id for key, company_id in state.aliases if name in key}
+        locations = None
+        if location:
+            needle = location.lower()
+            locations = {code for code, value in enumerate(state.main.dictionaries['location'].values)
+                         if value is not None and needle in value.lower()}
+
+        limit = per_page + 1
+        found = []
+        for segment, alive in ((state.main, state.alive), (state.delta, None)):
+            for slot in segment.candidates(sort, bound, forward, limit, alive, companies, locations):
+                found.append((segment.key(sort, slot), segment, slot))
+        found.sort(key=itemgetter(0), reverse=not forward)
+        rows = [segment.job(slot) for _, segment, slot in found[:limit]]
+        return page_from_rows(rows, sort, direction, values is not None, per_page)
+
+    @staticmethod
+    def _bound(sort: str, values: list) -> Optional[tuple]:
+        """Cursor key values as a permutation key, None if they aren't of the sort's types"""
+        value, job_id = values
+        if not isinstance(job_id, int):
+            return None
+        if sort == 'posted_date':
+            if value is not None and not isinstance(value, datetime):
+                return None
+            return -_micros(value), -job_id
+        return (value, job_id) if isinstance(value, str) else None
+
+    def start(self, engine_source: Callable[[], Engine], interval: float) -> threading.Thread:
+        """Load, then refresh every `interval` seconds (0: never), in a daemon thread
+
+        Engines come from `engine_source`. Until the load finishes page()
+        returns None, so requests are answered by SQL.
+        """
+        def run():
+            if not self.loaded:
+                try:
+                    self.load(engine_source())
+                except Exception as e:
+                    logging.error(f"Error loading job index: {str(e)}")
+            while interval > 0 and not self._stop.wait(interval):
+                try:
+                    self.refresh(engine_source())
+                except Exception as e:
+                    logging.error(f"Error refreshing job index: {str(e)}")
+        thread = threading.Thread(target=run, name='job-index-refresh', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Row counts and the approximate size of the columns"""
+        state = self._state
+        if state is None:
+            return {'loaded': False}
+        segments = (state.main, state.delta)
+        column_bytes = sum(
+            sum(column.buffer_info()[1] * column.itemsize for column in chain(
+                (s.ids, s.posted, s.company_ids, s.salary_min, s.salary_max, s.is_remote, s.urls.offsets),
+                s.codes.values(), s.order.values(), s.position.values())) + len(s.urls.data)
+            for s in segments)
+        return {
+            'loaded': True,
+            'jobs': len(state),
+            'delta': len(state.delta),
+            'distinct': {field: len(d.values) - 1 for field, d in state.main.dictionaries.items()},
+            'column_bytes': column_bytes,
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+        }
@@ -0,0 +1,231 @@
+"""Dictionary-encoded companies and locations.
+
+Every job repeats its company and location as free text, spelled however
+each board spells them ("Acme, Inc." / "ACME"; "Austin, Texas" / "Austin,
+TX, United States"). Each distinct company and location is stored once, in
+`companies` and `locations`, and jobs refer to it by `company_id` and
+`location_id`, so distinct counts, company filters and facets work on small
+integer columns. The text columns on jobs keep the value as scraped, for
+display, sorting and full-text search.
+
+A company is identified by its normalized name (no case, punctuation or
+legal suffixes). Every normalized spelling maps to its company through
+`company_aliases`; `python -m app.database.lookups alias "Facebook" "Meta"`
+makes one company an alias of another and moves its jobs over. A location
+is identified by its parsed city and state where it has them.
+
+IDs are assigned on every write path: upserts encode their rows and a
+before_flush hook covers ORM writes. `python -m app.database.lookups
+backfill` encodes rows stored before.
+"""
+import argparse
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, event, inspect, select
+from sqlalchemy.dialects import sqlite, postgresql
+from sqlalchemy.orm import Session
+
+from .fields import parse_location
+from .models import Job, Company, CompanyAlias, Location
+
+WORD = re.compile(r'[a-z0-9]+')
+COMPANY_SUFFIXES = {'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company', 'plc', 'gmbh'}
+CHUNK_SIZE = 500
+ENCODED_FIELDS = ('company_id', 'location_id')
+
+_companies = Company.__table__
+_aliases = CompanyAlias.__table__
+_locations = Location.__table__
+_jobs = Job.__table__
+FIND_ALIASES = select(_aliases.c.key, _aliases.c.company_id).where(_aliases.c.key.in_(bindparam('keys', expanding=True)))
+FIND_COMPANIES = select(_companies.c.key, _companies.c.id).where(_companies.c.key.in_(bindparam('keys', expanding=True)))
+FIND_LOCATIONS = select(_locations.c.key, _locations.c.id).where(_locations.c.key.in_(bindparam('keys', expanding=True)))
+ENCODE_JOB = _jobs.update().where(_jobs.c.id == bindparam('_id'))\
+    .values(company_id=bindparam('_company_id'), location_id=bindparam('_location_id'))
+
+def normalize_company(company: Optional[str]) -> str:
+    """Company name without case, punctuation or legal suffixes ("Acme, Inc." -> "acme")"""
+    words = WORD.findall((company or '').lower())
+    return ' '.join(word for word in words if word not in COMPANY_SUFFIXES)
+
+def location_key(location: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Lookup row (key, display name, city, state) for a location string, None if it is empty"""
+    city, state = parse_location(location)
+    if state:
+        return {'key': f"{(city or '').lower()}|{state}", 'name': f"{city}, {state}" if city else state,
+                'city': city, 'state': state}
+    key = ' '.join(WORD.findall((location or '').lower()))
+    if not key:
+        return None
+    return {'key': key, 'name': location.strip(), 'city': city, 'state': None}
+
+def _insert_missing(connection, table):
+    """INSERT that skips rows whose unique key already exists, for the connection's dialect"""
+    insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    return insert(table).on_conflict_do_nothing()
+
+def _chunks(values: Iterable, size: int = CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def _find(connection, statement, keys) -> Dict[str, int]:
+    found = {}
+    for chunk in _chunks(keys):
+        found.update(connection.execute(statement, {'keys': chunk}).fetchall())
+    return found
+
+def company_ids(connection, names: Iterable[Optional[str]]) -> Dict[str, int]:
+    """Company ID for each name as scraped, adding companies not seen before"""
+    keys = {name: normalize_company(name) for name in dict.fromkeys(names) if name}
+    keys = {name: key for name, key in keys.items() if key}
+    found = _find(connection, FIND_ALIASES, set(keys.values()))
+    # A new company is named after its first spelling
+    missing = {}
+    for name, key in keys.items():
+        if key not in found:
+            missing.setdefault(key, name.strip())
+    if missing:
+        connection.execute(_insert_missing(connection, _companies), [
+            {'key': key, 'name': name} for key, name in missing.items()
+        ])
+        created = _find(connection, FIND_COMPANIES, missing)
+        connection.execute(_insert_missing(connection, _aliases), [
+            {'key': key, 'company_id': company_id} for key, company_id in created.items()
+        ])
+        found.update(created)
+    return {name: found[key] for name, key in keys.items()}
+
+def location_ids(connection, locations: Iterable[Optional[str]]) -> Dict[str, int]:
+    """Location ID for each location string as scraped, adding locations not seen before"""
+    rows = {location: location_key(location) for location in dict.fromkeys(locations) if location}
+    rows = {location: row for location, row in rows.items() if row}
+    found = _find(connection, FIND_LOCATIONS, {row['key'] for row in rows.values()})
+    missing = {}
+    for row in rows.values():
+        if row['key'] not in found:
+            missing.setdefault(row['key'], row)
+    if missing:
+        connection.execute(_insert_missing(connection, _locations), list(missing.values()))
+        found.update(_find(connection, FIND_LOCATIONS, missing))
+    return {location: found[row['key']] for location, row in rows.items()}
+
+def encode_rows(connection, rows: List[Dict[str, Any]]):
+    """Set company_id/location_id on job rows (dicts) from their company/location text"""
+    companies = company_ids(connection, (row.get('company') for row in rows))
+    locations = location_ids(connection, (row.get('location') for row in rows))
+    for row in rows:
+        row['company_id'] = companies.get(row.get('company'))
+        row['location_id'] = locations.get(row.get('location'))
+
+def encode_jobs(connection, jobs: List[Job]):
+    """Set company_id/location_id on Job objects from their company/location text"""
+    companies = company_ids(connection, (job.company for job in jobs))
+    locations = location_ids(connection, (job.location for job in jobs))
+    for job in jobs:
+        job.company_id = companies.get(job.company)
+        job.location_id = locations.get(job.location)
+
+@event.listens_for(Session, 'before_flush')
+def _encode_flushed_jobs(session, flush_context, instances):
+    """Encode jobs added or re-labelled through the ORM"""
+    jobs = [obj for obj in session.new if isinstance(obj, Job)]
+    for obj in session.dirty:
+        if isinstance(obj, Job):
+            state = inspect(obj)
+            if state.attrs.company.history.has_changes() or state.attrs.location.history.has_changes():
+                jobs.append(obj)
+    if jobs:
+        encode_jobs(session.connection(), jobs)
+
+def matching_companies(name: str):
+    """Subquery of the IDs of companies with a spelling containing `name` (for IN filters)"""
+    return select(CompanyAlias.company_id)\
+        .where(CompanyAlias.key.like(f"%{normalize_company(name)}%"))\
+        .distinct()\
+        .scalar_subquery()
+
+def company_filter(name: str):
+    """Job filter for companies named like `name`
+
+    Names that are nothing but a legal suffix or punctuation ("Inc", "LLC")
+    have no normalized key to look up, so they match the scraped text instead.
+    """
+    if not normalize_company(name):
+        return Job.company.ilike(f'%{name}%')
+    return Job.company_id.in_(matching_companies(name))
+
+def company_names(connection, ids: Iterable) -> Dict[int, str]:
+    """Display names of companies by ID"""
+    ids = {int(company_id) for company_id in ids}
+    names = {}
+    for chunk in _chunks(ids):
+        names.update(connection.execute(select(Company.id, Company.name).where(Company.id.in_(chunk))).fetchall())
+    return names
+
+def add_alias(connection, alias: str, company: str) -> int:
+    """Make `alias` a spelling of `company`, merging the alias's own company into it
+
+    Returns the number of jobs moved to `company`.
+    """
+    key = normalize_company(alias)
+    if not key:
+        raise ValueError(f"'{alias}' has no letters or digits to match on")
+    target = company_ids(connection, [company])[company]
+    previous = connection.execute(select(_aliases.c.company_id).where(_aliases.c.key == key)).scalar()
+    if previous == target:
+        return 0
+    if previous is None:
+        connection.execute(_aliases.insert().values(key=key, company_id=target))
+        return 0
+    # The alias stood for a company of its own: every spelling and job of it moves over
+    connection.execute(_aliases.update().where(_aliases.c.company_id == previous).values(company_id=target))
+    moved = connection.execute(_jobs.update().where(_jobs.c.company_id == previous).values(company_id=target)).rowcount
+    connection.execute(_companies.delete().where(_companies.c.id == previous))
+    return moved
+
+def backfill(connection, batch_size: int = 1000) -> Dict[str, int]:
+    """Encode every job's company and location, in ID order; returns the number of rows"""
+    updated, last_id = 0, 0
+    while True:
+        rows = connection.execute(
+            select(_jobs.c.id, _jobs.c.company, _jobs.c.location)
+            .where(_jobs.c.id > last_id)
+            .order_by(_jobs.c.id)
+            .limit(batch_size)
+        ).mappings().all()
+        if not rows:
+            return {'updated': updated}
+        rows = [dict(row) for row in rows]
+        encode_rows(connection, rows)
+        connection.execute(ENCODE_JOB, [
+            {'_id': row['id'], '_company_id': row['company_id'], '_location_id': row['location_id']} for row in rows
+        ])
+        updated += len(rows)
+        last_id = rows[-1]['id']
+
+def main(argv=None) -> int:
+    from .engine import get_engine
+
+    parser = argparse.ArgumentParser(description='Maintain the company and location lookup tables')
+    commands = parser.add_subparsers(dest='command', required=True)
+    backfill_command = commands.add_parser('backfill', help='encode the company and location of every job')
+    backfill_command.add_argument('--batch-size', type=int, default=1000)
+    alias_command = commands.add_parser('alias', help='treat one company name as another')
+    alias_command.add_argument('alias')
+    alias_command.add_argument('company')
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    with engine.begin() as conn:
+        if args.command == 'backfill':
+            print(f"Encoded {backfill(conn, batch_size=args.batch_size)['updated']} jobs")
+        else:
+            moved = add_alias(conn, args.alias, args.company)
+            print(f"'{args.alias}' is now an alias of '{args.company}' ({moved} jobs moved)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
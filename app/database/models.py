@@ -1,45 +1,257 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, Float, Boolean, LargeBinary, ForeignKey, Index, DDL, event, true, create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 
+from . import fts, aggregates
+from .compression import CompressedText, DICTIONARY_TABLE, digest
+
 Base = declarative_base()
 
 class Job(Base):
     __tablename__ = 'jobs'
+    __table_args__ = (
+        Index('ix_jobs_job_key', 'job_key', unique=True),
+        Index('ix_jobs_posted_date', 'posted_date'),
+        Index('ix_jobs_source_posted_date', 'source', 'posted_date'),
+        # Web listing subset (see queries.us_software_filter), one per sort order
+        Index('ix_jobs_classification_posted_date', 'is_us', 'role_family', 'posted_date'),
+        Index('ix_jobs_classification_company', 'is_us', 'role_family', 'company'),
+        Index('ix_jobs_classification_title', 'is_us', 'role_family', 'title'),
+        # Statistics (JobRepository.get_job_statistics) read only these covering indexes
+        Index('ix_jobs_active_company_id', 'is_active', 'company_id'),
+        Index('ix_jobs_active_location_id', 'is_active', 'location_id'),
+        Index('ix_jobs_active_location', 'is_active', 'state', 'city'),
+        Index('ix_jobs_active_salary', 'is_active', 'salary_period', 'salary_min', 'salary_max'),
+        Index('ix_jobs_active_job_type', 'is_active', 'job_type'),
+        Index('ix_jobs_canonical_id', 'canonical_id'),
+        # Changed rows since a point in time (the web tier's in-memory job index polls it)
+        Index('ix_jobs_updated_at', 'updated_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     title = Column(String(200), nullable=False)
     company = Column(String(200), nullable=False)
     location = Column(String(200))
-    description = Column(Text)
+    # Dictionary-encoded company and location (see app.database.lookups); the text above is as scraped.
+    # Plain integers like canonical_id: adding a foreign key to jobs would rebuild the table on SQLite
+    company_id = Column(Integer)
+    location_id = Column(Integer)
+    # Stored compressed (see compression.py) and only loaded when accessed or undeferred
+    description = deferred(Column(CompressedText))
+    # compression.digest() of the description, for telling whether a re-scraped posting changed
+    description_hash = Column(LargeBinary(8))
     url = Column(String(500))
+    job_key = Column(String(500))  # source:posting-id or canonical URL
     source = Column(String(50))
     posted_date = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     salary = Column(String(200))
+    # Parsed from salary/location/job type by app.database.fields
+    salary_min = Column(Float)
+    salary_max = Column(Float)
+    salary_period = Column(String(10))  # hour, day, week, month, year
+    city = Column(String(100))
+    state = Column(String(2))
+    job_type = Column(String(20))
+    is_active = Column(Boolean, default=True, server_default=true(), nullable=False)
+    # Set from title/location by app.database.classifier
+    is_us = Column(Boolean)
+    role_family = Column(String(20))
+    is_remote = Column(Boolean)
+    # Set by app.database.dedup when this posting is a near duplicate of an earlier one (NULL = canonical)
+    canonical_id = Column(Integer)
     applications = relationship('JobApplication', backref='job', lazy=True)
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_description: bool = False):
+        data = {
             'id': self.id,
             'title': self.title,
             'company': self.company,
             'location': self.location,
-            'description': self.description,
             'url': self.url,
             'source': self.source,
             'posted_date': self.posted_date.isoformat() if self.posted_date else None,
-            'salary': self.salary
+            'salary': self.salary,
+            'salary_min': self.salary_min,
+            'salary_max': self.salary_max,
+            'salary_period': self.salary_period,
+            'city': self.city,
+            'state': self.state,
+            'job_type': self.job_type,
+            'role_family': self.role_family,
+            'is_remote': self.is_remote,
+            'canonical_id': self.canonical_id
         }
+        if include_description:
+            data['description'] = self.description
+        return data
+
+# Full-text index over jobs, created alongside the table on SQLite
+for statement in fts.CREATE_STATEMENTS:
+    event.listen(Job.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in fts.DROP_STATEMENTS:
+    event.listen(Job.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+
+# Incrementally maintained counters (see aggregates.py)
+for statement in aggregates.CREATE_STATEMENTS:
+    event.listen(Job.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in aggregates.DROP_STATEMENTS:
+    event.listen(Job.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+for statement in aggregates.DUPLICATE_CREATE_STATEMENTS:
+    event.listen(Job.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in aggregates.DUPLICATE_DROP_STATEMENTS:
+    event.listen(Job.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+
+for statement in aggregates.ENCODED_CREATE_STATEMENTS:
+    event.listen(Job.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in aggregates.ENCODED_DROP_STATEMENTS:
+    event.listen(Job.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+
+for statement in aggregates.STATISTICS_CREATE_STATEMENTS:
+    event.listen(Job.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in aggregates.STATISTICS_DROP_STATEMENTS:
+    event.listen(Job.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+
+@event.listens_for(Job.description, 'set')
+def _hash_description(job, value, oldvalue, initiator):
+    """Keep description_hash in step with descriptions written through the ORM"""
+    job.description_hash = digest(value)
+
+class Company(Base):
+    """A company, once however many spellings it is scraped under (see lookups.py)"""
+    __tablename__ = 'companies'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(200), nullable=False)  # display name: the first spelling seen
+    key = Column(String(200), nullable=False, unique=True)  # normalized name
+
+class CompanyAlias(Base):
+    """A normalized company spelling and the company it stands for"""
+    __tablename__ = 'company_aliases'
+
+    key = Column(String(200), primary_key=True)
+    company_id = Column(Integer, ForeignKey('companies.id'), nullable=False, index=True)
+
+class Location(Base):
+    """A location, identified by its parsed city and state where it has them"""
+    __tablename__ = 'locations'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(200), nullable=False)
+    key = Column(String(200), nullable=False, unique=True)
+    city = Column(String(100))
+    state = Column(String(2))
+
+class DescriptionDictionary(Base):
+    """Preset compression dictionary for job descriptions (never modified once written)"""
+    __tablename__ = DICTIONARY_TABLE
+
+    id = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    sample_size = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class JobSignature(Base):
+    """MinHash signature of a job, for near-duplicate detection (see dedup.py)"""
+    __tablename__ = 'job_signatures'
+
+    job_id = Column(Integer, primary_key=True, autoincrement=False)
+    signature = Column(LargeBinary, nullable=False)
+
+class JobLshBucket(Base):
+    """One LSH band bucket a job's signature falls in"""
+    __tablename__ = 'job_lsh_buckets'
+    __table_args__ = {'sqlite_with_rowid': False}
+
+    key = Column(BigInteger, primary_key=True, autoincrement=False)
+    job_id = Column(Integer, primary_key=True, autoincrement=False)
 
 class JobApplication(Base):
     __tablename__ = 'job_applications'
     
     id = Column(Integer, primary_key=True)
-    job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
+    job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False, index=True)
     status = Column(String(50), default='viewed')  # viewed, interested, applied, not_interested
     notes = Column(Text)
     applied_date = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+for statement in aggregates.APPLICATION_CREATE_STATEMENTS:
+    event.listen(JobApplication.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in aggregates.APPLICATION_DROP_STATEMENTS:
+    event.listen(JobApplication.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+
+class ScrapeRun(Base):
+    __tablename__ = 'scrape_runs'
+    
+    id = Column(Integer, primary_key=True)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime)
+    status = Column(String(20), default='running')  # running, success, partial, failed
+    requests = Column(Integer, default=0)
+    pages_fetched = Column(Integer, default=0)
+    cards_parsed = Column(Integer, default=0)
+    new_jobs = Column(Integer, default=0)
+    duplicate_jobs = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    p50_latency_ms = Column(Float)
+    p95_latency_ms = Column(Float)
+    sources = relationship('ScrapeRunSource', backref='run', lazy=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'status': self.status,
+            'requests': self.requests,
+            'pages_fetched': self.pages_fetched,
+            'cards_parsed': self.cards_parsed,
+            'new_jobs': self.new_jobs,
+            'duplicate_jobs': self.duplicate_jobs,
+            'errors': self.errors,
+            'p50_latency_ms': self.p50_latency_ms,
+            'p95_latency_ms': self.p95_latency_ms,
+            'sources': [source.to_dict() for source in self.sources]
+        }
+
+class ScrapeRunSource(Base):
+    __tablename__ = 'scrape_run_sources'
+    
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey('scrape_runs.id'), nullable=False, index=True)
+    source = Column(String(50), nullable=False)
+    query = Column(String(200))
+    location = Column(String(200))
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    requests = Column(Integer, default=0)
+    pages_fetched = Column(Integer, default=0)
+    cards_parsed = Column(Integer, default=0)
+    new_jobs = Column(Integer, default=0)
+    duplicate_jobs = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    p50_latency_ms = Column(Float)
+    p95_latency_ms = Column(Float)
+    error_message = Column(Text)
+    
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'query': self.query,
+            'location': self.location,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'requests': self.requests,
+            'pages_fetched': self.pages_fetched,
+            'cards_parsed': self.cards_parsed,
+            'new_jobs': self.new_jobs,
+            'duplicate_jobs': self.duplicate_jobs,
+            'errors': self.errors,
+            'p50_latency_ms': self.p50_latency_ms,
+            'p95_latency_ms': self.p95_latency_ms,
+            'error_message': self.error_message
+        }
@@ -0,0 +1,126 @@
+"""Keyset (cursor) pagination for job listings.
+
+OFFSET pagination makes SQLite walk and discard every row before the page,
+so deep pages get linearly slower. A keyset page instead continues from the
+sort key of the last row it returned: `(posted_date, id) < (:posted, :id)`
+seeks straight to the next row through the listing index, so every page
+costs the same.
+
+Cursors are opaque URL-safe tokens carrying the sort name, direction and
+the boundary row's key values.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_, select, func
+
+from .models import Job
+
+# sort name -> (key columns, descending); id breaks ties so the order is total
+SORT_KEYS: Dict[str, Tuple[tuple, bool]] = {
+    'posted_date': ((Job.posted_date, Job.id), True),
+    'company': ((Job.company, Job.id), False),
+    'title': ((Job.title, Job.id), False),
+}
+DEFAULT_SORT = 'posted_date'
+
+class InvalidCursor(ValueError):
+    """A cursor token that is malformed or was issued for another sort order"""
+
+class KeysetPage:
+    """One page of a keyset-paginated query"""
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str], prev_cursor: Optional[str]):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total: Optional[int] = None
+        self.total_is_estimate = False
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+def _encode_value(value):
+    return {'dt': value.isoformat()} if isinstance(value, datetime) else value
+
+def _decode_value(value):
+    return datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+
+def encode_cursor(sort: str, direction: str, values) -> str:
+    payload = json.dumps([sort, direction, [_encode_value(value) for value in values]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token: str, sort: str) -> Tuple[str, list]:
+    """(direction, key values) from a cursor token issued for `sort`"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        cursor_sort, direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(value) for value in values]
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor(f"Malformed cursor: {e}")
+    if cursor_sort != sort or direction not in ('next', 'prev') or len(values) != len(SORT_KEYS[sort][0]):
+        raise InvalidCursor("Cursor does not match the requested sort order")
+    return direction, values
+
+def keyset_page(query, sort: str = DEFAULT_SORT, cursor: Optional[str] = None, per_page: int = 50) -> KeysetPage:
+    """Fetch the page after (or before) `cursor` from an unordered Job query
+
+    Raises InvalidCursor for tokens that don't belong to this sort order.
+    """
+    if sort not in SORT_KEYS:
+        sort = DEFAULT_SORT
+    columns, descending = SORT_KEYS[sort]
+    direction, values = decode_cursor(cursor, sort) if cursor else ('next', None)
+
+    # Walking backwards flips both the comparison and the order, then the page is reversed
+    forward = direction == 'next'
+    reverse = descending if forward else not descending
+    if values is not None:
+        key, bound = tuple_(*columns), tuple_(*values)
+        query = query.filter(key < bound if reverse else key > bound)
+    query = query.order_by(*[column.desc() if reverse else column.asc() for column in columns])
+
+    return page_from_rows(query.limit(per_page + 1).all(), sort, direction, values is not None, per_page)
+
+def page_from_rows(rows: List[Any], sort: str, direction: str, has_cursor: bool, per_page: int) -> KeysetPage:
+    """KeysetPage from up to per_page + 1 rows fetched in `direction` order from a cursor
+
+    Shared by keyset_page and the in-memory job index, so both hand out the
+    same cursors.
+    """
+    columns, _ = SORT_KEYS[sort]
+    forward = direction == 'next'
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    def cursor_for(row, to):
+        return encode_cursor(sort, to, [getattr(row, column.key) for column in columns])
+
+    has_next = more if forward else has_cursor
+    has_prev = has_cursor if forward else more
+    return KeysetPage(
+        rows,
+        next_cursor=cursor_for(rows[-1], 'next') if rows and has_next else None,
+        prev_cursor=cursor_for(rows[0], 'prev') if rows and has_prev else None
+    )
+
+def capped_count(query, limit: int) -> Tuple[int, bool]:
+    """Count a query's rows, stopping at `limit`; returns (count, is_estimate)
+
+    Past the cap the count is reported as `limit` and flagged as an estimate,
+    so a broad filter can't turn a page view into a full scan.
+    """
+    subquery = query.with_entities(Job.id).order_by(None).limit(limit + 1).subquery()
+    count = query.session.execute(select(func.count()).select_from(subquery)).scalar()
+    if count > limit:
+        return limit, True
+    return count, False
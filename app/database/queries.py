@@ -0,0 +1,96 @@
+from typing import Optional
+
+from sqlalchemy import String, and_, func, literal, or_
+
+from config.config import Config
+from .models import Job
+from .classifier import SOFTWARE_JOB_KEYWORDS
+from . import fts
+from .compression import decompressed
+from .lookups import company_filter
+
+SORT_COLUMNS = {
+    'posted_date': Job.posted_date.desc(),
+    'company': Job.company,
+    'title': Job.title
+}
+KEYWORD_COLUMNS = ('title', 'description')
+
+def us_software_filter():
+    """US jobs with a software engineering title (the subset the web UI shows)
+
+    Uses the columns the classifier fills at ingest, so it is an index lookup
+    rather than a text match.
+    """
+    return and_(Job.is_us == True, Job.role_family == 'software')
+
+def _text(column: str):
+    return decompressed(Job.description) if column == 'description' else getattr(Job, column)
+
+def _substring_filter(keyword: str, columns):
+    return or_(*[_text(column).ilike(f'%{keyword}%') for column in columns])
+
+def _word_prefix_filter(token: str, columns):
+    """Rows with a word starting with `token` in any column, like FTS5's "token"* but without the index"""
+    # GLOB is case-sensitive; tokens are lowercase word characters, none of them special to GLOB
+    return or_(*[
+        func.lower(literal(' ', String) + _text(column)).op('GLOB')(f'*[^a-z0-9]{token}*')
+        for column in columns
+    ])
+
+def keyword_scans(session, keyword: str, columns=KEYWORD_COLUMNS) -> bool:
+    """Whether keyword_filter matches `keyword` by scanning rather than through the FTS index
+
+    True when the keyword is found in at least KEYWORD_SCAN_DENSITY of the
+    newest jobs: the IN list of its matches would hold most of the table
+    before sorting, while a scan in listing order fills a page (or reaches
+    the count limit) after a few rows per match.
+    """
+    if not fts.fts_available(session.get_bind()) or fts.match_query(keyword) is None:
+        return False
+    return fts.match_density(session, keyword, list(columns)) >= Config.KEYWORD_SCAN_DENSITY
+
+def keyword_filter(query, keyword: str, columns=KEYWORD_COLUMNS, scan: Optional[bool] = None):
+    """Filter a Job query by keyword, through the FTS5 index when the database has one
+
+    With the index, keywords match word prefixes ("dev" finds "developer",
+    "end" doesn't find "backend"), whether they are looked up in the index
+    or, for common keywords (see keyword_scans), by scanning in listing
+    order; pass `scan` to reuse a decision made for another query on the
+    same keyword. Without it, ILIKE matches substrings anywhere in the text.
+    """
+    if fts.fts_available(query.session.get_bind()):
+        expression = fts.match_query(keyword, list(columns))
+        if expression is None:
+            return query
+        if scan is None:
+            scan = keyword_scans(query.session, keyword, columns)
+        if not scan:
+            return query.filter(Job.id.in_(fts.matching_ids(expression)))
+        return query.filter(and_(*[_word_prefix_filter(token, columns) for token in fts.TOKEN.findall(keyword.lower())]))
+
+    return query.filter(_substring_filter(keyword, columns))
+
+def apply_job_filters(query, keyword: str = '', location: str = '', company: str = '', scan: Optional[bool] = None):
+    """Apply the web list/API filters to a Job query
+
+    Near duplicates (see dedup.py) are left out, so each opening is listed
+    once whichever boards it was posted on. `scan` is passed on to
+    keyword_filter.
+    """
+    query = query.filter(us_software_filter(), Job.canonical_id.is_(None))
+
+    if keyword:
+        query = keyword_filter(query, keyword, scan=scan)
+    if location:
+        query = query.filter(Job.location.ilike(f'%{location}%'))
+    if company:
+        # Matched against the few thousand company spellings, then by company_id
+        query = query.filter(company_filter(company))
+    return query
+
+def apply_job_sort(query, sort_by: str = 'posted_date'):
+    """Order a Job query by one of the supported sort keys"""
+    if sort_by in SORT_COLUMNS:
+        query = query.order_by(SORT_COLUMNS[sort_by])
+    return query
@@ -0,0 +1,102 @@
+"""EXPLAIN QUERY PLAN checks for the queries the web tier runs.
+
+Run `python -m app.database.query_plan` to check the configured database;
+it exits non-zero if a query stops using its index.
+"""
+import sys
+from typing import Callable, Dict, List, Any
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import Job, JobApplication
+from .queries import apply_job_filters, apply_job_sort, us_software_filter
+
+# name -> (query builder, index the plan must use)
+WEB_QUERIES: Dict[str, tuple] = {
+    'job_list_by_posted_date': (
+        lambda session: apply_job_sort(apply_job_filters(session.query(Job)), 'posted_date').limit(50),
+        'ix_jobs_classification_posted_date'
+    ),
+    'job_list_by_company': (
+        lambda session: apply_job_sort(apply_job_filters(session.query(Job)), 'company').limit(50),
+        'ix_jobs_classification_company'
+    ),
+    'job_list_by_title': (
+        lambda session: apply_job_sort(apply_job_filters(session.query(Job)), 'title').limit(50),
+        'ix_jobs_classification_title'
+    ),
+    'job_list_keyword': (
+        lambda session: apply_job_sort(apply_job_filters(session.query(Job), keyword='python dev'), 'posted_date').limit(50),
+        'jobs_fts'
+    ),
+    'about_total_jobs': (
+        lambda session: session.query(Job.id).filter(us_software_filter()),
+        'ix_jobs_classification'
+    ),
+    'job_by_key': (
+        lambda session: session.query(Job).filter(Job.job_key == 'linkedin:1'),
+        'ix_jobs_job_key'
+    ),
+    'job_detail_application': (
+        lambda session: session.query(JobApplication).filter_by(job_id=1).limit(1),
+        'ix_job_applications_job_id'
+    ),
+    'about_distinct_companies': (
+        lambda session: session.query(Job.company_id).filter(Job.is_active == True).distinct(),
+        'ix_jobs_active_company_id'
+    ),
+    'stats_salary': (
+        lambda session: session.query(func.avg(Job.salary_min))
+            .filter(Job.is_active == True, Job.salary_period == 'year'),
+        'ix_jobs_active_salary'
+    ),
+    'stats_top_states': (
+        lambda session: session.query(Job.state, func.count())
+            .filter(Job.is_active == True, Job.state.isnot(None))
+            .group_by(Job.state),
+        'ix_jobs_active_location'
+    ),
+}
+
+def explain(session: Session, query) -> List[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+    statement = query.statement.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={'literal_binds': True}
+    )
+    rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}")
+    return [row[-1] for row in rows]
+
+def check_web_query_plans(session: Session, queries: Dict[str, tuple] = None) -> Dict[str, Dict[str, Any]]:
+    """Explain each web query and report whether it uses its expected index"""
+    results = {}
+    for name, (build, index) in (queries or WEB_QUERIES).items():
+        plan = explain(session, build(session))
+        results[name] = {
+            'index': index,
+            'plan': plan,
+            'ok': any(index in line for line in plan)
+        }
+    return results
+
+def main() -> int:
+    from . import get_session
+
+    session = get_session()
+    try:
+        results = check_web_query_plans(session)
+    finally:
+        session.close()
+
+    failed = 0
+    for name, result in results.items():
+        status = 'OK  ' if result['ok'] else 'FAIL'
+        failed += not result['ok']
+        print(f"{status} {name} (expects {result['index']})")
+        for line in result['plan']:
+            print(f"       {line}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Compact in-memory form of a scraped job, from the card parser to the bulk insert.
+
+A scrape run holds every parsed card until it is written, and the ingest
+queue buffers up to INGEST_QUEUE_SIZE more. As dicts each card costs a
+hash table, and the board name, company and location are separate string
+objects on every card even though a run sees the same few hundred values
+over and over. A JobRecord is a slotted object with fixed fields, and those
+three strings are interned, so repeated values share one copy.
+
+Records read like the job_data dicts they replace (`record.get('url')`), so
+identity, classification and field parsing take either; JobRepository.upsert_many
+turns them straight into insert parameters without building ORM objects.
+"""
+import sys
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+# Repeated across the cards of a run, so stored once per distinct value
+INTERNED_FIELDS = ('source', 'company', 'location')
+
+@dataclass(slots=True)
+class JobRecord:
+    """One scraped job posting"""
+    title: str
+    company: str
+    location: Optional[str] = None
+    url: Optional[str] = None
+    source: Optional[str] = None
+    posted_date: Union[datetime, str, None] = None  # as the board shows it; parsed at ingest
+    salary: Optional[str] = None
+    description: Optional[str] = None
+    job_type: Optional[str] = None
+    job_key: Optional[str] = None
+
+    def __post_init__(self):
+        for field in INTERNED_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                setattr(self, field, sys.intern(value))
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """dict.get for code written against job_data dicts"""
+        value = getattr(self, field, None)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The fields that are set, as a job_data dict"""
+        return {field: value for field in FIELD_NAMES if (value := getattr(self, field)) is not None}
+
+FIELD_NAMES = tuple(field.name for field in fields(JobRecord))
+
+# What the ingest path accepts: a record or a job_data dict with the same keys
+JobData = Union[JobRecord, Dict[str, Any]]
+
+def as_dict(job_data: JobData) -> Dict[str, Any]:
+    """job_data as a plain dict (for JSON), whichever form it came in"""
+    return job_data.to_dict() if isinstance(job_data, JobRecord) else job_data
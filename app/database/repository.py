@@ -1,20 +1,71 @@
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session, contains_eager
-from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session, contains_eager, aliased, selectinload, undefer
+from sqlalchemy import or_, and_, func
 from datetime import datetime, timedelta
 import logging
 from sqlalchemy.sql import text
+from sqlalchemy.dialects import sqlite, postgresql
 
-from .models import Job, JobApplication
+from .models import Job, JobApplication, ScrapeRun, ScrapeRunSource, Company
+from .identity import job_key, canonical_url
+from .classifier import classify, CLASSIFICATION_FIELDS
+from .fields import structured_fields, normalize_job_type, STRUCTURED_FIELDS
+from .queries import keyword_filter, us_software_filter
+from .records import JobData, as_dict
+from .compression import digest
+from . import aggregates, archive, dedup, lookups
+
+# Columns written by the ingest path; posted_date keeps its first-seen value on conflict
+UPSERT_FIELDS = ('title', 'company', 'location', 'description', 'url', 'source', 'posted_date', 'salary')
+UPDATE_FIELDS = tuple(field for field in UPSERT_FIELDS if field != 'posted_date')
+# Computed from the scraped fields at ingest
+DERIVED_FIELDS = CLASSIFICATION_FIELDS + STRUCTURED_FIELDS + lookups.ENCODED_FIELDS + ('description_hash',)
+# What a re-scrape is compared on: the description by its digest, so stored ones aren't decompressed
+COMPARED_FIELDS = tuple('description_hash' if field == 'description' else field for field in UPDATE_FIELDS)
+
+def _parse_posted_date(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.utcnow()
+
+def prepare_job_row(job_data: JobData, key: Optional[str] = None) -> Dict[str, Any]:
+    """Build a jobs table row (with its identity key) from a scraped JobRecord or job_data dict"""
+    row = {field: job_data.get(field) for field in UPSERT_FIELDS}
+    row['posted_date'] = _parse_posted_date(row['posted_date'])
+    row['job_key'] = key or job_data.get('job_key') or job_key(job_data)
+    # Store URLs without tracking parameters so re-scrapes don't look like changes
+    row['url'] = canonical_url(row['url'])
+    row['description_hash'] = digest(row['description'])
+    row.update(classify(row['title'], row['location']))
+    row.update(structured_fields(job_data))
+    row['is_active'] = True
+    return row
+
+def _derive_fields(job: Job):
+    """Recompute the classification and structured columns of a Job from its text fields"""
+    values = classify(job.title, job.location)
+    values.update(structured_fields({
+        'title': job.title, 'location': job.location, 'salary': job.salary, 'job_type': job.job_type
+    }))
+    for field, value in values.items():
+        setattr(job, field, value)
 
 class JobRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    def create(self, job_data: Dict[str, Any]) -> Job:
+    def create(self, job_data: JobData) -> Job:
         """Create a new job listing"""
         try:
-            job = Job(**job_data)
+            job = Job(**as_dict(job_data))
+            if not job.job_key:
+                job.job_key = job_key(job_data)
+            _derive_fields(job)
             self.session.add(job)
             self.session.commit()
             return job
@@ -23,10 +74,56 @@ class JobRepository:
             logging.error(f"Error creating job: {e}")
             raise
 
-    def get(self, job_id: int) -> Optional[Job]:
-        """Get a job by ID with optimized loading"""
-        return self.session.query(Job)\
+    def get(self, job_id: int, include_archive: bool = False) -> Optional[Job]:
+        """Get a job by ID with optimized loading, optionally looking in the archive too"""
+        job = self.session.query(Job)\
+            .filter(Job.id == job_id)\
+            .first()
+        if job is None and include_archive:
+            cold = archive.archive_session(self.session.get_bind())
+            if cold is not None:
+                try:
+                    job = JobRepository(cold).get(job_id)
+                finally:
+                    cold.close()
+        return job
+
+    def get_detail(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """A job with its application, the previous/next job IDs and its detail_stamps, in one query
+
+        Neighbours are scalar subqueries that seek the primary key, so the
+        page costs one round trip however large the table is.
+        """
+        neighbour = aliased(Job)
+        next_id = self.session.query(func.min(neighbour.id))\
+            .filter(neighbour.id > Job.id)\
+            .scalar_subquery()
+        prev_id = self.session.query(func.max(neighbour.id))\
+            .filter(neighbour.id < Job.id)\
+            .scalar_subquery()
+
+        row = self.session.query(Job, JobApplication, next_id.label('next_id'), prev_id.label('prev_id'))\
+            .options(undefer(Job.description))\
+            .outerjoin(JobApplication, JobApplication.job_id == Job.id)\
+            .filter(Job.id == job_id)\
+            .order_by(JobApplication.id)\
+            .first()
+        if row is None:
+            return None
+        job, application, next_id, prev_id = row
+        stamps = (job.updated_at, application.updated_at if application is not None else None)
+        return {'job': job, 'application': application, 'next_id': next_id, 'prev_id': prev_id, 'stamps': stamps}
+
+    def detail_stamps(self, job_id: int) -> Optional[tuple]:
+        """(job updated_at, application updated_at or None) for get_detail's job, or None if there is none
+
+        A primary-key lookup with no description or neighbours, for
+        validating a cached detail page.
+        """
+        return self.session.query(Job.updated_at, JobApplication.updated_at)\
+            .outerjoin(JobApplication, JobApplication.job_id == Job.id)\
             .filter(Job.id == job_id)\
+            .order_by(JobApplication.id)\
             .first()
 
     def update(self, job_id: int, job_data: Dict[str, Any]) -> Optional[Job]:
@@ -38,6 +135,8 @@ class JobRepository:
                 
             for key, value in job_data.items():
                 setattr(job, key, value)
+            if any(field in job_data for field in ('title', 'location', 'salary', 'job_type')):
+                _derive_fields(job)
                 
             self.session.commit()
             return job
@@ -61,10 +160,14 @@ class JobRepository:
             logging.error(f"Error deleting job: {e}")
             raise
 
-    def bulk_create(self, jobs_data: List[Dict[str, Any]]) -> List[Job]:
+    def bulk_create(self, jobs_data: List[JobData]) -> List[Job]:
         """Bulk create jobs for better performance"""
         try:
-            jobs = [Job(**data) for data in jobs_data]
+            jobs = [Job(**as_dict(data)) for data in jobs_data]
+            for job, data in zip(jobs, jobs_data):
+                job.job_key = job.job_key or job_key(data)
+                _derive_fields(job)
+            lookups.encode_jobs(self.session.connection(), jobs)
             self.session.bulk_save_objects(jobs)
             self.session.commit()
             return jobs
@@ -73,14 +176,185 @@ class JobRepository:
             logging.error(f"Error bulk creating jobs: {e}")
             raise
 
+    def _upsert_statement(self):
+        """INSERT ... ON CONFLICT(job_key) DO UPDATE for the session's dialect"""
+        dialect = self.session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(Job.__table__)
+        updates = {
+            field: func.coalesce(getattr(stmt.excluded, field), getattr(Job.__table__.c, field))
+            for field in UPDATE_FIELDS + DERIVED_FIELDS
+        }
+        # Seeing a posting again makes it active
+        updates['is_active'] = stmt.excluded.is_active
+        updates['updated_at'] = datetime.utcnow()
+        return stmt.on_conflict_do_update(index_elements=['job_key'], set_=updates)
+
+    def upsert_many(self, jobs_data: List[JobData], batch_size: int = 500) -> Dict[str, int]:
+        """Insert new jobs and update changed ones in batches, keyed on job identity
+
+        Takes JobRecords or job_data dicts. Returns counts of inserted,
+        updated and unchanged jobs. Duplicates within `jobs_data` collapse to
+        their last occurrence; new jobs that are near duplicates of stored
+        ones are linked to them (see dedup.py). Table rows are built a batch
+        at a time, so a large run holds only its compact inputs.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        try:
+            latest = {}
+            keyless = []
+            for job_data in jobs_data:
+                key = job_data.get('job_key') or job_key(job_data)
+                if key:
+                    latest[key] = job_data
+                else:
+                    keyless.append(prepare_job_row(job_data))
+
+            keyed = list(latest.items())
+            columns = [Job.job_key] + [getattr(Job, field) for field in COMPARED_FIELDS]
+            for i in range(0, len(keyed), batch_size):
+                batch = [prepare_job_row(job_data, key) for key, job_data in keyed[i:i + batch_size]]
+                existing = {
+                    current.job_key: current
+                    for current in self.session.query(*columns)
+                        .filter(Job.job_key.in_([row['job_key'] for row in batch]))
+                }
+
+                pending = []
+                new_rows = []
+                for row in batch:
+                    current = existing.get(row['job_key'])
+                    if current is None:
+                        counts['inserted'] += 1
+                        new_rows.append(row)
+                    elif any(row[field] is not None and row[field] != getattr(current, field)
+                             for field in COMPARED_FIELDS):
+                        counts['updated'] += 1
+                    else:
+                        counts['unchanged'] += 1
+                        continue
+                    pending.append(row)
+
+                if pending:
+                    lookups.encode_rows(self.session.connection(), pending)
+                    self.session.execute(self._upsert_statement(), pending)
+                if new_rows:
+                    self._link_duplicates(new_rows)
+                self.session.commit()
+
+            if keyless:
+                lookups.encode_rows(self.session.connection(), keyless)
+                self.session.execute(Job.__table__.insert(), keyless)
+                self.session.commit()
+                counts['inserted'] += len(keyless)
+
+            return counts
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Error upserting jobs: {e}")
+            raise
+
+    def _link_duplicates(self, rows: List[Dict[str, Any]]):
+        """Run near-duplicate detection for just-inserted rows, in this transaction"""
+        ids = dict(self.session.query(Job.job_key, Job.id).filter(Job.job_key.in_([row['job_key'] for row in rows])))
+        linked = dedup.link_duplicates(self.session, [(ids[row['job_key']], row) for row in rows])
+        if linked:
+            logging.info(f"Linked {linked} of {len(rows)} new jobs to postings from other sources")
+
+    def backfill_job_keys(self, batch_size: int = 1000) -> Dict[str, int]:
+        """Set job_key on rows stored before job identity existed
+
+        Rows whose key is already taken by an older row are left without a
+        key and counted as duplicates.
+        """
+        counts = {'updated': 0, 'duplicates': 0}
+        try:
+            taken = {key for (key,) in self.session.query(Job.job_key).filter(Job.job_key.isnot(None))}
+            rows = self.session.query(Job.id, Job.url, Job.source)\
+                .filter(Job.job_key.is_(None))\
+                .order_by(Job.id)\
+                .all()
+
+            updates = []
+            for row in rows:
+                key = job_key({'url': row.url, 'source': row.source})
+                if not key:
+                    continue
+                if key in taken:
+                    counts['duplicates'] += 1
+                    continue
+                taken.add(key)
+                updates.append({'id': row.id, 'job_key': key})
+
+            for i in range(0, len(updates), batch_size):
+                self.session.bulk_update_mappings(Job, updates[i:i + batch_size])
+                self.session.commit()
+            counts['updated'] = len(updates)
+            return counts
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Error backfilling job keys: {e}")
+            raise
+
+    def backfill_classification(self, batch_size: int = 1000, reclassify: bool = False) -> Dict[str, int]:
+        """Fill is_us/role_family/is_remote for rows stored before classification
+
+        With `reclassify`, every row is recomputed (e.g. after the keyword
+        lists change).
+        """
+        try:
+            query = self.session.query(Job.id, Job.title, Job.location).order_by(Job.id)
+            if not reclassify:
+                query = query.filter(Job.role_family.is_(None))
+
+            updates = [{'id': row.id, **classify(row.title, row.location)} for row in query]
+            for i in range(0, len(updates), batch_size):
+                self.session.bulk_update_mappings(Job, updates[i:i + batch_size])
+                self.session.commit()
+            return {'updated': len(updates)}
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Error backfilling job classification: {e}")
+            raise
+
+    def backfill_structured_fields(self, batch_size: int = 1000) -> Dict[str, int]:
+        """Recompute salary/location/job type columns for every row, in id order"""
+        updated = 0
+        try:
+            last_id = 0
+            while True:
+                rows = self.session.query(Job.id, Job.title, Job.location, Job.salary, Job.job_type)\
+                    .filter(Job.id > last_id)\
+                    .order_by(Job.id)\
+                    .limit(batch_size)\
+                    .all()
+                if not rows:
+                    break
+                self.session.bulk_update_mappings(Job, [
+                    {'id': row.id, **structured_fields(row._asdict())} for row in rows
+                ])
+                self.session.commit()
+                updated += len(rows)
+                last_id = rows[-1].id
+            return {'updated': updated}
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Error backfilling structured fields: {e}")
+            raise
+
     def search(self, 
               keywords: Optional[str] = None,
               location: Optional[str] = None,
               company: Optional[str] = None,
               job_type: Optional[str] = None,
               days_posted: Optional[int] = None,
-              source: Optional[str] = None) -> List[Job]:
-        """Optimized search with query building"""
+              source: Optional[str] = None,
+              include_archive: bool = False) -> List[Job]:
+        """Optimized search with query building
+
+        `include_archive` also searches archived postings (see archive.py);
+        they are returned detached from any session.
+        """
         try:
             # Start with base query
             query = self.session.query(Job).filter(Job.is_active == True)
@@ -89,20 +363,16 @@ class JobRepository:
             conditions = []
             
             if keywords:
-                keyword_filter = or_(
-                    Job.title.ilike(f"%{keywords}%"),
-                    Job.description.ilike(f"%{keywords}%")
-                )
-                conditions.append(keyword_filter)
+                query = keyword_filter(query, keywords)
 
             if location:
                 conditions.append(Job.location.ilike(f"%{location}%"))
 
             if company:
-                conditions.append(Job.company.ilike(f"%{company}%"))
+                conditions.append(lookups.company_filter(company))
 
             if job_type:
-                conditions.append(Job.job_type == job_type)
+                conditions.append(Job.job_type == normalize_job_type(job_type))
 
             if source:
                 conditions.append(Job.source == source)
@@ -116,39 +386,76 @@ class JobRepository:
                 query = query.filter(and_(*conditions))
 
             # Optimize loading with limit
-            return query.order_by(Job.posted_date.desc())\
+            jobs = query.order_by(Job.posted_date.desc())\
                        .limit(1000)\
                        .all()
 
+            cold = archive.archive_session(self.session.get_bind()) if include_archive else None
+            if cold is not None:
+                try:
+                    jobs += JobRepository(cold).search(keywords, location, company, job_type, days_posted, source)
+                finally:
+                    cold.close()
+                jobs.sort(key=lambda job: job.posted_date or datetime.min, reverse=True)
+                jobs = jobs[:1000]
+            return jobs
+
         except Exception as e:
             logging.error(f"Error searching jobs: {e}")
             raise
 
     def get_job_statistics(self) -> Dict[str, Any]:
-        """Get job statistics using optimized queries"""
+        """Counts, yearly salary averages and type/state breakdowns for active jobs
+
+        Read from job_aggregates when the database maintains it; otherwise
+        every query reads one of the ix_jobs_active_* covering indexes.
+        Salary averages only include salaries posted per year.
+        """
         try:
-            # Use raw SQL for complex aggregations
-            stats_query = text("""
-                SELECT 
-                    COUNT(*) as total_jobs,
-                    COUNT(DISTINCT company) as unique_companies,
-                    COUNT(DISTINCT location) as unique_locations,
-                    AVG(CASE 
-                        WHEN salary_range REGEXP '^[0-9]+' 
-                        THEN CAST(REGEXP_SUBSTR(salary_range, '^[0-9]+') AS INTEGER)
-                        ELSE NULL 
-                    END) as avg_salary_min
-                FROM jobs 
-                WHERE is_active = 1
-            """)
-            
-            result = self.session.execute(stats_query).first()
-            
+            if aggregates.aggregates_available(self.session.get_bind()):
+                salary = aggregates.salaries(self.session, 'year')
+                average = lambda bound: (round(salary[f'salary_{bound}_sum'] / salary[f'salary_{bound}_count'])
+                                         if salary.get(f'salary_{bound}_count') else None)
+                return {
+                    'total_jobs': aggregates.counter(self.session, 'total', 'active'),
+                    'unique_companies': aggregates.counter(self.session, 'distinct', 'company'),
+                    'unique_locations': aggregates.counter(self.session, 'distinct', 'location'),
+                    'jobs_with_salary': int(salary.get('salary_min_count', 0)),
+                    'avg_salary_min': average('min'),
+                    'avg_salary_max': average('max'),
+                    'job_types': {job_type or 'Unknown': count
+                                  for job_type, count in aggregates.counts(self.session, 'job_type').items()},
+                    'top_states': [{'state': state, 'count': count}
+                                   for state, count in aggregates.counts(self.session, 'state', limit=10).items()]
+                }
+
+            active = Job.is_active == True
+            salary = self.session.query(
+                func.count(Job.salary_min).label('with_salary'),
+                func.avg(Job.salary_min).label('avg_salary_min'),
+                func.avg(Job.salary_max).label('avg_salary_max')
+            ).filter(active, Job.salary_period == 'year').one()
+
+            job_types = self.session.query(Job.job_type, func.count())\
+                .filter(active)\
+                .group_by(Job.job_type)\
+                .all()
+            states = self.session.query(Job.state, func.count())\
+                .filter(active, Job.state.isnot(None))\
+                .group_by(Job.state)\
+                .order_by(func.count().desc())\
+                .limit(10)\
+                .all()
+
             return {
-                'total_jobs': result.total_jobs,
-                'unique_companies': result.unique_companies,
-                'unique_locations': result.unique_locations,
-                'avg_salary_min': round(result.avg_salary_min) if result.avg_salary_min else None
+                'total_jobs': self.session.query(func.count(Job.id)).filter(active).scalar(),
+                'unique_companies': self.session.query(func.count(func.distinct(Job.company_id))).filter(active).scalar(),
+                'unique_locations': self.session.query(func.count(func.distinct(Job.location_id))).filter(active).scalar(),
+                'jobs_with_salary': salary.with_salary,
+                'avg_salary_min': round(salary.avg_salary_min) if salary.avg_salary_min else None,
+                'avg_salary_max': round(salary.avg_salary_max) if salary.avg_salary_max else None,
+                'job_types': {job_type or 'Unknown': count for job_type, count in job_types},
+                'top_states': [{'state': state, 'count': count} for state, count in states]
             }
             
         except Exception as e:
@@ -171,9 +478,24 @@ class JobApplicationRepository:
             logging.error(f"Error creating application: {e}")
             raise
 
+    def statuses_for(self, job_ids: List[int]) -> Dict[int, str]:
+        """Application status per job for a page of jobs, in one query
+
+        Jobs without an application are left out.
+        """
+        if not job_ids:
+            return {}
+        rows = self.session.query(JobApplication.job_id, JobApplication.status)\
+            .filter(JobApplication.job_id.in_(set(job_ids)))\
+            .order_by(JobApplication.id.desc())\
+            .all()
+        # Oldest application wins, matching job_detail
+        return {job_id: status for job_id, status in rows}
+
     def get_with_job(self, application_id: int) -> Optional[JobApplication]:
         """Get application with job details optimized"""
         return self.session.query(JobApplication)\
+            .join(JobApplication.job)\
             .options(contains_eager(JobApplication.job))\
             .filter(JobApplication.id == application_id)\
             .first()
@@ -181,6 +503,9 @@ class JobApplicationRepository:
     def get_application_stats(self) -> Dict[str, int]:
         """Get application statistics using optimized query"""
         try:
+            if aggregates.aggregates_available(self.session.get_bind()):
+                return aggregates.counts(self.session, 'status')
+
             stats_query = text("""
                 SELECT 
                     status,
@@ -195,4 +520,175 @@ class JobApplicationRepository:
             
         except Exception as e:
             logging.error(f"Error getting application statistics: {e}")
-            raise
\ No newline at end of file
+            raise
+
+class StatsRepository:
+    """Site-wide counts, read from job_aggregates when the database maintains it
+
+    Without the aggregate table (non-SQLite databases) the same numbers are
+    computed with live queries.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @property
+    def materialized(self) -> bool:
+        return aggregates.aggregates_available(self.session.get_bind())
+
+    def overview(self) -> Dict[str, int]:
+        """Headline numbers for the /about page"""
+        try:
+            if self.materialized:
+                return {
+                    # Counted like the /jobs listing, without the near duplicates it hides
+                    'total_jobs': aggregates.listed_total(self.session),
+                    'active_jobs': aggregates.counter(self.session, 'total', 'active'),
+                    'total_companies': aggregates.counter(self.session, 'distinct', 'company'),
+                    'total_locations': aggregates.counter(self.session, 'distinct', 'location')
+                }
+
+            active = self.session.query(Job).filter(Job.is_active == True)
+            return {
+                'total_jobs': active.filter(us_software_filter(), Job.canonical_id.is_(None)).count(),
+                'active_jobs': active.count(),
+                'total_companies': active.with_entities(Job.company_id).filter(Job.company_id.isnot(None)).distinct().count(),
+                'total_locations': active.with_entities(Job.location_id).filter(Job.location_id.isnot(None)).distinct().count()
+            }
+        except Exception as e:
+            logging.error(f"Error getting overview statistics: {e}")
+            raise
+
+    def breakdown(self, days: int = 30, top: int = 20) -> Dict[str, Any]:
+        """Active jobs per source, per posting day and for the top companies"""
+        try:
+            since = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d')
+            if self.materialized:
+                top_companies = aggregates.counts(self.session, 'company', limit=top)
+                names = lookups.company_names(self.session.connection(), top_companies)
+                return {
+                    'sources': aggregates.counts(self.session, 'source'),
+                    'days': aggregates.days(self.session, since),
+                    'top_companies': {names[int(company_id)]: count for company_id, count in top_companies.items()}
+                }
+
+            active = Job.is_active == True
+            day = func.date(Job.posted_date)
+            return {
+                'sources': dict(self.session.query(func.coalesce(Job.source, ''), func.count())
+                                .filter(active).group_by(Job.source).all()),
+                'days': dict(self.session.query(day, func.count())
+                             .filter(active, day >= since).group_by(day).order_by(day).all()),
+                'top_companies': dict(self.session.query(Company.name, func.count())
+                                      .join(Company, Company.id == Job.company_id)
+                                      .filter(active).group_by(Company.id, Company.name)
+                                      .order_by(func.count().desc()).limit(top).all())
+            }
+        except Exception as e:
+            logging.error(f"Error getting job breakdown: {e}")
+            raise
+
+    def rebuild(self):
+        """Recompute the materialized counters from scratch"""
+        try:
+            aggregates.rebuild(self.session.connection())
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Error rebuilding aggregates: {e}")
+            raise
+
+class RunHistoryRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def start_run(self) -> ScrapeRun:
+        """Record the start of a scraping run"""
+        try:
+            run = ScrapeRun(started_at=datetime.utcnow(), status='running')
+            self.session.add(run)
+            self.session.commit()
+            return run
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Error starting run: {e}")
+            raise
+
+    def record_source(self, run: ScrapeRun, source_data: Dict[str, Any]) -> ScrapeRunSource:
+        """Record the outcome of one site/query within a run"""
+        try:
+            entry = ScrapeRunSource(run_id=run.id, **source_data)
+            self.session.add(entry)
+            self.session.commit()
+            return entry
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Error recording run source: {e}")
+            raise
+
+    def finish_run(self, run: ScrapeRun, run_data: Dict[str, Any]) -> ScrapeRun:
+        """Store the run totals and mark it finished"""
+        try:
+            for key, value in run_data.items():
+                setattr(run, key, value)
+            run.finished_at = datetime.utcnow()
+            self.session.commit()
+            return run
+        except Exception as e:
+            self.session.rollback()
+            logging.error(f"Error finishing run: {e}")
+            raise
+
+    def latest_run(self) -> Optional[ScrapeRun]:
+        return self.session.query(ScrapeRun)\
+            .options(selectinload(ScrapeRun.sources))\
+            .order_by(ScrapeRun.started_at.desc())\
+            .first()
+
+    def recent_runs(self, limit: int = 10) -> List[ScrapeRun]:
+        """The latest runs with their sources loaded in one extra query, not one per run"""
+        return self.session.query(ScrapeRun)\
+            .options(selectinload(ScrapeRun.sources))\
+            .order_by(ScrapeRun.started_at.desc())\
+            .limit(limit)\
+            .all()
+
+    def efficiency_trend(self, days: int = 30, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-day totals over the last `days` days, including requests per new job"""
+        try:
+            since = datetime.utcnow() - timedelta(days=days)
+            day = func.date(ScrapeRunSource.started_at)
+            query = self.session.query(
+                day.label('day'),
+                func.count(func.distinct(ScrapeRunSource.run_id)).label('runs'),
+                func.sum(ScrapeRunSource.requests).label('requests'),
+                func.sum(ScrapeRunSource.pages_fetched).label('pages_fetched'),
+                func.sum(ScrapeRunSource.cards_parsed).label('cards_parsed'),
+                func.sum(ScrapeRunSource.new_jobs).label('new_jobs'),
+                func.sum(ScrapeRunSource.duplicate_jobs).label('duplicate_jobs'),
+                func.sum(ScrapeRunSource.errors).label('errors')
+            ).filter(ScrapeRunSource.started_at >= since)
+
+            if source:
+                query = query.filter(ScrapeRunSource.source == source)
+
+            trend = []
+            for row in query.group_by(day).order_by(day):
+                requests = row.requests or 0
+                new_jobs = row.new_jobs or 0
+                trend.append({
+                    'day': str(row.day),
+                    'runs': row.runs,
+                    'requests': requests,
+                    'pages_fetched': row.pages_fetched or 0,
+                    'cards_parsed': row.cards_parsed or 0,
+                    'new_jobs': new_jobs,
+                    'duplicate_jobs': row.duplicate_jobs or 0,
+                    'errors': row.errors or 0,
+                    'requests_per_new_job': round(requests / new_jobs, 2) if new_jobs else None
+                })
+            return trend
+
+        except Exception as e:
+            logging.error(f"Error getting run trend: {e}")
+            raise
@@ -0,0 +1,181 @@
+"""Immutable read snapshots of the database for the web tier.
+
+The web app and the scheduler share one SQLite file, so every scrape
+competes with page loads for the page cache, the WAL and checkpoints. With
+WEB_SNAPSHOTS on, the scheduler publishes a copy after each run (and after
+archiving): a consistent copy taken with the online backup API, ANALYZEd,
+with its full-text index merged, in SNAPSHOT_DIRECTORY. The `CURRENT` file
+names the newest snapshot and is replaced atomically, so a reader sees
+either the old snapshot or the new one, never a partial copy.
+
+Web workers open the current snapshot read-only with `immutable=1`: SQLite
+takes no locks and never looks for a journal or WAL, and the whole file is
+memory-mapped. Each request picks up the newest snapshot when it starts
+(see database_init.py); tables the web tier writes are still read from the
+live database.
+
+    python -m app.database.snapshots publish
+    python -m app.database.snapshots current
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from config.config import Config
+from .backup import snapshot
+from .cache_store import bump_data_version
+from .engine import apply_sqlite_pragmas
+
+PREFIX = 'jobs_snapshot_'
+POINTER = 'CURRENT'
+# Read by the web tier from the live database: it writes them, or they change mid-run
+LIVE_TABLES = {'job_applications', 'scrape_runs', 'scrape_run_sources'}
+
+def _fsync(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def list_snapshots(directory: str) -> List[str]:
+    """Snapshot file names in `directory`, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.startswith(PREFIX) and name.endswith('.db'))
+
+def current_snapshot(directory: str) -> Optional[str]:
+    """Path of the published snapshot, or None if there is none"""
+    try:
+        with open(os.path.join(directory, POINTER), encoding='utf-8') as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, name) if name else None
+
+def publish(db_path: str, directory: str, keep: Optional[int] = None) -> Dict[str, Any]:
+    """Copy the database into a new read-optimized snapshot and make it current
+
+    Older snapshots beyond the newest `keep` are deleted; workers still
+    reading one keep their open file until they switch.
+    """
+    started = time.perf_counter()
+    keep = keep or Config.SNAPSHOT_KEEP
+    os.makedirs(directory, exist_ok=True)
+    name = f"{PREFIX}{datetime.utcnow():%Y%m%d_%H%M%S_%f}.db"
+    path = os.path.join(directory, name)
+    partial = path + '.tmp'
+
+    layout = snapshot(db_path, partial, step_pages=Config.BACKUP_STEP_PAGES)
+    conn = sqlite3.connect(partial, isolation_level=None)
+    try:
+        conn.execute("ANALYZE")
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'").fetchone():
+            conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('optimize')")
+    finally:
+        conn.close()
+    _fsync(partial)
+    os.replace(partial, path)
+
+    pointer = os.path.join(directory, POINTER)
+    with open(pointer + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer + '.tmp', pointer)
+    _fsync(directory)
+    # Web results cached from the previous snapshot are now stale
+    bump_data_version()
+
+    removed = []
+    for old in list_snapshots(directory)[:-keep]:
+        os.remove(os.path.join(directory, old))
+        removed.append(old)
+
+    result = {'name': name, 'size_bytes': os.path.getsize(path), 'page_count': layout['page_count'],
+              'removed': removed, 'duration_ms': round((time.perf_counter() - started) * 1000, 1)}
+    logging.info(f"Published read snapshot {name}: {result}")
+    return result
+
+def snapshot_engine(path: str) -> Engine:
+    """Read-only engine on a snapshot file: immutable (no locks), memory-mapped"""
+    engine = create_engine(f"sqlite:///file:{path}?mode=ro&immutable=1&uri=true")
+    apply_sqlite_pragmas(engine, {
+        'query_only': 'ON',
+        'mmap_size': Config.SNAPSHOT_MMAP_SIZE,
+        'cache_size': Config.SQLITE_CACHE_SIZE,
+        'temp_store': Config.SQLITE_TEMP_STORE,
+    })
+    return engine
+
+class SnapshotReader:
+    """Hands out an engine on the current snapshot, switching when a new one is published
+
+    Checking costs one stat() of the pointer file; the old engine is
+    disposed when the reader switches, and connections still checked out
+    close when they are returned.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._engine: Optional[Engine] = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _pointer_stamp(self):
+        try:
+            stat = os.stat(os.path.join(self.directory, POINTER))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def engine(self) -> Optional[Engine]:
+        """Engine on the newest snapshot (None until one is published)"""
+        stamp = self._pointer_stamp()
+        if stamp == self._stamp:
+            return self._engine
+        with self._lock:
+            if stamp != self._stamp:
+                path = current_snapshot(self.directory)
+                if path != self.path:
+                    previous = self._engine
+                    self._engine = snapshot_engine(path) if path and os.path.exists(path) else None
+                    self.path = path if self._engine else None
+                    if previous is not None:
+                        previous.dispose()
+                    logging.info(f"Web reads now use snapshot {self.path}")
+                self._stamp = stamp
+        return self._engine
+
+    def dispose(self):
+        with self._lock:
+            if self._engine is not None:
+                self._engine.dispose()
+            self._engine, self.path, self._stamp = None, None, None
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Publish or inspect read snapshots for the web tier')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('publish', help='copy the database into a new snapshot and make it current')
+    commands.add_parser('current', help='print the current snapshot')
+    args = parser.parse_args(argv)
+
+    if args.command == 'publish':
+        result = publish(Config.DATABASE_PATH, Config.SNAPSHOT_DIRECTORY)
+        print(f"Published {result['name']} ({result['size_bytes']} bytes) in {result['duration_ms']}ms")
+    else:
+        print(current_snapshot(Config.SNAPSHOT_DIRECTORY) or 'No snapshot published')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,7 +7,12 @@ from typing import Dict, Any
 
 from app.scraper import IndeedScraper, LinkedInScraper, GlassdoorScraper
 from app.database.db import Database
-from app.database.repository import JobRepository
+from app.database.engine import pool_status, maintain_sqlite
+from app.database.archive import archive_jobs
+from app.database.repository import RunHistoryRepository
+from app.database.ingest import IngestQueue
+from app.database.snapshots import publish
+from app.scraper.metrics import ScrapeMetrics
 
 class JobScraperScheduler:
     """Scheduler for running job scraping tasks"""
@@ -17,6 +22,12 @@ class JobScraperScheduler:
         self.config = config
         self.is_running = False
         self.thread = None
+        self.last_run = None
+        self.database = None
+        self.ingest = None
+        self.last_maintenance = None
+        self.last_archive = None
+        self.last_snapshot = None
         self.setup_logging()
         
     def setup_logging(self):
@@ -31,19 +42,67 @@ class JobScraperScheduler:
         )
         self.logger = logging.getLogger('JobScraperScheduler')
 
+    def get_database(self) -> Database:
+        """Get the database handle, reused across runs"""
+        if self.database is None:
+            self.database = Database(
+                db_uri=self.config['SQLALCHEMY_DATABASE_URI'],
+                db_path=self.config['DATABASE_PATH']
+            )
+        return self.database
+
+    def get_ingest_queue(self) -> IngestQueue:
+        """Get the write-behind ingest queue, starting its writer thread if needed"""
+        if self.ingest is None:
+            self.ingest = IngestQueue(self.get_database().Session)
+        self.ingest.start()
+        return self.ingest
+
+    def maintain_database(self):
+        """Checkpoint the SQLite WAL and run PRAGMA optimize"""
+        engine = self.get_database().engine
+        if engine.dialect.name != 'sqlite':
+            return
+        try:
+            self.last_maintenance = {'finished_at': datetime.utcnow().isoformat(), **maintain_sqlite(engine)}
+            self.logger.info(f"Database maintenance: {self.last_maintenance}")
+        except Exception as e:
+            self.logger.error(f"Database maintenance failed: {str(e)}")
+
+    def publish_snapshot(self):
+        """Publish a fresh read snapshot for the web tier, when it reads from snapshots"""
+        if not self.config.get('WEB_SNAPSHOTS') or self.get_database().engine.dialect.name != 'sqlite':
+            return
+        try:
+            self.last_snapshot = publish(self.config['DATABASE_PATH'], self.config['SNAPSHOT_DIRECTORY'],
+                                         keep=self.config.get('SNAPSHOT_KEEP'))
+        except Exception as e:
+            self.logger.error(f"Publishing the read snapshot failed: {str(e)}")
+
+    def archive_old_jobs(self):
+        """Move old postings nobody applied to into the archive database"""
+        engine = self.get_database().engine
+        if engine.dialect.name != 'sqlite':
+            return
+        try:
+            self.last_archive = {'finished_at': datetime.utcnow().isoformat(),
+                                 **archive_jobs(engine, older_than_days=self.config.get('ARCHIVE_AFTER_DAYS', 90))}
+            self.logger.info(f"Archived old jobs: {self.last_archive}")
+        except Exception as e:
+            self.logger.error(f"Archiving failed: {str(e)}")
+        self.publish_snapshot()
+
     def scrape_jobs(self):
         """Run job scraping for all sources"""
         self.logger.info("Starting job scraping task")
         start_time = datetime.now()
+        run = None
         
         try:
-            # Initialize database
-            db = Database(
-                db_uri=self.config['SQLALCHEMY_DATABASE_URI'],
-                db_path=self.config['DATABASE_PATH']
-            )
-            session = db.get_session()
-            job_repo = JobRepository(session)
+            # Sessions come from the shared, pooled engine
+            session = self.get_database().get_session()
+            history = RunHistoryRepository(session)
+            run = history.start_run()
 
             # Initialize scrapers
             scrapers = [
@@ -52,36 +111,73 @@ class JobScraperScheduler:
                 GlassdoorScraper()
             ]
 
-            total_jobs = 0
+            query = self.config.get('SEARCH_QUERY', 'software engineer')
+            location = self.config.get('SEARCH_LOCATION', 'United States')
+            run_metrics = ScrapeMetrics()
+            ingest = self.get_ingest_queue()
+            sources = []
             errors = []
 
-            # Run each scraper
+            # Run each scraper; jobs go to the write-behind queue so scraping never waits on commits
             for scraper in scrapers:
+                scraper.reset_metrics()
+                source = {
+                    'source': scraper.site_name,
+                    'query': query,
+                    'location': location,
+                    'started_at': datetime.utcnow(),
+                    'tag': f"{run.id}:{scraper.site_name}"
+                }
+                source_errors = []
                 try:
                     self.logger.info(f"Starting scraper: {scraper.site_name}")
-                    jobs = scraper.search_jobs(
-                        query=self.config.get('SEARCH_QUERY', 'software engineer'),
-                        location=self.config.get('SEARCH_LOCATION', 'United States')
-                    )
-                    
-                    # Store jobs in database
-                    for job in jobs:
-                        try:
-                            job_repo.create(job)
-                            total_jobs += 1
-                        except Exception as e:
-                            self.logger.error(f"Error storing job: {str(e)}")
-                            errors.append(f"Storage error: {str(e)}")
+                    jobs = scraper.search_jobs(query=query, location=location)
+                    ingest.put_many(jobs, tag=source['tag'])
                             
                 except Exception as e:
                     error_msg = f"Error in {scraper.site_name} scraper: {str(e)}"
                     self.logger.error(error_msg)
-                    errors.append(error_msg)
+                    source_errors.append(error_msg)
+
+                metrics = scraper.metrics
+                metrics.errors += len(source_errors)
+                run_metrics.merge(metrics)
+                source.update(
+                    finished_at=datetime.utcnow(),
+                    error_message="\n".join(source_errors) or None,
+                    **metrics.to_dict()
+                )
+                sources.append(source)
+                errors.extend(source_errors)
+
+            # Wait for the writer so the run's new/duplicate counts are final
+            ingest.flush()
+            total_jobs = 0
+            duplicate_jobs = 0
+            for source in sources:
+                counts = ingest.counts(source.pop('tag'))
+                source['new_jobs'] = counts['inserted']
+                source['duplicate_jobs'] = counts['updated'] + counts['unchanged']
+                total_jobs += source['new_jobs']
+                duplicate_jobs += source['duplicate_jobs']
+                history.record_source(run, source)
+
+            history.finish_run(run, {
+                'status': 'partial' if errors else 'success',
+                'new_jobs': total_jobs,
+                'duplicate_jobs': duplicate_jobs,
+                **run_metrics.to_dict()
+            })
 
             # Log summary
             duration = (datetime.now() - start_time).total_seconds()
-            self.logger.info(f"Scraping completed. Duration: {duration:.2f}s, Jobs found: {total_jobs}")
+            self.logger.info(f"Scraping completed. Duration: {duration:.2f}s, New jobs: {total_jobs}, "
+                             f"Duplicates: {duplicate_jobs}, Requests: {run_metrics.requests}")
             
+            # Fold the run's writes back into the main database file
+            self.maintain_database()
+            self.publish_snapshot()
+
             # Handle errors if any
             if errors:
                 self.handle_errors(errors)
@@ -89,10 +185,19 @@ class JobScraperScheduler:
         except Exception as e:
             self.logger.error(f"Fatal error in scraping task: {str(e)}")
             self.handle_errors([f"Fatal error: {str(e)}"])
+            if run is not None:
+                try:
+                    history.finish_run(run, {'status': 'failed', 'errors': (run.errors or 0) + 1})
+                except Exception:
+                    pass
         
         finally:
+            self.last_run = run.to_dict() if run is not None and run.finished_at else {
+                'started_at': start_time.isoformat(),
+                'status': 'failed'
+            }
             if 'session' in locals():
-                session.close()
+                self.get_database().Session.remove()
 
     def handle_errors(self, errors: list):
         """Handle and notify about errors"""
@@ -114,6 +219,9 @@ class JobScraperScheduler:
         # Schedule jobs to run twice daily
         schedule.every().day.at("00:00").do(self.scrape_jobs)
         schedule.every().day.at("12:00").do(self.scrape_jobs)
+        schedule.every(self.config.get('SQLITE_MAINTENANCE_INTERVAL', 30)).minutes.do(self.maintain_database)
+        if self.config.get('ARCHIVE_AFTER_DAYS', 90) > 0:
+            schedule.every().day.at("03:00").do(self.archive_old_jobs)
 
         # Run in a separate thread
         def run_scheduler():
@@ -140,11 +248,19 @@ class JobScraperScheduler:
             self.thread.join()
             self.thread = None
 
+        # Write out anything still queued before exiting
+        if self.ingest:
+            self.ingest.stop()
+
     def status(self) -> Dict[str, Any]:
         """Get scheduler status"""
         return {
             'is_running': self.is_running,
             'next_run': schedule.next_run().strftime('%Y-%m-%d %H:%M:%S') if self.is_running else None,
             'job_count': len(schedule.jobs),
-            'last_run': getattr(self, 'last_run', None)
+            'last_run': self.last_run,
+            'database_pool': pool_status(self.config['SQLALCHEMY_DATABASE_URI']),
+            'database_maintenance': self.last_maintenance,
+            'archive': self.last_archive,
+            'ingest': self.ingest.get_stats() if self.ingest else None
         }
\ No newline at end of file
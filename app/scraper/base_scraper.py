@@ -9,6 +9,7 @@ from urllib.parse import urljoin
 from abc import ABC, abstractmethod
 
 from .rate_limiter import GlobalRateLimiter
+from .metrics import ScrapeMetrics
 
 class BaseScraper(ABC):
     """Base class for job scrapers with common functionality"""
@@ -40,6 +41,7 @@ class BaseScraper(ABC):
         self.session = self._init_session()
         self.rate_limiter = GlobalRateLimiter()
         self.total_requests = 0
+        self.metrics = ScrapeMetrics()
 
     def _init_session(self) -> requests.Session:
         """Initialize requests session with default headers"""
@@ -51,6 +53,12 @@ class BaseScraper(ABC):
         })
         return session
 
+    def reset_metrics(self) -> ScrapeMetrics:
+        """Start a fresh set of metrics and return the previous one"""
+        previous = self.metrics
+        self.metrics = ScrapeMetrics()
+        return previous
+
     def _random_delay(self, min_delay: float = None, max_delay: float = None):
         """Add random delay between requests to avoid rate limiting"""
         min_d = min_delay if min_delay is not None else self.min_delay
@@ -60,12 +68,14 @@ class BaseScraper(ABC):
 
     def _make_request(self, url: str, method: str = 'GET', **kwargs) -> requests.Response:
         """Make HTTP request with rate limiting and error handling"""
-        if not self.rate_limiter.can_make_request(self.site_name):
+        # Reserved before sending, so concurrent scrapers can't all pass the check
+        if not self.rate_limiter.try_acquire(self.site_name):
             stats = self.rate_limiter.get_stats()
             raise Exception(f"Rate limit reached for {self.site_name}. Stats: {stats}")
             
         try:
             self._random_delay()
+            started = time.perf_counter()
             response = self.session.request(
                 method=method,
                 url=url,
@@ -74,14 +84,14 @@ class BaseScraper(ABC):
             )
             response.raise_for_status()
             
-            # Log successful request
-            self.rate_limiter.log_request(self.site_name)
+            self.metrics.record_request(time.perf_counter() - started)
             self.total_requests += 1
             
             logging.info(f"{self.site_name}: Made request {self.total_requests}")
             return response
             
         except requests.RequestException as e:
+            self.metrics.record_error()
             logging.error(f"Request failed for {url}: {str(e)}")
             raise
 
@@ -1,10 +1,11 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Optional
 import logging
 from bs4 import BeautifulSoup
 from urllib.parse import urlencode
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from app.database.records import JobRecord
 from .enhanced_base_scraper import EnhancedBaseScraper
 import time
 
@@ -21,7 +22,7 @@ class LinkedInScraper(EnhancedBaseScraper):
             proxy_list_path=proxy_list_path
         )
         
-    def search_jobs(self, query: str, location: str = None, **kwargs) -> List[Dict[str, Any]]:
+    def search_jobs(self, query: str, location: str = None, **kwargs) -> List[JobRecord]:
         jobs = []
         location = location or "United States"
         max_jobs = kwargs.get('limit', 100)  # Default to 100 jobs if no limit specified
@@ -37,12 +38,15 @@ class LinkedInScraper(EnhancedBaseScraper):
                 
                 try:
                     # Load the page
+                    started = time.perf_counter()
                     self.driver.get(url)
                     
                     # Wait for job cards to load
                     WebDriverWait(self.driver, 10).until(
                         EC.presence_of_element_located((By.CLASS_NAME, "base-search-card"))
                     )
+                    self.metrics.record_request(time.perf_counter() - started)
+                    self.metrics.pages_fetched += 1
                     
                     # Scroll to load all jobs
                     self._scroll_to_load_jobs()
@@ -67,7 +71,9 @@ class LinkedInScraper(EnhancedBaseScraper):
                             job_data = self._parse_job_card(card)
                             if job_data:
                                 jobs.append(job_data)
+                                self.metrics.cards_parsed += 1
                         except Exception as e:
+                            self.metrics.record_error()
                             logging.error(f"Error processing job card: {str(e)}")
                             continue
                     
@@ -79,6 +85,7 @@ class LinkedInScraper(EnhancedBaseScraper):
                     self._random_delay()
                     
                 except Exception as e:
+                    self.metrics.record_error()
                     logging.error(f"Error processing page {page}: {str(e)}")
                     break
                 
@@ -120,7 +127,7 @@ class LinkedInScraper(EnhancedBaseScraper):
         except Exception as e:
             logging.error(f"Error during scrolling: {str(e)}")
     
-    def _parse_job_card(self, card: BeautifulSoup) -> Optional[Dict[str, Any]]:
+    def _parse_job_card(self, card: BeautifulSoup) -> Optional[JobRecord]:
         try:
             # Extract job details
             title_elem = card.find(['h3', 'h4'], class_=['base-search-card__title', 'job-card-list__title'])
@@ -136,21 +143,18 @@ class LinkedInScraper(EnhancedBaseScraper):
             if not link_elem or not link_elem.get('href'):
                 return None
             
-            job_data = {
-                'title': title_elem.text.strip(),
-                'company': company_elem.text.strip(),
-                'location': location_elem.text.strip(),
-                'url': link_elem['href'],
-                'source': 'LinkedIn',
-                'posted_date': self._extract_date(card)
-            }
-            
             # Extract salary if available
             salary_elem = card.find('span', class_=['job-search-card__salary-info', 'job-card-container__salary-info'])
-            if salary_elem:
-                job_data['salary'] = salary_elem.text.strip()
             
-            return job_data
+            return JobRecord(
+                title=title_elem.text.strip(),
+                company=company_elem.text.strip(),
+                location=location_elem.text.strip(),
+                url=link_elem['href'],
+                source=self.site_name,
+                posted_date=self._extract_date(card),
+                salary=salary_elem.text.strip() if salary_elem else None
+            )
             
         except Exception as e:
             logging.error(f"Error parsing LinkedIn job card: {str(e)}")
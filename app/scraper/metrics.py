@@ -0,0 +1,50 @@
+import math
+from typing import List, Optional, Dict, Any
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of `values` (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+class ScrapeMetrics:
+    """Counters collected by a scraper during one search"""
+
+    def __init__(self):
+        self.requests = 0
+        self.pages_fetched = 0
+        self.cards_parsed = 0
+        self.errors = 0
+        self.latencies: List[float] = []  # seconds per request
+
+    def record_request(self, seconds: float):
+        """Record a completed request and its latency"""
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def record_error(self):
+        self.errors += 1
+
+    def merge(self, other: 'ScrapeMetrics'):
+        """Add another set of metrics into this one"""
+        self.requests += other.requests
+        self.pages_fetched += other.pages_fetched
+        self.cards_parsed += other.cards_parsed
+        self.errors += other.errors
+        self.latencies.extend(other.latencies)
+
+    def latency_ms(self, pct: float) -> Optional[float]:
+        value = percentile(self.latencies, pct)
+        return round(value * 1000, 2) if value is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'pages_fetched': self.pages_fetched,
+            'cards_parsed': self.cards_parsed,
+            'errors': self.errors,
+            'p50_latency_ms': self.latency_ms(50),
+            'p95_latency_ms': self.latency_ms(95)
+        }
@@ -1,45 +1,235 @@
+import os
+import sqlite3
+import threading
+import time
 from datetime import datetime
-from collections import deque
+from typing import Dict
+
+from config.config import Config
+
+TOTAL_KEY = '__total__'
+
+def _refill(tokens: float, updated: float, now: float, capacity: int, window: float) -> float:
+    """Return the bucket level after refilling for the time elapsed since `updated`"""
+    if window <= 0:
+        return float(capacity)
+    rate = capacity / window
+    return min(float(capacity), tokens + max(0.0, now - updated) * rate)
+
+class MemoryRateLimitBackend:
+    """Token buckets kept in process memory (one budget per process)"""
+
+    name = 'memory'
+
+    def __init__(self, window_seconds: float):
+        self.window = window_seconds
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, list] = {}  # key -> [tokens, updated, requests]
+
+    def _bucket(self, key: str, capacity: int, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(capacity), now, 0]
+        else:
+            bucket[0] = _refill(bucket[0], bucket[1], now, capacity, self.window)
+            bucket[1] = now
+        return bucket
+
+    def available(self, limits: Dict[str, int]) -> Dict[str, float]:
+        """Get the tokens currently available for each key"""
+        now = time.time()
+        with self._lock:
+            return {key: self._bucket(key, cap, now)[0] for key, cap in limits.items()}
+
+    def consume(self, limits: Dict[str, int], amount: float = 1.0):
+        """Take `amount` tokens from every key's bucket in one step"""
+        now = time.time()
+        with self._lock:
+            for key, cap in limits.items():
+                bucket = self._bucket(key, cap, now)
+                bucket[0] -= amount
+                bucket[2] += 1
+
+    def try_acquire(self, limits: Dict[str, int], amount: float = 1.0) -> bool:
+        """Take `amount` tokens from every key's bucket if all of them have it; otherwise take none"""
+        now = time.time()
+        with self._lock:
+            buckets = [self._bucket(key, cap, now) for key, cap in limits.items()]
+            if any(bucket[0] < amount for bucket in buckets):
+                return False
+            for bucket in buckets:
+                bucket[0] -= amount
+                bucket[2] += 1
+            return True
+
+    def request_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {key: bucket[2] for key, bucket in self._buckets.items()}
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+class SQLiteRateLimitBackend:
+    """Token buckets stored in a SQLite file shared by every process on the host
+
+    Each check or update is a single short transaction; `BEGIN IMMEDIATE`
+    takes the file's write lock so concurrent processes serialize on it.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, window_seconds: float, busy_timeout: float = 5.0):
+        self.path = path
+        self.window = window_seconds
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL,
+                requests INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection (sqlite3 connections are not shared across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _load(self, conn: sqlite3.Connection, limits: Dict[str, int], now: float) -> Dict[str, float]:
+        placeholders = ','.join('?' * len(limits))
+        rows = conn.execute(
+            f"SELECT key, tokens, updated FROM rate_limit_buckets WHERE key IN ({placeholders})",
+            list(limits)
+        ).fetchall()
+        levels = {key: float(cap) for key, cap in limits.items()}
+        for key, tokens, updated in rows:
+            levels[key] = _refill(tokens, updated, now, limits[key], self.window)
+        return levels
+
+    def available(self, limits: Dict[str, int]) -> Dict[str, float]:
+        """Get the tokens currently available for each key"""
+        conn = self._connection()
+        return self._load(conn, limits, time.time())
+
+    def _take(self, conn: sqlite3.Connection, levels: Dict[str, float], now: float, amount: float):
+        conn.executemany(
+            """
+            INSERT INTO rate_limit_buckets (key, tokens, updated, requests)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT(key) DO UPDATE SET
+                tokens = excluded.tokens,
+                updated = excluded.updated,
+                requests = requests + 1
+            """,
+            [(key, level - amount, now) for key, level in levels.items()]
+        )
+
+    def consume(self, limits: Dict[str, int], amount: float = 1.0):
+        """Take `amount` tokens from every key's bucket in one transaction"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            self._take(conn, self._load(conn, limits, now), now, amount)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def try_acquire(self, limits: Dict[str, int], amount: float = 1.0) -> bool:
+        """Take `amount` tokens from every key's bucket if all of them have it; otherwise take none
+
+        Refill, check and decrement run under one write lock, so processes
+        checking at the same moment can't overdraw a bucket.
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            levels = self._load(conn, limits, now)
+            acquired = all(level >= amount for level in levels.values())
+            if acquired:
+                self._take(conn, levels, now, amount)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return acquired
+
+    def request_counts(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT key, requests FROM rate_limit_buckets")
+        return {key: requests for key, requests in rows}
+
+    def reset(self):
+        self._connection().execute("DELETE FROM rate_limit_buckets")
+
+def create_backend(name: str = None):
+    """Build the rate limit backend selected in Config"""
+    name = (name or Config.RATE_LIMIT_BACKEND).lower()
+    if name == 'memory':
+        return MemoryRateLimitBackend(Config.RATE_LIMIT_WINDOW)
+    if name == 'sqlite':
+        return SQLiteRateLimitBackend(Config.RATE_LIMIT_STATE_PATH, Config.RATE_LIMIT_WINDOW)
+    raise ValueError(f"Unknown rate limit backend: {name}")
 
 class GlobalRateLimiter:
-    """Global rate limiter shared across all scrapers"""
+    """Global rate limiter shared across all scrapers
+
+    Requests draw from a token bucket for the site and one for all sites
+    combined. With the default SQLite backend the buckets live in a shared
+    state file, so the scheduler, scripts and any extra workers on the host
+    all spend the same budget.
+    """
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.initialize()
         return cls._instance
-    
-    def initialize(self):
+
+    def initialize(self, backend=None):
         """Initialize or reset the rate limiter"""
-        self.max_requests_per_session = 300  # Increased to 300 total requests across all sites
-        self.session_requests = deque(maxlen=self.max_requests_per_session)
+        self.max_requests_per_session = Config.RATE_LIMIT_MAX_REQUESTS
+        self.site_limit = self.max_requests_per_session // 3  # Each site gets 1/3 of the total
         self.session_start = datetime.now()
-        self.requests_per_site = {}  # Track requests per site
-        
+        self.backend = backend or create_backend()
+
+    def _limits(self, site_name: str) -> Dict[str, int]:
+        return {TOTAL_KEY: self.max_requests_per_session, site_name: self.site_limit}
+
     def can_make_request(self, site_name: str) -> bool:
         """Check if a new request is allowed"""
-        # Check total requests
-        if len(self.session_requests) >= self.max_requests_per_session:
-            return False
-            
-        # Check per-site requests (limit each site to 1/3 of total)
-        site_limit = self.max_requests_per_session // 3  # 100 requests per site
-        site_requests = self.requests_per_site.get(site_name, 0)
-        return site_requests < site_limit
-        
+        levels = self.backend.available(self._limits(site_name))
+        return all(tokens >= 1 for tokens in levels.values())
+
     def log_request(self, site_name: str):
         """Log a new request"""
-        now = datetime.now()
-        self.session_requests.append(now)
-        self.requests_per_site[site_name] = self.requests_per_site.get(site_name, 0) + 1
-        
+        self.backend.consume(self._limits(site_name))
+
+    def try_acquire(self, site_name: str) -> bool:
+        """Reserve a request for `site_name` if the site and total budgets allow it (check and log in one step)"""
+        return self.backend.try_acquire(self._limits(site_name))
+
     def get_stats(self) -> dict:
         """Get current rate limiting stats"""
+        counts = self.backend.request_counts()
         return {
-            'total_requests': len(self.session_requests),
+            'total_requests': counts.pop(TOTAL_KEY, 0),
             'max_requests': self.max_requests_per_session,
-            'requests_per_site': self.requests_per_site.copy(),
-            'session_start': self.session_start
-        }
\ No newline at end of file
+            'requests_per_site': counts,
+            'session_start': self.session_start,
+            'backend': self.backend.name
+        }
@@ -1,17 +1,25 @@
 from flask import Flask
-from app.database.database_init import db
-import os
+from app.database.database_init import db, start_snapshot_request
+from app.database.cache_store import create_store, data_version
+from app.database.job_index import JobIndex
+from app.database.snapshots import SnapshotReader
+from config.config import Config
+from .cache import Cache, SharedCache
 
-def create_app():
+def create_app(config_object=Config):
     app = Flask(__name__)
     
-    # Configure database
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///jobs.db')
+    # Configure database (the engine itself is shared with the scheduler and scripts)
+    app.config['SQLALCHEMY_DATABASE_URI'] = config_object.SQLALCHEMY_DATABASE_URI
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev')
+    app.config['SECRET_KEY'] = config_object.SECRET_KEY
     
     # Initialize extensions
     db.init_app(app)
+    if config_object.WEB_SNAPSHOTS:
+        # Page reads come from the scheduler's read snapshots (see app/database/snapshots.py)
+        app.extensions['snapshots'] = SnapshotReader(config_object.SNAPSHOT_DIRECTORY)
+        app.before_request(start_snapshot_request)
     
     # Register blueprints
     from .routes import main_bp
@@ -24,5 +32,27 @@ def create_app():
     # Create database tables
     with app.app_context():
         db.create_all()
+        engine = db.engine
+    
+    # Query results, invalidated by the data version the ingest path bumps (see app/web/cache.py)
+    backend = config_object.WEB_CACHE_BACKEND.lower()
+    max_bytes = int(config_object.WEB_CACHE_MAX_MB * 1024 * 1024)
+    store = app.extensions['cache_store'] = create_store(backend, config_object.WEB_CACHE_PATH,
+                                                         config_object.WEB_CACHE_REDIS_URL, max_bytes)
+    if backend == 'memory' or config_object.WEB_CACHE_ENTRIES <= 0:
+        app.extensions['cache'] = Cache(config_object.WEB_CACHE_ENTRIES, max_bytes, config_object.WEB_CACHE_STRIPES,
+                                        version=lambda: data_version(store))
+    else:
+        app.extensions['cache'] = SharedCache(store, namespace=str(engine.url), max_bytes=max_bytes)
+    
+    if config_object.JOB_INDEX:
+        # Listing pages are answered from memory, refreshed from the snapshot or live database
+        def index_source():
+            reader = app.extensions.get('snapshots')
+            return (reader.engine() if reader else None) or engine
+
+        # Loaded in the background: until it is ready, listing pages run SQL
+        job_index = app.extensions['job_index'] = JobIndex(version=lambda: data_version(store))
+        job_index.start(index_source, config_object.JOB_INDEX_REFRESH)
     
     return app
\ No newline at end of file
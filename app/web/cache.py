@@ -1,73 +1,308 @@
+"""Result cache for the web tier.
+
+Routes cache query results (listing pages, filtered totals, site stats)
+with the `cached` decorator, in the app's cache: by default a SharedCache
+over the SQLite store every worker on the host reads (or Redis; see
+app/database/cache_store.py), or a per-worker LRU (Cache) with
+WEB_CACHE_BACKEND=memory. Either way the key includes the global data
+version, which the ingest path bumps, so a scrape invalidates every worker
+at once without relying on TTLs.
+"""
+from collections import OrderedDict
+from datetime import date, datetime
 from functools import wraps
-from datetime import datetime, timedelta
 import hashlib
-import json
-from typing import Any, Dict, Optional
 import logging
+import pickle
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from flask import current_app, has_app_context
+
+from app.database.cache_store import DATA_VERSION
+from config.config import Config
+
+_MISSING = object()
+_UNSET = object()
+
+# Leaves of approximate_size: counted, never looked into
+_ATOMS = (str, bytes, int, float, bool, type(None), date, datetime)
+
+def approximate_size(value: Any) -> int:
+    """Rough deep size in bytes: containers, their items and plain objects' attributes"""
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, _ATOMS):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__') and not isinstance(item, type):
+            # ORM instance state is shared with the session, not owned by the entry
+            stack.extend(value for name, value in vars(item).items() if not name.startswith('_sa_'))
+    return total
+
+class _Stripe:
+    """One independently locked segment: an OrderedDict from least to most recently used"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()  # key -> (value, expires_at, size)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.counts = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'oversized': 0}
+
+    def pop(self, key: Hashable):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+        return entry
+
+    def shrink(self, now: float):
+        """Drop expired entries from the cold end, then evict until within both bounds"""
+        while self.entries:
+            key, (_, expires_at, size) = next(iter(self.entries.items()))
+            if expires_at > now and len(self.entries) <= self.max_entries and self.bytes <= self.max_bytes:
+                break
+            self.pop(key)
+            self.counts['expirations' if expires_at <= now else 'evictions'] += 1
 
 class Cache:
-    """Simple in-memory cache with TTL"""
-    
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        
-    def set(self, key: str, value: Any, ttl_seconds: int = 300):
-        """Set a cache value with TTL"""
-        expires_at = datetime.now() + timedelta(seconds=ttl_seconds)
-        self._cache[key] = {
-            'value': value,
-            'expires_at': expires_at
-        }
-        
-    def get(self, key: str) -> Optional[Any]:
-        """Get a cache value if not expired"""
-        if key not in self._cache:
-            return None
-            
-        cache_data = self._cache[key]
-        if datetime.now() > cache_data['expires_at']:
-            del self._cache[key]
-            return None
-            
-        return cache_data['value']
-        
-    def delete(self, key: str):
+    """Bounded in-memory LRU cache with TTL, safe to share between request threads
+
+    Keys are spread over `stripes` segments, each behind its own lock, so
+    concurrent requests rarely wait on each other. A segment holds at most
+    its share of `max_entries` and `max_bytes` (sizes per approximate_size)
+    and evicts least recently used entries to stay within both; expired
+    entries are dropped when read or when they reach the cold end. Cached
+    None values are hits like any other. With a `version` callable, every
+    entry is dropped when its value changes (see check_version).
+    """
+
+    def __init__(self,
+                 max_entries: int = 1024,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 stripes: int = 16,
+                 version: Optional[Callable[[], Any]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = version
+        count = max(1, min(stripes, max_entries))
+        self._stripes = [_Stripe(max(1, max_entries // count), max(1, max_bytes // count)) for _ in range(count)]
+        self._version = _UNSET
+        self._version_lock = threading.Lock()
+        self._invalidations = 0
+
+    def _stripe(self, key: Hashable) -> _Stripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """The cached value, or `default` if absent or expired"""
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                stripe.pop(key)
+                stripe.counts['expirations'] += 1
+                entry = None
+            if entry is None:
+                stripe.counts['misses'] += 1
+                return default
+            stripe.entries.move_to_end(key)
+            stripe.counts['hits'] += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float = 300, version: Any = _MISSING):
+        """Cache a value for `ttl_seconds`
+
+        Pass the `version` check_version returned before computing the value:
+        if the data has changed since, the value is already stale and is not
+        stored.
+        """
+        if self.max_entries <= 0 or ttl_seconds <= 0:
+            return
+        if self.version is not None and version is not _MISSING and version != self._version:
+            return
+        size = approximate_size(value)
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.pop(key)
+            if size > stripe.max_bytes:
+                stripe.counts['oversized'] += 1
+                return
+            now = time.monotonic()
+            stripe.entries[key] = (value, now + ttl_seconds, size)
+            stripe.bytes += size
+            stripe.shrink(now)
+
+    def delete(self, key: Hashable):
         """Delete a cache entry"""
-        if key in self._cache:
-            del self._cache[key]
-            
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.pop(key)
+
     def clear(self):
         """Clear all cache entries"""
-        self._cache.clear()
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+                stripe.bytes = 0
+
+    def check_version(self) -> Any:
+        """Clear the cache if the version source has moved on; returns the current version"""
+        if self.version is None:
+            return None
+        current = self.version()
+        if current != self._version:
+            with self._version_lock:
+                if current != self._version:
+                    if self._version is not _UNSET:
+                        self._invalidations += 1
+                        logging.debug("Data changed, web cache cleared")
+                    self.clear()
+                    self._version = current
+        return current
+
+    def __len__(self) -> int:
+        return sum(len(stripe.entries) for stripe in self._stripes)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit/miss/eviction counters, summed over the stripes"""
+        totals = {'entries': 0, 'bytes': 0, 'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'oversized': 0}
+        for stripe in self._stripes:
+            with stripe.lock:
+                totals['entries'] += len(stripe.entries)
+                totals['bytes'] += stripe.bytes
+                for name, count in stripe.counts.items():
+                    totals[name] += count
+        lookups = totals['hits'] + totals['misses']
+        totals.update(backend='memory', invalidations=self._invalidations, max_entries=self.max_entries,
+                      max_bytes=self.max_bytes, hit_rate=round(totals['hits'] / lookups, 4) if lookups else None)
+        return totals
+
+class SharedCache:
+    """Results pickled into a store shared by every worker (see app/database/cache_store.py)
+
+    Same interface as Cache. Keys are digests of the namespace (the
+    database URL, so apps on different databases never share entries) and
+    the caller's key, which carries the data version. Store errors count
+    as misses, so an unreachable Redis degrades to uncached pages.
+    """
+
+    def __init__(self, store, namespace: str = '', max_bytes: Optional[int] = None):
+        self.store = store
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'misses': 0, 'errors': 0, 'oversized': 0}
 
-# Initialize global cache
-cache = Cache()
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _key(self, key: Hashable) -> str:
+        return hashlib.blake2b(pickle.dumps((self.namespace, key), protocol=4), digest_size=16).hexdigest()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            data = self.store.get(self._key(key))
+            value = pickle.loads(data) if data is not None else _MISSING
+        except Exception as e:
+            logging.debug(f"Shared cache read failed: {e}")
+            self._count('errors')
+            value = _MISSING
+        self._count('misses' if value is _MISSING else 'hits')
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float = 300, version: Any = _MISSING):
+        if ttl_seconds <= 0:
+            return
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if self.max_bytes is not None and len(data) > self.max_bytes:
+                self._count('oversized')
+                return
+            self.store.set(self._key(key), data, ttl_seconds)
+        except Exception as e:
+            logging.debug(f"Shared cache write failed: {e}")
+            self._count('errors')
+
+    def delete(self, key: Hashable):
+        self.store.delete(self._key(key))
+
+    def clear(self):
+        self.store.clear()
+
+    def check_version(self) -> Any:
+        """The store's data version (stale entries need no clearing: their keys carry an older one)"""
+        try:
+            return self.store.counter(DATA_VERSION)
+        except Exception as e:
+            logging.debug(f"Shared cache version read failed: {e}")
+            self._count('errors')
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = dict(self._counts)
+        lookups = totals['hits'] + totals['misses']
+        totals['hit_rate'] = round(totals['hits'] / lookups, 4) if lookups else None
+        try:
+            totals['store'] = self.store.stats()
+        except Exception as e:
+            totals['store'] = {'error': str(e)}
+        return totals
+
+# Process-wide cache for code running outside an app; each app gets its own (see create_app)
+cache = Cache(Config.WEB_CACHE_ENTRIES, int(Config.WEB_CACHE_MAX_MB * 1024 * 1024), Config.WEB_CACHE_STRIPES)
+
+def current_cache() -> Cache:
+    """The current app's cache, or the process-wide one outside an app context"""
+    if has_app_context():
+        return current_app.extensions.get('cache', cache)
+    return cache
 
 def cached(ttl_seconds: int = 300):
-    """Decorator for caching function results"""
+    """Decorator for caching function results, keyed by the function and its arguments
+
+    Arguments must be hashable; calls with unhashable ones are not cached.
+    Keys include the cache's data version, so results computed before the
+    data changed are never returned. Results are shared between requests,
+    so callers must not mutate them.
+    """
     def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Create cache key from function name and arguments
-            key_parts = [func.__name__]
-            key_parts.extend(str(arg) for arg in args)
-            key_parts.extend(f"{k}:{v}" for k, v in sorted(kwargs.items()))
-            
-            cache_key = hashlib.md5(
-                json.dumps(key_parts).encode()
-            ).hexdigest()
-            
-            # Try to get from cache
-            cached_value = cache.get(cache_key)
-            if cached_value is not None:
+            try:
+                hash((args, tuple(kwargs.items())))
+            except TypeError:
+                return func(*args, **kwargs)
+
+            store = current_cache()
+            version = store.check_version()
+            key = (version, name, args, tuple(sorted(kwargs.items()))) if kwargs else (version, name, args)
+            value = store.get(key, _MISSING)
+            if value is not _MISSING:
                 logging.debug(f"Cache hit for {func.__name__}")
-                return cached_value
-                
-            # Get fresh value
+                return value
+
             value = func(*args, **kwargs)
-            cache.set(cache_key, value, ttl_seconds)
+            store.set(key, value, ttl_seconds, version=version)
             logging.debug(f"Cache miss for {func.__name__}")
-            
             return value
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
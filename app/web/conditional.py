@@ -0,0 +1,101 @@
+"""Conditional GET (ETag/Last-Modified) for the job pages and API.
+
+Validators come from state that is cheaper to read than the page: the
+data version, the applications version and the time of the last bump,
+read from the cache store in one lookup (see app/database/cache_store.py),
+plus the route's normalized query parameters for listings, or the job's
+and its application's update stamps for detail pages. A request whose
+If-None-Match (or, without one, If-Modified-Since) still holds gets a 304
+before the page's queries run. Cache-Control comes from Config per route.
+"""
+from datetime import datetime
+import hashlib
+from typing import Any, Optional
+
+from flask import current_app, request, session
+from werkzeug.http import is_resource_modified
+
+from app.database.cache_store import APPLICATIONS_VERSION, DATA_MODIFIED, DATA_VERSION, data_state
+
+class Validators:
+    """ETag and Last-Modified of one representation of a page"""
+
+    def __init__(self, etag: str, last_modified: Optional[datetime] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def matches(self) -> bool:
+        """Whether the client's cached copy is still current (GET and HEAD only)
+
+        Pages with flashed messages waiting to be shown are always sent in full.
+        """
+        if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+            return False
+        return not is_resource_modified(request.environ, etag=self.etag, last_modified=self.last_modified)
+
+    def apply(self, response, cache_control: Optional[str] = None):
+        """Set the validators and Cache-Control on a response"""
+        response.set_etag(self.etag)
+        if self.last_modified is not None:
+            response.last_modified = self.last_modified
+        if cache_control:
+            response.headers['Cache-Control'] = cache_control
+        return response
+
+    def not_modified(self, cache_control: Optional[str] = None):
+        """An empty 304 carrying the same headers as the full response"""
+        return self.apply(current_app.response_class(status=304), cache_control)
+
+def _etag(*parts: Any) -> str:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+def _modified(state) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(state[DATA_MODIFIED]) if state[DATA_MODIFIED] else None
+
+def _state():
+    """The store's versions, or None when validators can't be trusted
+
+    That is when the store is unreachable, or when this worker's job index
+    hasn't caught up with the current data version yet: pages it serves
+    until then may predate the version.
+    """
+    state = data_state(current_app.extensions.get('cache_store'))
+    if state is None:
+        return None
+    job_index = current_app.extensions.get('job_index')
+    if job_index is not None and job_index.data_version != state[DATA_VERSION]:
+        return None
+    return state
+
+def is_conditional() -> bool:
+    """Whether the request asks to revalidate a cached copy"""
+    return 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
+
+def listing_validators(route: str, *params: Any) -> Optional[Validators]:
+    """Validators for a listing page, given its normalized parameters (None: serve it unvalidated)"""
+    state = _state()
+    if state is None:
+        return None
+    return Validators(_etag(route, state[DATA_VERSION], state[APPLICATIONS_VERSION], params), _modified(state))
+
+def detail_validators(job_id: int, job_updated: Optional[datetime],
+                      application_updated: Optional[datetime]) -> Optional[Validators]:
+    """Validators for a job's detail page from its update stamps
+
+    The data version is included too: ingest upserts and archiving change
+    the page (its next/previous links) without touching the job's stamp.
+    """
+    state = _state()
+    if state is None:
+        return None
+    stamps = [stamp for stamp in (job_updated, application_updated, _modified(state)) if stamp is not None]
+    return Validators(_etag('job_detail', job_id, job_updated, application_updated, state[DATA_VERSION]),
+                      max(stamps) if stamps else None)
+
+def finish(response, validators: Optional[Validators], cache_control: Optional[str] = None):
+    """Set a full response's validators, if there are any, and its route's Cache-Control"""
+    if validators is not None:
+        return validators.apply(response, cache_control)
+    if cache_control:
+        response.headers['Cache-Control'] = cache_control
+    return response
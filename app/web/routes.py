@@ -1,19 +1,81 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+from flask import Blueprint, current_app, render_template, request, jsonify, redirect, url_for, flash, abort, make_response
+from sqlalchemy.orm import undefer
 from app.database.models import Job, JobApplication
-from app.database.repository import JobRepository
-from sqlalchemy import or_, and_
+from app.database.repository import JobRepository, JobApplicationRepository, RunHistoryRepository, StatsRepository
+from app.database.engine import pool_status
+from app.database.queries import SOFTWARE_JOB_KEYWORDS, apply_job_filters, keyword_scans
+from app.database.pagination import KeysetPage, keyset_page, capped_count, InvalidCursor, SORT_KEYS, DEFAULT_SORT
+from app.database import aggregates
+from app.database.cache_store import APPLICATIONS_VERSION, bump_data_version
+from config.config import Config
 from datetime import datetime
 from . import db
+from .cache import cached, current_cache
+from .conditional import detail_validators, finish, is_conditional, listing_validators
 
 main_bp = Blueprint('main', __name__)
-
-SOFTWARE_JOB_KEYWORDS = [
-    'software engineer',
-    'software developer',
-    'full stack developer',
-    'backend engineer',
-    'java developer'
-]
+JOB_COLUMNS = tuple(column.key for column in Job.__mapper__.column_attrs)
+JOB_MANAGER = Job.__mapper__.class_manager
+
+@cached(ttl_seconds=Config.WEB_CACHE_TTL)
+def scan_keyword(keyword: str) -> bool:
+    """Whether a keyword is matched by scanning (see keyword_scans), decided once for its pages and totals"""
+    return keyword_scans(db.session, keyword)
+
+def filtered_jobs(keyword: str, location: str, company: str):
+    """Job query for a listing filter"""
+    return apply_job_filters(Job.query, keyword, location, company, scan=scan_keyword(keyword) if keyword else None)
+
+@cached(ttl_seconds=Config.LISTING_COUNT_TTL)
+def listing_total(keyword: str, location: str, company: str):
+    """(total, is_estimate) for a listing filter
+
+    The unfiltered listing is counted exactly from job_aggregates (less the
+    near duplicates it hides); filtered totals are counted up to
+    LISTING_COUNT_LIMIT and cached briefly.
+    """
+    if not (keyword or location or company) and aggregates.aggregates_available(db.engine):
+        return aggregates.listed_total(db.session), False
+    return capped_count(filtered_jobs(keyword, location, company), Config.LISTING_COUNT_LIMIT)
+
+def listing_page(keyword: str, location: str, company: str, sort_by: str, cursor, per_page: int,
+                 include_description: bool = False):
+    """Keyset page of the filtered listing, from the in-memory job index when it can answer"""
+    job_index = current_app.extensions.get('job_index')
+    if job_index is not None and not include_description:
+        page = job_index.page(sort_by, cursor, per_page, keyword, location, company)
+        if page is not None:
+            return page
+    return query_listing_page(keyword, location, company, sort_by, cursor, per_page, include_description)
+
+def query_listing_page(keyword: str, location: str, company: str, sort_by: str, cursor, per_page: int,
+                       include_description: bool):
+    """Keyset page of the filtered listing from SQL, as transient Jobs built from its cached rows"""
+    rows, next_cursor, prev_cursor = query_listing_rows(keyword, location, company, sort_by, cursor, per_page,
+                                                        include_description)
+    jobs = []
+    for row in rows:
+        # Like the job index's jobs: unloaded columns read as None instead of loading
+        job = JOB_MANAGER.new_instance()
+        job.__dict__.update(row)
+        jobs.append(job)
+    return KeysetPage(jobs, next_cursor, prev_cursor)
+
+@cached(ttl_seconds=Config.WEB_CACHE_TTL)
+def query_listing_rows(keyword: str, location: str, company: str, sort_by: str, cursor, per_page: int,
+                       include_description: bool):
+    """(column values of each job, next cursor, prev cursor) of a listing page (cached; shared between requests)
+
+    Plain values rather than the ORM instances, which can't be shared
+    between threads or pickled by the shared cache stores.
+    """
+    # Base query - always filter for US jobs and software engineering roles
+    query = filtered_jobs(keyword, location, company)
+    if include_description:
+        query = query.options(undefer(Job.description))
+    page = keyset_page(query, sort_by, cursor, per_page)
+    rows = [{key: job.__dict__[key] for key in JOB_COLUMNS if key in job.__dict__} for job in page.items]
+    return rows, page.next_cursor, page.prev_cursor
 
 @main_bp.route('/')
 def index():
@@ -28,65 +90,55 @@ def job_list():
     location = request.args.get('location', '')
     company = request.args.get('company', '')
     sort_by = request.args.get('sort', 'posted_date')
-    page = request.args.get('page', 1, type=int)
+    if sort_by not in SORT_KEYS:
+        sort_by = DEFAULT_SORT
+    cursor = request.args.get('cursor')
+    validators = listing_validators('job_list', keyword, location, company, sort_by, cursor)
+    if validators and validators.matches():
+        return validators.not_modified(Config.CACHE_CONTROL_JOB_LIST)
     
-    # Base query - always filter for US jobs and software engineering roles
-    query = Job.query.filter(
-        and_(
-            Job.location.ilike('%United States%'),
-            or_(*[Job.title.ilike(f'%{kw}%') for kw in SOFTWARE_JOB_KEYWORDS])
-        )
-    )
-
-    # Apply additional filters
-    if keyword:
-        query = query.filter(
-            or_(
-                Job.title.ilike(f'%{keyword}%'),
-                Job.description.ilike(f'%{keyword}%')
-            )
-        )
-    if location:
-        query = query.filter(Job.location.ilike(f'%{location}%'))
-    if company:
-        query = query.filter(Job.company.ilike(f'%{company}%'))
-
-    # Apply sorting
-    if sort_by == 'posted_date':
-        query = query.order_by(Job.posted_date.desc())
-    elif sort_by == 'company':
-        query = query.order_by(Job.company)
-    elif sort_by == 'title':
-        query = query.order_by(Job.title)
-
-    # Pagination with larger per_page value
-    per_page = 50
-    jobs = query.paginate(page=page, per_page=per_page, error_out=False)
-
-    return render_template('jobs/list.html',
-                         jobs=jobs,
-                         keyword=keyword,
-                         location=location,
-                         company=company,
-                         sort_by=sort_by)
+    # Keyset pagination: each page seeks from the cursor instead of skipping rows
+    try:
+        jobs = listing_page(keyword, location, company, sort_by, cursor, Config.JOB_LIST_PER_PAGE)
+    except InvalidCursor:
+        jobs = listing_page(keyword, location, company, sort_by, None, Config.JOB_LIST_PER_PAGE)
+    jobs.total, jobs.total_is_estimate = listing_total(keyword, location, company)
+    statuses = JobApplicationRepository(db.session).statuses_for([job.id for job in jobs.items])
+
+    response = make_response(render_template('jobs/list.html',
+                                             jobs=jobs,
+                                             statuses=statuses,
+                                             keyword=keyword,
+                                             location=location,
+                                             company=company,
+                                             sort_by=sort_by))
+    return finish(response, validators, Config.CACHE_CONTROL_JOB_LIST)
 
 @main_bp.route('/jobs/<int:job_id>')
 def job_detail(job_id):
     """Job detail page"""
-    job = Job.query.get_or_404(job_id)
-    
-    # Get next and previous job IDs for navigation
-    next_job = Job.query.filter(Job.id > job_id).order_by(Job.id.asc()).first()
-    prev_job = Job.query.filter(Job.id < job_id).order_by(Job.id.desc()).first()
-    
-    # Get job application if exists
-    application = JobApplication.query.filter_by(job_id=job_id).first()
-    
-    return render_template('jobs/detail.html',
-                         job=job,
-                         next_job=next_job,
-                         prev_job=prev_job,
-                         application=application)
+    repository = JobRepository(db.session)
+    if is_conditional():
+        # Revalidation: the stamps alone, before paying for the page
+        stamps = repository.detail_stamps(job_id)
+        if stamps is None:
+            abort(404)
+        validators = detail_validators(job_id, *stamps)
+        if validators and validators.matches():
+            return validators.not_modified(Config.CACHE_CONTROL_JOB_DETAIL)
+
+    # Job, application, next/previous job IDs and stamps in a single query
+    detail = repository.get_detail(job_id)
+    if detail is None:
+        abort(404)
+    validators = detail_validators(job_id, *detail['stamps'])
+
+    response = make_response(render_template('jobs/detail.html',
+                                             job=detail['job'],
+                                             next_job_id=detail['next_id'],
+                                             prev_job_id=detail['prev_id'],
+                                             application=detail['application']))
+    return finish(response, validators, Config.CACHE_CONTROL_JOB_DETAIL)
 
 @main_bp.route('/jobs/<int:job_id>/status', methods=['POST'])
 def update_job_status(job_id):
@@ -116,62 +168,86 @@ def update_job_status(job_id):
             application.applied_date = datetime.now()
     
     db.session.commit()
+    # Listing pages show the status, so their validators must change
+    bump_data_version(current_app.extensions.get('cache_store'), APPLICATIONS_VERSION)
     flash('Job status updated successfully', 'success')
     return redirect(url_for('main.job_detail', job_id=job_id))
 
+@cached(ttl_seconds=Config.WEB_CACHE_TTL)
+def site_overview():
+    """Site-wide job counts for the about page (cached)"""
+    return StatsRepository(db.session).overview()
+
 @main_bp.route('/about')
 def about():
     """About page with statistics"""
-    stats = {
-        'total_jobs': Job.query.filter(
-            and_(
-                Job.location.ilike('%United States%'),
-                or_(*[Job.title.ilike(f'%{kw}%') for kw in SOFTWARE_JOB_KEYWORDS])
-            )
-        ).count(),
-        'total_companies': db.session.query(Job.company).distinct().count(),
-        'total_locations': db.session.query(Job.location).distinct().count(),
-        'job_types': SOFTWARE_JOB_KEYWORDS
-    }
-    return render_template('about.html', **stats)
+    return render_template('about.html', **site_overview(), job_types=SOFTWARE_JOB_KEYWORDS)
 
 @main_bp.route('/api/jobs')
 def api_jobs():
-    """API endpoint for job data"""
+    """API endpoint for job data
+
+    Pass `next_cursor`/`prev_cursor` from a response back as `cursor` to page;
+    `count=0` skips the total and `description=1` includes job descriptions.
+    Responses carry an ETag; send it back in If-None-Match to get a 304
+    while the data is unchanged.
+    """
     keyword = request.args.get('keyword', '')
     location = request.args.get('location', '')
     company = request.args.get('company', '')
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
-
-    # Base query - always filter for US jobs and software engineering roles
-    query = Job.query.filter(
-        and_(
-            Job.location.ilike('%United States%'),
-            or_(*[Job.title.ilike(f'%{kw}%') for kw in SOFTWARE_JOB_KEYWORDS])
-        )
-    )
-
-    # Apply additional filters
-    if keyword:
-        query = query.filter(
-            or_(
-                Job.title.ilike(f'%{keyword}%'),
-                Job.description.ilike(f'%{keyword}%')
-            )
-        )
-    if location:
-        query = query.filter(Job.location.ilike(f'%{location}%'))
-    if company:
-        query = query.filter(Job.company.ilike(f'%{company}%'))
+    sort_by = request.args.get('sort', DEFAULT_SORT)
+    if sort_by not in SORT_KEYS:
+        return jsonify({'error': f"Unknown sort '{sort_by}'"}), 400
+    per_page = max(1, min(request.args.get('per_page', 50, type=int), Config.API_MAX_PER_PAGE))
+    include_total = request.args.get('count', '1').lower() not in ('0', 'false', 'no')
+    include_description = request.args.get('description', '0').lower() in ('1', 'true', 'yes')
+    cursor = request.args.get('cursor')
+    validators = listing_validators('api_jobs', keyword, location, company, sort_by, cursor, per_page,
+                                    include_total, include_description)
+    if validators and validators.matches():
+        return validators.not_modified(Config.CACHE_CONTROL_API_JOBS)
+
+    try:
+        page = listing_page(keyword, location, company, sort_by, cursor, per_page, include_description)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+
+    statuses = JobApplicationRepository(db.session).statuses_for([job.id for job in page.items])
+    response = {
+        'jobs': [dict(job.to_dict(include_description), application_status=statuses.get(job.id)) for job in page.items],
+        'per_page': per_page,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor
+    }
+    if include_total:
+        response['total'], response['total_is_estimate'] = listing_total(keyword, location, company)
+    response = jsonify(response)
+    return finish(response, validators, Config.CACHE_CONTROL_API_JOBS)
 
-    # Paginate
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    jobs = pagination.items
+@main_bp.route('/api/stats')
+def api_stats():
+    """API endpoint for site-wide job and application counts"""
+    days = min(request.args.get('days', 30, type=int), 365)
+    stats = StatsRepository(db.session)
 
     return jsonify({
-        'jobs': [job.to_dict() for job in jobs],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': pagination.page
-    })
\ No newline at end of file
+        **stats.overview(),
+        **stats.breakdown(days=days),
+        'applications': JobApplicationRepository(db.session).get_application_stats()
+    })
+
+@main_bp.route('/api/scheduler/status')
+def scheduler_status():
+    """Scheduler run history and scraping efficiency trend"""
+    days = min(request.args.get('days', 30, type=int), 365)
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    history = RunHistoryRepository(db.session)
+    
+    latest = history.latest_run()
+    return jsonify({
+        'last_run': latest.to_dict() if latest else None,
+        'recent_runs': [run.to_dict() for run in history.recent_runs(limit)],
+        'trend': history.efficiency_trend(days=days, source=request.args.get('source')),
+        'database_pool': pool_status(db.engine.url),
+        'web_cache': current_cache().stats()
+    })
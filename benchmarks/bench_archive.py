@@ -0,0 +1,81 @@
+"""Hot/cold tiering: database size and query latency before and after archiving.
+
+Jobs are spread over two years of posting dates; everything older than 90
+days is archived.
+
+Usage: python benchmarks/bench_archive.py [rows]   (default: 200000)
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy.orm import Session
+
+from app.database.archive import archive_jobs, archive_path
+from app.database.engine import get_engine
+from app.database.models import Base, Job
+from app.database.queries import apply_job_filters
+from app.database.repository import JobRepository
+
+def populate(engine, rows: int):
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    raw = engine.raw_connection()
+    for start in range(0, rows, 10000):
+        raw.executemany(
+            "INSERT INTO jobs (title, company, location, description, job_key, posted_date, is_us, role_family, "
+            "is_active, state, city) VALUES (?, ?, 'Austin, TX, United States', ?, ?, ?, 1, 'software', 1, 'TX', 'Austin')",
+            [(f"Software Engineer {rng.randrange(500)}", f"Company {rng.randrange(20000)}",
+              'Build and run Python services. ' * 40, f"bench:{i}",
+              now - timedelta(seconds=rng.randrange(730 * 86400))) for i in range(start, min(rows, start + 10000))]
+        )
+        raw.commit()
+    raw.execute("ANALYZE")
+    raw.close()
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def measure(engine, path: str, label: str):
+    session = Session(bind=engine)
+    listing = apply_job_filters(session.query(Job))
+    statistics = timed(JobRepository(session).get_job_statistics, 3)
+    count = timed(listing.count, 3)
+    search = timed(lambda: JobRepository(session).search(keywords='python'), 3)
+    session.close()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"{label:<8} {os.path.getsize(path) / 1e6:8.1f}MB {statistics:10.1f}ms {count:10.1f}ms {search:10.1f}ms")
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.db')
+        engine = get_engine(f"sqlite:///{path}")
+        populate(engine, rows)
+        print(f"{rows} jobs over two years, archiving those older than 90 days")
+        print(f"{'':<8} {'hot file':>10} {'statistics':>12} {'count':>12} {'search':>12}")
+        measure(engine, path, 'before')
+
+        result = archive_jobs(engine, older_than_days=90)
+        measure(engine, path, 'after')
+        print(f"\narchived {result['archived']} jobs in {result['duration_ms'] / 1000:.1f}s "
+              f"({result['freed_pages']} pages released), archive file "
+              f"{os.path.getsize(archive_path(path)) / 1e6:.1f}MB")
+
+if __name__ == '__main__':
+    main()
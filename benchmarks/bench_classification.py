@@ -0,0 +1,88 @@
+"""Listing/count latency: precomputed classification columns vs the old OR-of-ILIKE filter.
+
+Usage: python benchmarks/bench_classification.py [rows ...]   (default: 100000)
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, and_, or_
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Job
+from app.database.classifier import classify, SOFTWARE_JOB_KEYWORDS
+from app.database.queries import us_software_filter, apply_job_sort
+
+TITLES = ['Senior Software Engineer', 'Backend Engineer II', 'Full Stack Developer', 'Java Developer',
+          'Data Engineer', 'Product Manager', 'Account Executive', 'Nurse', 'Site Reliability Engineer']
+LOCATIONS = ['Austin, TX, United States', 'Remote, United States', 'Toronto, Canada', 'London, United Kingdom']
+
+def ilike_filter():
+    """The filter every request rebuilt before classification"""
+    return and_(
+        Job.location.ilike('%United States%'),
+        or_(*[Job.title.ilike(f'%{kw}%') for kw in SOFTWARE_JOB_KEYWORDS])
+    )
+
+def populate(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    now = datetime(2026, 1, 1)
+    batch = []
+    start = time.perf_counter()
+    classify_time = 0.0
+    raw = engine.raw_connection()
+    for i in range(rows):
+        title, location = rng.choice(TITLES), rng.choice(LOCATIONS)
+        t = time.perf_counter()
+        classes = classify(title, location)
+        classify_time += time.perf_counter() - t
+        batch.append((title, f"Company {rng.randrange(5000)}", location, f"bench:{i}", now - timedelta(minutes=i),
+                      classes['is_us'], classes['role_family'], classes['is_remote']))
+        if len(batch) == 10000 or i == rows - 1:
+            raw.executemany(
+                "INSERT INTO jobs (title, company, location, job_key, posted_date, is_us, role_family, is_remote) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            raw.commit()
+            batch = []
+    raw.close()
+    print(f"loaded in {time.perf_counter() - start:.1f}s, classify() {classify_time / rows * 1e6:.1f}us/row")
+    return engine
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"\n{rows} jobs")
+            engine = populate(os.path.join(tmp, 'jobs.db'), rows)
+            session = sessionmaker(bind=engine)()
+            print(f"{'query':22} {'ILIKE':>10} {'columns':>10}")
+            for sort in ('posted_date', 'company', 'title'):
+                old = apply_job_sort(session.query(Job).filter(ilike_filter()), sort).offset(500).limit(50)
+                new = apply_job_sort(session.query(Job).filter(us_software_filter()), sort).offset(500).limit(50)
+                print(f"{'page 11 by ' + sort:22} {timed(old.all):8.1f}ms {timed(new.all):8.1f}ms")
+            old = session.query(Job).filter(ilike_filter())
+            new = session.query(Job).filter(us_software_filter())
+            print(f"{'count':22} {timed(old.count, 3):8.1f}ms {timed(new.count, 3):8.1f}ms")
+            session.close()
+            engine.dispose()
+
+if __name__ == '__main__':
+    main()
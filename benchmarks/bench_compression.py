@@ -0,0 +1,119 @@
+"""Description storage: plain text vs zlib vs zlib with a trained dictionary.
+
+Reports the database size and the latency of a 50-row listing page, with
+the description loaded (the old behaviour) and deferred. The storages are
+timed in interleaved rounds, so drift in the machine's load (or the page
+cache warming up) doesn't favour whichever one runs first.
+
+Usage: python benchmarks/bench_compression.py [rows]   (default: 50000)
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker, undefer
+
+from app.database import compression
+from app.database.models import Base, Job
+from app.database.pagination import keyset_page
+from app.database.queries import apply_job_filters
+
+WORDS = ('python java kotlin go rust services platform api data pipeline cloud team customers scale '
+         'design build own ship review mentor reliable distributed systems product users growth').split()
+BENEFITS = [
+    "We offer competitive salary, equity, medical, dental and vision insurance, and a 401k with company match.",
+    "Benefits include unlimited PTO, paid parental leave, a home office stipend and learning budget.",
+    "Enjoy flexible hours, remote-friendly culture, wellness programs and annual team offsites.",
+]
+EEO = [
+    "We are an equal opportunity employer and value diversity at our company. We do not discriminate on the basis "
+    "of race, religion, color, national origin, gender, sexual orientation, age, marital status, veteran status, "
+    "or disability status.",
+    "Applicants will receive consideration for employment without regard to race, color, religion, sex, sexual "
+    "orientation, gender identity, national origin, disability or protected veteran status.",
+]
+
+def description(rng: random.Random, company: int) -> str:
+    about = (f"Company {company} is building the future of {rng.choice(WORDS)} for teams everywhere. "
+             f"Founded in {2000 + company % 20}, we are backed by leading investors.")
+    duties = ' '.join(' '.join(rng.choice(WORDS) for _ in range(12)).capitalize() + '.' for _ in range(8))
+    return '\n'.join([about, duties, rng.choice(BENEFITS), rng.choice(BENEFITS), rng.choice(EEO)])
+
+def populate(path: str, rows: int, mode: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    now = datetime(2026, 1, 1)
+    jobs = [{'title': f"Software Engineer {i}", 'company': f"Company {i % 300}", 'job_key': f"bench:{i}",
+             'description': description(rng, i % 300), 'posted_date': now - timedelta(minutes=i)}
+            for i in range(rows)]
+    insert = "INSERT INTO jobs (title, company, description, job_key, posted_date, is_us, role_family, is_active) " \
+             "VALUES (:title, :company, {}, :job_key, :posted_date, 1, 'software', 1)"
+    if mode == 'dictionary':
+        # Train on the first rows as a live database would, then compress those in place
+        with engine.begin() as conn:
+            conn.execute(text(insert.format(':description')), jobs[:5000])
+        compression.train(engine, samples=5000)
+        jobs = jobs[5000:]
+    with engine.begin() as conn:
+        value = ':description' if mode == 'plain' else 'job_compress(:description)'
+        conn.execute(text(insert.format(value)), jobs)
+    if mode == 'dictionary':
+        compression.compress_stored(engine)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    return engine
+
+ROUNDS = 10
+
+def timed(fn, repeat: int = 20) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    print(f"{rows} jobs; listing = one 50-row keyset page serialized with to_dict()")
+    print(f"{'storage':<12} {'db size':>9} {'jobs table':>11} {'list + description':>20} {'list (deferred)':>17}")
+    with tempfile.TemporaryDirectory() as tmp:
+        listings, sizes = {}, {}
+        for mode in ('plain', 'zlib', 'dictionary'):
+            path = os.path.join(tmp, f'{mode}.db')
+            engine = populate(path, rows, mode)
+            session = sessionmaker(bind=engine)()
+            query = apply_job_filters(session.query(Job))
+
+            def listing(eager, session=session, query=query):
+                session.expire_all()
+                page = keyset_page(query.options(undefer(Job.description)) if eager else query, 'posted_date', None, 50)
+                return [job.to_dict(include_description=eager) for job in page.items]
+
+            with engine.connect() as conn:
+                table = conn.exec_driver_sql("SELECT sum(pgsize) FROM dbstat WHERE name = 'jobs'").scalar()
+            listings[mode], sizes[mode] = (listing, session, engine), (os.path.getsize(path), table)
+
+        best = {mode: [float('inf'), float('inf')] for mode in listings}
+        for _ in range(ROUNDS):
+            for mode, (listing, _, _) in listings.items():
+                best[mode][0] = min(best[mode][0], timed(lambda: listing(True)))
+                best[mode][1] = min(best[mode][1], timed(lambda: listing(False)))
+        for mode, (listing, session, engine) in listings.items():
+            size, table = sizes[mode]
+            print(f"{mode:<12} {size / 1e6:7.1f}MB {table / 1e6:9.1f}MB {best[mode][0]:18.2f}ms {best[mode][1]:15.2f}ms")
+            session.close()
+            engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Near-duplicate detection: lookup cost against a large LSH index, and accuracy.
+
+Indexes `rows` jobs (default 1M): 20,000 real postings plus filler
+signatures for the rest, so the bucket table has its full size. Then 1,000
+reworded copies of real postings from another board and 1,000 new postings
+are checked one at a time, as ingest does.
+
+Usage: python benchmarks/bench_dedup.py [rows]   (default: 1000000)
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy.orm import Session
+
+from app.database import dedup
+from app.database.engine import get_engine
+from app.database.models import Base
+
+REAL = 20_000
+PROBES = 1_000
+TITLES = ['Software Engineer', 'Senior Software Engineer', 'Backend Engineer', 'Full Stack Developer', 'Java Developer']
+CITIES = [('Austin', 'TX', 'Texas'), ('Seattle', 'WA', 'Washington'), ('New York', 'NY', 'New York'), ('Denver', 'CO', 'Colorado')]
+WORDS = ('python java kotlin go rust services platform api data pipeline cloud team customers scale design build own '
+         'ship review mentor reliable distributed systems product users growth payments search ads infra mobile').split()
+
+def posting(rng: random.Random, i: int) -> dict:
+    city, code, _ = rng.choice(CITIES)
+    return {'id': i + 1, 'source': 'LinkedIn', 'title': rng.choice(TITLES), 'company': f"Company {rng.randrange(3000)}",
+            'location': f"{city}, {code}, United States", 'city': city, 'state': code,
+            'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(60, 160)))}
+
+def reworded(rng: random.Random, job: dict, new_id: int) -> dict:
+    """The same posting as another board shows it"""
+    words = job['description'].split()
+    for _ in range(len(words) // 20):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    city = next(entry for entry in CITIES if entry[0] == job['city'])
+    return dict(job, id=new_id, source='Indeed', title=job['title'].replace('Senior', 'Sr.'),
+                company=job['company'] + ', Inc.', location=f"{city[0]}, {city[2]}", city=None, state=None,
+                description=' '.join(words) + ' Apply on our careers page.')
+
+def populate(engine, rows: int, jobs):
+    Base.metadata.create_all(engine)
+    raw = engine.raw_connection()
+    insert = "INSERT INTO jobs (id, title, company, location, description, job_key, source, city, state) " \
+             "VALUES (:id, :title, :company, :location, :description, :source || ':' || :id, :source, :city, :state)"
+    raw.executemany(insert, jobs)
+    raw.commit()
+    raw.close()
+    session = Session(bind=engine)
+    for i in range(0, len(jobs), 1000):
+        dedup.link_duplicates(session, [(job['id'], job) for job in jobs[i:i + 1000]])
+        session.commit()
+    session.close()
+
+    # Filler: random signatures for IDs without a row, which only ever share a bucket by chance
+    rng = random.Random(11)
+    raw = engine.raw_connection()
+    for start in range(REAL + PROBES * 2 + 1, rows + PROBES * 2 + 1, 20_000):
+        batch = []
+        for job_id in range(start, min(start + 20_000, rows + PROBES * 2 + 1)):
+            batch.append((job_id, tuple(rng.getrandbits(32) for _ in range(dedup.NUM_PERM))))
+        raw.executemany("INSERT INTO job_signatures (job_id, signature) VALUES (?, ?)",
+                        [(job_id, dedup.SIGNATURE.pack(*values)) for job_id, values in batch])
+        raw.executemany("INSERT INTO job_lsh_buckets (key, job_id) VALUES (?, ?)",
+                        [(key, job_id) for job_id, values in batch for key in dedup.band_keys(values)])
+        raw.commit()
+    raw.execute("ANALYZE")
+    raw.close()
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(7)
+    jobs = [posting(rng, i) for i in range(REAL)]
+    probes = [reworded(rng, rng.choice(jobs), REAL + i + 1) for i in range(PROBES)]
+    probes += [posting(rng, REAL + PROBES + i) for i in range(PROBES)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.db')
+        engine = get_engine(f"sqlite:///{path}")
+        started = time.perf_counter()
+        populate(engine, rows - PROBES * 2, jobs)
+        print(f"indexed {rows - PROBES * 2} jobs in {time.perf_counter() - started:.0f}s; "
+              f"database {os.path.getsize(path) / 1e6:.0f}MB")
+
+        raw = engine.raw_connection()
+        raw.executemany(
+            "INSERT INTO jobs (id, title, company, location, description, job_key, source, city, state) "
+            "VALUES (:id, :title, :company, :location, :description, :source || ':' || :id, :source, :city, :state)",
+            probes
+        )
+        raw.commit()
+        raw.close()
+
+        session = Session(bind=engine)
+        signing, total, linked = [], [], []
+        for job in probes:
+            start = time.perf_counter()
+            dedup.signature(dedup.shingles(job))
+            signing.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            linked.append(dedup.link_duplicates(session, [(job['id'], job)]))
+            total.append(time.perf_counter() - start)
+        session.commit()
+        session.close()
+
+        lookup = [(t - s) * 1000 for t, s in zip(total, signing)]
+        print(f"per job: signature {statistics.median(signing) * 1000:.2f}ms, "
+              f"index lookup + write p50 {statistics.median(lookup):.2f}ms, p99 {percentile(lookup, 0.99):.2f}ms")
+        print(f"reworded copies linked: {sum(linked[:PROBES])}/{PROBES}; "
+              f"new postings linked (false positives): {sum(linked[PROBES:])}/{PROBES}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Keyword search latency: FTS5 MATCH vs the old title/description ILIKE scan.
+
+Pages are the first 50 jobs by posting date; totals are counted up to
+LISTING_COUNT_LIMIT, as the web listing does. "keyword" is what
+apply_job_filters runs: the index, or a word-prefix scan for keywords whose
+density in the newest jobs reaches KEYWORD_SCAN_DENSITY.
+
+Usage: python benchmarks/bench_fts.py [rows ...]   (default: 100000 1000000)
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, or_
+from sqlalchemy.orm import sessionmaker
+
+from config.config import Config
+from app.database import fts
+from app.database.models import Base, Job
+from app.database.classifier import classify
+from app.database.compression import decompressed
+from app.database.pagination import capped_count
+from app.database.queries import apply_job_filters, apply_job_sort, us_software_filter
+
+# Zipf-distributed vocabulary so keywords range from very common to rare
+VOCABULARY = [f"term{rank}" for rank in range(20000)]
+WEIGHTS = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+TITLES = ['Software Engineer', 'Backend Engineer', 'Full Stack Developer', 'Java Developer',
+          'Software Developer', 'Data Engineer', 'Product Manager']
+KEYWORDS = {
+    'common (rank 5)': 'term5',
+    'medium (rank 300)': 'term300',
+    'rare (rank 8000)': 'term8000',
+    'two terms': 'term40 term900',
+    'prefix': 'term123',
+}
+
+def populate(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    now = datetime(2026, 1, 1)
+    raw = engine.raw_connection()
+    batch = []
+    for i in range(rows):
+        title, location = rng.choice(TITLES), f"City {rng.randrange(300)}, United States"
+        classes = classify(title, location)
+        batch.append((
+            title, f"Company {rng.randrange(5000)}", location,
+            ' '.join(rng.choices(VOCABULARY, WEIGHTS, k=rng.randrange(40, 120))),
+            f"https://example.com/{i}", f"example:{i}", 'Bench', now - timedelta(minutes=i),
+            classes['is_us'], classes['role_family'], classes['is_remote']
+        ))
+        if len(batch) == 10000 or i == rows - 1:
+            raw.executemany(
+                "INSERT INTO jobs (title, company, location, description, url, job_key, source, posted_date, "
+                "is_us, role_family, is_remote) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            raw.commit()
+            batch = []
+    raw.close()
+    return engine
+
+def ilike_query(session, keyword):
+    return session.query(Job).filter(us_software_filter()).filter(
+        or_(Job.title.ilike(f'%{keyword}%'), decompressed(Job.description).ilike(f'%{keyword}%'))
+    )
+
+def fts_query(session, keyword):
+    expression = fts.match_query(keyword, ['title', 'description'])
+    return session.query(Job).filter(us_software_filter(), Job.id.in_(fts.matching_ids(expression)))
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def report(engine):
+    session = sessionmaker(bind=engine)()
+    page = lambda query: apply_job_sort(query, 'posted_date').limit(50).all()
+    total = lambda query: capped_count(query, Config.LISTING_COUNT_LIMIT)
+    print(f"{'keyword':20} {'density':>8} {'path':>5} {'ILIKE page':>11} {'FTS page':>9} {'keyword page':>13} "
+          f"{'FTS total':>10} {'keyword total':>14}")
+    for label, keyword in KEYWORDS.items():
+        density = fts.match_density(session, keyword, ['title', 'description'])
+        chosen = apply_job_filters(session.query(Job), keyword=keyword)
+        index = fts_query(session, keyword)
+        print(f"{label:20} {density:8.3f} {'fts' if 'jobs_fts' in str(chosen.statement) else 'scan':>5} "
+              f"{timed(lambda: page(ilike_query(session, keyword))):9.1f}ms "
+              f"{timed(lambda: page(index)):7.1f}ms "
+              f"{timed(lambda: page(chosen)):11.1f}ms "
+              f"{timed(lambda: total(index), 3):8.1f}ms "
+              f"{timed(lambda: total(chosen), 3):12.1f}ms")
+    session.close()
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            engine = populate(os.path.join(tmp, 'jobs.db'), rows)
+            print(f"\n{rows} jobs (loaded with FTS triggers in {time.perf_counter() - start:.1f}s)")
+            report(engine)
+            engine.dispose()
+
+if __name__ == '__main__':
+    main()
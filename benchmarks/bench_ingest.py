@@ -0,0 +1,55 @@
+"""Producer-side cost of storing scraped pages inline vs through IngestQueue.
+
+Usage: python benchmarks/bench_ingest.py [pages] [jobs_per_page]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, scoped_session
+
+from app.database.models import Base
+from app.database.repository import JobRepository
+from app.database.ingest import IngestQueue
+from bench_upsert import make_jobs
+
+def session_registry(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return scoped_session(sessionmaker(bind=engine))
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    per_page = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    jobs = make_jobs(pages * per_page)
+    batches = [jobs[i:i + per_page] for i in range(0, len(jobs), per_page)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = JobRepository(session_registry(os.path.join(tmp, 'inline.db'))())
+        start = time.perf_counter()
+        for page in batches:
+            repo.upsert_many(page)
+        inline = time.perf_counter() - start
+        print(f"inline upsert per page : scraper blocked {inline:6.2f}s for {len(jobs)} jobs")
+
+        ingest = IngestQueue(session_registry(os.path.join(tmp, 'queued.db')),
+                             spill_path=os.path.join(tmp, 'spill.jsonl'))
+        ingest.start()
+        start = time.perf_counter()
+        for page in batches:
+            ingest.put_many(page, tag='bench')
+        produced = time.perf_counter() - start
+        ingest.stop()
+        total = time.perf_counter() - start
+        print(f"write-behind queue     : scraper blocked {produced:6.2f}s, "
+              f"writer done after {total:6.2f}s {ingest.get_stats()}")
+
+if __name__ == '__main__':
+    main()
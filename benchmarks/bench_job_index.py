@@ -0,0 +1,161 @@
+"""Listing pages from the in-memory job index vs SQL keyset pages.
+
+Loads `rows` listed jobs (default 1,000,000) over 5,000 companies, 300
+locations and a few thousand distinct titles, builds the job index and
+reports its load time and memory (tracemalloc), then times `requests`
+random listing pages of each kind through JobIndex.page and through
+keyset_page on the same database: first page and a deep cursor in each sort
+order, a company filter, a location filter and both. Finally 1,000 jobs
+are inserted and the incremental refresh is timed.
+
+Usage: python benchmarks/bench_job_index.py [rows] [requests]   (default: 1000000 300)
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import lookups
+from app.database.engine import get_engine
+from app.database.job_index import JobIndex
+from app.database.models import Base, Job
+from app.database.pagination import encode_cursor, keyset_page
+from app.database.queries import apply_job_filters
+
+COMPANIES = 5_000
+LOCATIONS = 300
+STATES = ['TX', 'WA', 'NY', 'CO', 'CA', 'MA', 'IL', 'GA']
+LEVELS = ['', 'Senior ', 'Staff ', 'Principal ', 'Lead ', 'Junior ']
+ROLES = ['Software Engineer', 'Backend Engineer', 'Full Stack Developer', 'Java Developer', 'Frontend Engineer']
+SOURCES = ['LinkedIn', 'Indeed', 'Glassdoor', 'Dice', 'ZipRecruiter']
+START = datetime(2026, 10, 1)
+INSERT = ("INSERT INTO jobs (id, title, company, location, company_id, location_id, url, job_key, source, posted_date, "
+          "salary, is_active, is_us, role_family) VALUES (:id, :title, :company, :location, :company_id, :location_id, "
+          ":url, :job_key, :source, :posted_date, :salary, 1, 1, 'software')")
+
+def make_rows(rng: random.Random, first: int, count: int):
+    rows = []
+    for i in range(first, first + count):
+        state = STATES[i % len(STATES)]
+        rows.append({
+            'id': i, 'title': f"{rng.choice(LEVELS)}{rng.choice(ROLES)}{f' {rng.randrange(100)}' if i % 3 else ''}",
+            'company': f"Company{rng.randrange(COMPANIES)} Systems",
+            'location': f"City{rng.randrange(LOCATIONS)}, {state}, United States",
+            'url': f"https://www.linkedin.com/jobs/view/{i}", 'job_key': f"linkedin:{i}", 'source': rng.choice(SOURCES),
+            'posted_date': START - timedelta(minutes=rng.randrange(60 * 24 * 90)),
+            'salary': f"${rng.randrange(80, 200)}k - ${rng.randrange(200, 300)}k" if i % 2 else None,
+        })
+    return rows
+
+def populate(engine, rows: int, first: int = 1, seed: int = 5):
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        for start in range(first, first + rows, 50_000):
+            batch = make_rows(rng, start, min(50_000, first + rows - start))
+            lookups.encode_rows(conn, batch)
+            conn.execute(text(INSERT), batch)
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def workloads(rng: random.Random, rows: int):
+    """(name, sort, cursor factory, filters) for each kind of page"""
+    def deep(sort):
+        def cursor():
+            job_id = rng.randrange(1, rows + 1)
+            if sort == 'posted_date':
+                values = [START - timedelta(minutes=rng.randrange(60 * 24 * 90)), job_id]
+            elif sort == 'company':
+                values = [f"Company{rng.randrange(COMPANIES)} Systems", job_id]
+            else:
+                values = [f"{rng.choice(LEVELS)}{rng.choice(ROLES)}", job_id]
+            return encode_cursor(sort, rng.choice(['next', 'prev']), values)
+        return cursor
+    company = lambda: {'company': f"company{rng.randrange(COMPANIES)} systems"}
+    location = lambda: {'location': f"city{rng.randrange(LOCATIONS)},"}
+    return [
+        ('first page by date', 'posted_date', lambda: None, dict),
+        ('deep page by date', 'posted_date', deep('posted_date'), dict),
+        ('deep page by company', 'company', deep('company'), dict),
+        ('deep page by title', 'title', deep('title'), dict),
+        ('company filter', 'posted_date', lambda: None, company),
+        ('location filter', 'posted_date', lambda: None, location),
+        ('location, by title', 'title', lambda: None, location),
+        ('state filter', 'posted_date', lambda: None, lambda: {'location': f", {rng.choice(STATES)},"}),
+        ('company + location', 'posted_date', lambda: None, lambda: {**company(), **location()}),
+    ]
+
+def run(page, requests: int, rows: int):
+    results = {}
+    for name, sort, cursor, filters in workloads(random.Random(11), rows):
+        times = []
+        for _ in range(requests):
+            args = (sort, cursor(), filters())
+            start = time.perf_counter()
+            page(*args)
+            times.append((time.perf_counter() - start) * 1000)
+        results[name] = times
+    return results
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(f"sqlite:///{os.path.join(tmp, 'jobs.db')}")
+        Base.metadata.create_all(engine)
+        started = time.perf_counter()
+        populate(engine, rows)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+        print(f"{rows} jobs written in {time.perf_counter() - started:.0f}s")
+
+        index = JobIndex()
+        started = time.perf_counter()
+        index.load(engine)
+        loaded = time.perf_counter() - started
+        # Loaded again under tracemalloc, which slows it down
+        tracemalloc.start()
+        measured = JobIndex()
+        measured.load(engine)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del measured
+        stats = index.stats()
+        print(f"index: {stats['jobs']} jobs loaded in {loaded:.1f}s; {current / 1e6:.0f}MB resident "
+              f"(peak {peak / 1e6:.0f}MB while loading), of which {stats['column_bytes'] / 1e6:.0f}MB in arrays; "
+              f"distinct values {stats['distinct']}")
+
+        session = Session(bind=engine)
+        def sql_page(sort, cursor, filters):
+            return keyset_page(apply_job_filters(session.query(Job), **filters), sort, cursor, 50)
+        def index_page(sort, cursor, filters):
+            return index.page(sort, cursor, 50, **filters)
+
+        indexed = run(index_page, requests, rows)
+        queried = run(sql_page, max(20, requests // 10), rows)
+        print(f"{'page':<22}{'index p50':>11}{'p99':>9}{'SQL p50':>11}{'p99':>9}")
+        for name in indexed:
+            print(f"{name:<22}{statistics.median(indexed[name]):>9.2f}ms{percentile(indexed[name], 0.99):>7.2f}ms"
+                  f"{statistics.median(queried[name]):>9.1f}ms{percentile(queried[name], 0.99):>7.1f}ms")
+        session.close()
+
+        populate(engine, 1_000, first=rows + 1, seed=6)
+        started = time.perf_counter()
+        result = index.refresh(engine)
+        print(f"refresh after 1000 new jobs: {(time.perf_counter() - started) * 1000:.0f}ms ({result})")
+
+if __name__ == '__main__':
+    main()
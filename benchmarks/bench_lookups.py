@@ -0,0 +1,117 @@
+"""Company/location lookups: text columns vs dictionary-encoded IDs.
+
+Loads `rows` active jobs (default 500,000) spread over 5,000 companies and
+300 locations, each spelled a few different ways as the boards do, then
+times the queries /about, the stats API and the company filter run against
+the text columns and against company_id/location_id, and reports the size of
+the indexes behind them (dbstat).
+
+Usage: python benchmarks/bench_lookups.py [rows]   (default: 500000)
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import text
+
+from app.database import lookups
+from app.database.engine import get_engine
+from app.database.models import Base
+
+COMPANIES = 5_000
+LOCATIONS = 300
+STATES = ['TX', 'WA', 'NY', 'CO', 'CA', 'MA', 'IL', 'GA']
+STATE_NAMES = {'TX': 'Texas', 'WA': 'Washington', 'NY': 'New York', 'CO': 'Colorado', 'CA': 'California',
+               'MA': 'Massachusetts', 'IL': 'Illinois', 'GA': 'Georgia'}
+
+def company_spelling(rng: random.Random, n: int) -> str:
+    name = f"Company{n} Systems"
+    return rng.choice([name, name.upper(), f"{name}, Inc.", f"{name} LLC"])
+
+def location_spelling(rng: random.Random, n: int) -> str:
+    city, state = f"City{n}", STATES[n % len(STATES)]
+    return rng.choice([f"{city}, {state}", f"{city}, {STATE_NAMES[state]}", f"{city}, {state}, United States"])
+
+def populate(engine, rows: int):
+    Base.metadata.create_all(engine)
+    rng = random.Random(5)
+    jobs = [{'id': i + 1, 'company': company_spelling(rng, rng.randrange(COMPANIES)),
+             'location': location_spelling(rng, rng.randrange(LOCATIONS))} for i in range(rows)]
+    with engine.begin() as conn:
+        for i in range(0, rows, 20_000):
+            batch = jobs[i:i + 20_000]
+            lookups.encode_rows(conn, batch)
+            conn.execute(text(
+                "INSERT INTO jobs (id, title, company, location, company_id, location_id, job_key, source, is_active) "
+                "VALUES (:id, 'Software Engineer', :company, :location, :company_id, :location_id, 'b:' || :id, 'b', 1)"
+            ), batch)
+        # Both kinds of index, so each query gets its best plan
+        conn.exec_driver_sql("CREATE INDEX bench_active_company ON jobs (is_active, company)")
+        conn.exec_driver_sql("CREATE INDEX bench_active_location ON jobs (is_active, location)")
+        conn.exec_driver_sql("ANALYZE")
+
+def timed(conn, sql: str, repeat: int = 7) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.exec_driver_sql(sql).fetchall()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+QUERIES = [
+    ('distinct companies',
+     "SELECT count(DISTINCT company) FROM jobs WHERE is_active",
+     "SELECT count(DISTINCT company_id) FROM jobs WHERE is_active"),
+    ('distinct locations',
+     "SELECT count(DISTINCT location) FROM jobs WHERE is_active",
+     "SELECT count(DISTINCT location_id) FROM jobs WHERE is_active"),
+    ('top 10 companies',
+     "SELECT company, count(*) FROM jobs WHERE is_active GROUP BY company ORDER BY 2 DESC LIMIT 10",
+     "SELECT companies.name, n FROM (SELECT company_id, count(*) AS n FROM jobs WHERE is_active "
+     "GROUP BY company_id ORDER BY n DESC LIMIT 10) JOIN companies ON companies.id = company_id"),
+    ('company filter',
+     "SELECT id FROM jobs WHERE is_active AND company LIKE '%company42 systems%'",
+     "SELECT id FROM jobs WHERE is_active AND company_id IN "
+     "(SELECT company_id FROM company_aliases WHERE key LIKE '%company42 systems%')"),
+]
+
+def index_sizes(conn) -> dict:
+    names = ['bench_active_company', 'ix_jobs_active_company_id', 'bench_active_location', 'ix_jobs_active_location_id']
+    rows = conn.exec_driver_sql(
+        f"SELECT name, sum(pgsize) FROM dbstat WHERE name IN ({', '.join('?' * len(names))}) GROUP BY name", tuple(names)
+    ).fetchall()
+    return dict(rows)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(f"sqlite:///{os.path.join(tmp, 'jobs.db')}")
+        started = time.perf_counter()
+        populate(engine, rows)
+        print(f"loaded and encoded {rows} jobs in {time.perf_counter() - started:.0f}s")
+
+        with engine.connect() as conn:
+            counts = conn.exec_driver_sql(
+                "SELECT count(DISTINCT company), count(DISTINCT company_id), "
+                "count(DISTINCT location), count(DISTINCT location_id) FROM jobs"
+            ).one()
+            print(f"companies: {counts[0]} spellings -> {counts[1]} IDs; locations: {counts[2]} spellings -> {counts[3]} IDs")
+            print(f"{'query':<22}{'text':>10}{'ids':>10}")
+            for name, text_sql, id_sql in QUERIES:
+                print(f"{name:<22}{timed(conn, text_sql):>8.1f}ms{timed(conn, id_sql):>8.1f}ms")
+            sizes = index_sizes(conn)
+            print(f"(is_active, company) index {sizes['bench_active_company'] / 1e6:.1f}MB, "
+                  f"(is_active, company_id) {sizes['ix_jobs_active_company_id'] / 1e6:.1f}MB; "
+                  f"(is_active, location) {sizes['bench_active_location'] / 1e6:.1f}MB, "
+                  f"(is_active, location_id) {sizes['ix_jobs_active_location_id'] / 1e6:.1f}MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Deep-page latency: OFFSET pagination (Flask-SQLAlchemy paginate) vs keyset cursors.
+
+Usage: python benchmarks/bench_pagination.py [rows]   (default: 200000)
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Job
+from app.database.pagination import keyset_page, capped_count, encode_cursor, SORT_KEYS
+from app.database.queries import apply_job_filters, apply_job_sort
+
+PER_PAGE = 50
+PAGES = [1, 10, 100, 1000, 3000]
+
+def populate(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    now = datetime(2026, 1, 1)
+    raw = engine.raw_connection()
+    for start in range(0, rows, 10000):
+        raw.executemany(
+            "INSERT INTO jobs (title, company, location, job_key, posted_date, is_us, role_family, is_active) "
+            "VALUES (?, ?, ?, ?, ?, 1, 'software', 1)",
+            [(f"Software Engineer {rng.randrange(500)}", f"Company {rng.randrange(20000)}", 'Austin, TX, United States',
+              f"bench:{i}", now - timedelta(seconds=rng.randrange(90 * 86400))) for i in range(start, min(rows, start + 10000))]
+        )
+        raw.commit()
+    raw.execute("ANALYZE")
+    raw.close()
+    return engine
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def cursor_before_page(query, sort: str, page: int) -> str:
+    """The cursor a client would hold after reading pages 1..page-1 (taken from the last row)"""
+    columns, descending = SORT_KEYS[sort]
+    row = query.order_by(*[column.desc() if descending else column for column in columns])\
+        .offset((page - 1) * PER_PAGE - 1).limit(1).one()
+    return encode_cursor(sort, 'next', [getattr(row, column.key) for column in columns])
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = populate(os.path.join(tmp, 'jobs.db'), rows)
+        session = sessionmaker(bind=engine)()
+        query = apply_job_filters(session.query(Job))
+        print(f"{rows} jobs, {PER_PAGE} per page")
+
+        print(f"full COUNT(*) {timed(query.count, 3):.1f}ms, "
+              f"capped count (10000) {timed(lambda: capped_count(query, 10000), 3):.1f}ms")
+        for sort in ('posted_date', 'company'):
+            print(f"\nsort={sort}\n{'page':>6} {'OFFSET':>10} {'keyset':>10}")
+            for page in PAGES:
+                if (page - 1) * PER_PAGE >= rows:
+                    continue
+                offset_query = apply_job_sort(query, sort).offset((page - 1) * PER_PAGE).limit(PER_PAGE)
+                cursor = cursor_before_page(query, sort, page) if page > 1 else None
+                print(f"{page:>6} {timed(offset_query.all):8.2f}ms "
+                      f"{timed(lambda: keyset_page(query, sort, cursor, PER_PAGE)):8.2f}ms")
+        session.close()
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Measure the per-request locking overhead of the rate limit backends.
+
+Usage: python benchmarks/bench_rate_limiter.py [requests] [processes]
+"""
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from app.scraper.rate_limiter import MemoryRateLimitBackend, SQLiteRateLimitBackend
+
+LIMITS = {'__total__': 10 ** 9, 'Bench': 10 ** 9}
+
+def run_requests(backend, count: int) -> float:
+    """Run `count` check+log cycles and return the elapsed seconds"""
+    start = time.perf_counter()
+    for _ in range(count):
+        backend.available(LIMITS)
+        backend.consume(LIMITS)
+    return time.perf_counter() - start
+
+def _worker(args) -> float:
+    path, count = args
+    return run_requests(SQLiteRateLimitBackend(path, window_seconds=3600), count)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    elapsed = run_requests(MemoryRateLimitBackend(3600), count)
+    print(f"memory     1 process : {elapsed / count * 1e6:8.1f} us/request")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'limits.db')
+        elapsed = run_requests(SQLiteRateLimitBackend(path, window_seconds=3600), count)
+        print(f"sqlite     1 process : {elapsed / count * 1e6:8.1f} us/request")
+
+        with Pool(processes) as pool:
+            timings = pool.map(_worker, [(path, count)] * processes)
+        worst = max(timings)
+        print(f"sqlite {processes:>4} processes: {worst / count * 1e6:8.1f} us/request "
+              f"(slowest worker, {processes * count} requests total)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Scraped cards held as job_data dicts vs JobRecords, from parsing to insert.
+
+Renders `cards` LinkedIn search cards (default 100,000) over 2,000
+companies and 300 locations, 25 to a results page, then runs each path:
+parse every page with LinkedInScraper._parse_job_card, hold the whole run
+in memory as the scheduler does, and write it with upsert_many into a
+fresh database. The dict path is the parser as it was before records.
+Each path runs in its own process; reported are parse and insert
+throughput, the resident memory the parsed run holds and the process's
+peak resident size.
+
+Usage: python benchmarks/bench_records.py [cards]   (default: 100000)
+"""
+import gc
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from bs4 import BeautifulSoup
+from sqlalchemy.orm import Session
+
+from app.database.engine import get_engine
+from app.database.models import Base
+from app.database.repository import JobRepository
+from app.scraper.linkedin_scraper import LinkedInScraper
+
+COMPANIES = 2_000
+LOCATIONS = 300
+STATES = ['TX', 'WA', 'NY', 'CO', 'CA', 'MA', 'IL', 'GA']
+TITLES = ['Software Engineer', 'Senior Backend Engineer', 'Full Stack Developer', 'Java Developer', 'Staff Engineer']
+PER_PAGE = 25
+CARD = """<li><div class="base-card">
+  <a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/{slug}-{i}?refId={ref}&trackingId={ref}"></a>
+  <h3 class="base-search-card__title">
+        {title}
+  </h3>
+  <h4 class="base-search-card__subtitle">
+        {company}
+  </h4>
+  <span class="job-search-card__location">
+        {location}
+  </span>
+  {salary}
+  <time class="job-search-card__listdate" datetime="2026-10-{day:02d}">{day} days ago</time>
+</div></li>"""
+
+def render_pages(cards: int, seed: int = 3):
+    rng = random.Random(seed)
+    pages = []
+    for first in range(0, cards, PER_PAGE):
+        items = []
+        for i in range(first, min(cards, first + PER_PAGE)):
+            title = rng.choice(TITLES)
+            salary = (f'<span class="job-search-card__salary-info">${rng.randrange(80, 200)}K/yr - '
+                      f'${rng.randrange(200, 300)}K/yr</span>' if i % 3 == 0 else '')
+            items.append(CARD.format(
+                slug=title.lower().replace(' ', '-'), i=i, ref=rng.getrandbits(64), title=title,
+                company=f"Company {rng.randrange(COMPANIES)} Inc.",
+                location=f"City {rng.randrange(LOCATIONS)}, {rng.choice(STATES)}, United States",
+                salary=salary, day=rng.randrange(1, 19)))
+        pages.append(f'<ul class="jobs-search__results-list">{"".join(items)}</ul>')
+    return pages
+
+def parse_card_as_dict(scraper: LinkedInScraper, card: BeautifulSoup):
+    """_parse_job_card as it was before JobRecord"""
+    title_elem = card.find(['h3', 'h4'], class_=['base-search-card__title', 'job-card-list__title'])
+    company_elem = card.find(['h4', 'a'], class_=['base-search-card__subtitle', 'job-card-container__company-name'])
+    location_elem = card.find(['span', 'div'], class_=['job-search-card__location', 'job-card-container__metadata-item'])
+    link_elem = card.find('a', class_=['base-card__full-link', 'job-card-list__title'])
+    job_data = {
+        'title': title_elem.text.strip(),
+        'company': company_elem.text.strip(),
+        'location': location_elem.text.strip(),
+        'url': link_elem['href'],
+        'source': 'LinkedIn',
+        'posted_date': scraper._extract_date(card)
+    }
+    salary_elem = card.find('span', class_=['job-search-card__salary-info', 'job-card-container__salary-info'])
+    if salary_elem:
+        job_data['salary'] = salary_elem.text.strip()
+    return job_data
+
+def parse(pages, parse_card):
+    jobs = []
+    for page in pages:
+        soup = BeautifulSoup(page, 'html.parser')
+        jobs.extend(parse_card(card) for card in soup.find_all('div', class_='base-card'))
+    return jobs
+
+def resident() -> int:
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+def run(name: str, cards: int, tmp: str):
+    pages = render_pages(cards)
+    # Parsing needs only the date helper, not a browser
+    scraper = LinkedInScraper.__new__(LinkedInScraper)
+    scraper.site_name, scraper.driver = 'LinkedIn', None
+    parse_card = scraper._parse_job_card if name == 'records' else lambda card: parse_card_as_dict(scraper, card)
+    engine = get_engine(f"sqlite:///{os.path.join(tmp, f'{name}.db')}")
+    Base.metadata.create_all(engine)
+    gc.collect()
+    before = resident()
+    started = time.perf_counter()
+    jobs = parse(pages, parse_card)
+    parsed = time.perf_counter() - started
+    gc.collect()
+    held = resident() - before
+
+    session = Session(bind=engine)
+    started = time.perf_counter()
+    result = JobRepository(session).upsert_many(jobs)
+    inserted = time.perf_counter() - started
+    session.close()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(f"{name:<8}{len(jobs) / parsed:>10,.0f}/s{held / 1e6:>10.1f}MB{len(jobs) / inserted:>11,.0f}/s"
+          f"{peak / 1e6:>10.1f}MB   {result['inserted']} inserted", flush=True)
+
+def main():
+    cards = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    if len(sys.argv) > 3:
+        return run(sys.argv[2], cards, sys.argv[3])
+    print(f"{cards} cards, {PER_PAGE} per page")
+    print(f"{'path':<8}{'parse':>12}{'held':>12}{'insert':>13}{'peak RSS':>12}", flush=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('dicts', 'records'):
+            subprocess.run([sys.executable, __file__, str(cards), name, tmp], check=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Web read latency during ingest: live database vs read snapshot.
+
+Loads `rows` jobs (default 20,000), then runs the listing query (first
+page, a keyword search and the filtered count) in a loop for `seconds`
+while a writer thread upserts batches of 500 new jobs and checkpoints the
+WAL after each one, as the scheduler does. The reader runs once against
+the live file and once against a published snapshot; the time to publish
+a snapshot is reported too.
+
+Usage: python benchmarks/bench_snapshots.py [rows] [seconds]   (default: 20000 20)
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy.orm import Session
+
+from app.database import snapshots
+from app.database.engine import get_engine, maintain_sqlite
+from app.database.models import Base, Job
+from app.database.queries import apply_job_filters, apply_job_sort
+from app.database.repository import JobRepository
+from bench_upsert import make_jobs
+
+QUERIES = {
+    'page': lambda session: apply_job_sort(apply_job_filters(session.query(Job)), 'posted_date').limit(50).all(),
+    'keyword': lambda session: apply_job_sort(apply_job_filters(session.query(Job), keyword='operate'),
+                                              'posted_date').limit(50).all(),
+    'count': lambda session: apply_job_filters(session.query(Job)).limit(10_000).count(),
+}
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def write_continuously(engine, stop: threading.Event, counter: list):
+    session = Session(bind=engine)
+    repository = JobRepository(session)
+    batch = 0
+    while not stop.is_set():
+        jobs = make_jobs(500, seed=1000 + batch)
+        for i, job in enumerate(jobs):
+            job['url'] = f"https://www.linkedin.com/jobs/view/live-{batch}-{i}"
+        repository.upsert_many(jobs)
+        maintain_sqlite(engine)
+        counter[0] += len(jobs)
+        batch += 1
+    session.close()
+
+def read_while_writing(engine, read_engine, seconds: float):
+    stop = threading.Event()
+    written = [0]
+    writer = threading.Thread(target=write_continuously, args=(engine, stop, written))
+    writer.start()
+    times = {name: [] for name in QUERIES}
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for name, query in QUERIES.items():
+            session = Session(bind=read_engine)
+            start = time.perf_counter()
+            query(session)
+            times[name].append((time.perf_counter() - start) * 1000)
+            session.close()
+    stop.set()
+    writer.join()
+    return times, written[0]
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.db')
+        engine = get_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        session = Session(bind=engine)
+        JobRepository(session).upsert_many(make_jobs(rows))
+        session.close()
+
+        published = snapshots.publish(path, os.path.join(tmp, 'snapshots'))
+        print(f"{rows} jobs; publishing a snapshot took {published['duration_ms']:.0f}ms "
+              f"({published['size_bytes'] / 1e6:.1f}MB)")
+        snapshot_engine = snapshots.snapshot_engine(snapshots.current_snapshot(os.path.join(tmp, 'snapshots')))
+
+        print(f"{'reader':<10}{'query':<9}{'p50':>9}{'p99':>9}{'max':>9}{'reads':>7}{'rows written':>14}")
+        for name, read_engine in (('live', engine), ('snapshot', snapshot_engine)):
+            times, written = read_while_writing(engine, read_engine, seconds)
+            for query, values in times.items():
+                print(f"{name:<10}{query:<9}{statistics.median(values):>7.2f}ms{percentile(values, 0.99):>7.2f}ms"
+                      f"{max(values):>7.1f}ms{len(values):>7}{written:>14}")
+
+if __name__ == '__main__':
+    main()
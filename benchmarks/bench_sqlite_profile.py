@@ -0,0 +1,101 @@
+"""Reader latency while a bulk ingest runs: SQLite defaults vs the Config pragma profile.
+
+A writer process upserts jobs in batches (as the ingest queue does) while
+reader threads in this process run the /jobs listing query.
+
+Usage: python benchmarks/bench_sqlite_profile.py [rows] [readers]   (default: 100000 4)
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Job
+from app.database.engine import apply_sqlite_pragmas, sqlite_pragmas
+from app.database.queries import apply_job_filters, apply_job_sort
+from app.database.repository import JobRepository
+from app.scraper.metrics import percentile
+from benchmarks.bench_upsert import make_jobs
+
+PROFILES = {
+    # SQLite's own defaults (rollback journal); busy_timeout matches the driver's 5s default
+    'default': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'mmap_size': 0, 'cache_size': -2000,
+                'temp_store': 'DEFAULT', 'busy_timeout': 5000},
+    'profile': sqlite_pragmas(),
+}
+
+def make_engine(path: str, pragmas):
+    engine = create_engine(f"sqlite:///{path}", connect_args={'check_same_thread': False})
+    apply_sqlite_pragmas(engine, pragmas)
+    return engine
+
+def writer(path: str, pragmas, rows: int, result):
+    engine = make_engine(path, pragmas)
+    repository = JobRepository(sessionmaker(bind=engine)())
+    jobs = make_jobs(rows, seed=1)
+    start = time.perf_counter()
+    repository.upsert_many(jobs, batch_size=500)
+    result.value = time.perf_counter() - start
+
+def reader(engine, stop: threading.Event, latencies, errors):
+    session = sessionmaker(bind=engine)()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            apply_job_sort(apply_job_filters(session.query(Job)), 'posted_date').limit(50).all()
+            session.query(Job).count()
+        except Exception:
+            errors.append(1)
+        session.rollback()
+        latencies.append(time.perf_counter() - start)
+    session.close()
+
+def run(name: str, rows: int, readers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.db')
+        engine = make_engine(path, PROFILES[name])
+        Base.metadata.create_all(engine)
+        # Start from a populated table so readers have real work
+        JobRepository(sessionmaker(bind=engine)()).upsert_many(make_jobs(rows // 2, seed=0))
+
+        result = multiprocessing.Value('d', 0.0)
+        process = multiprocessing.Process(target=writer, args=(path, PROFILES[name], rows, result))
+        stop = threading.Event()
+        latencies, errors = [], []
+        threads = [threading.Thread(target=reader, args=(engine, stop, latencies, errors)) for _ in range(readers)]
+        process.start()
+        for thread in threads:
+            thread.start()
+        process.join()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+        ms = [latency * 1000 for latency in latencies]
+        if not ms:
+            print(f"{name:8} ingest {rows / result.value:8.0f} rows/s   (no readers)")
+            return
+        print(f"{name:8} ingest {rows / result.value:8.0f} rows/s   reads {len(ms):6}   "
+              f"p50 {percentile(ms, 50):7.1f}ms  p95 {percentile(ms, 95):7.1f}ms  "
+              f"p99 {percentile(ms, 99):7.1f}ms  max {max(ms):7.1f}ms  errors {len(errors)}")
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print(f"{rows} rows ingested while {readers} readers list jobs")
+    for name in PROFILES:
+        run(name, rows, readers)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""JobRepository.get_job_statistics latency on a large table.
+
+Times the job_aggregates path the app uses on SQLite against the live
+queries over the ix_jobs_active_* covering indexes (the fallback for other
+databases), and checks they agree.
+
+Usage: python benchmarks/bench_statistics.py [rows ...]   (default: 1000000)
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import aggregates
+from app.database.models import Base
+from app.database.fields import structured_fields
+from app.database.repository import JobRepository
+
+TITLES = ['Software Engineer', 'Backend Engineer', 'Java Developer', 'Software Engineer Intern', 'Data Engineer']
+CITIES = ['Austin, TX', 'Seattle, WA', 'New York, NY', 'Denver, CO', 'Remote', 'Boston, Massachusetts']
+SALARIES = [None, None, '$90K/yr - $130K/yr', '$120,000 - $160,000 a year', '$55/hr - $70/hr', '$150,000/yr']
+JOB_TYPES = [None, 'Full-time', 'Contract', 'Part-time']
+
+def populate(path: str, rows: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    now = datetime(2026, 1, 1)
+    raw = engine.raw_connection()
+    batch = []
+    for i in range(rows):
+        job = {
+            'title': rng.choice(TITLES),
+            'location': f"{rng.choice(CITIES)}, United States",
+            'salary': rng.choice(SALARIES),
+            'job_type': rng.choice(JOB_TYPES)
+        }
+        fields = structured_fields(job)
+        company = rng.randrange(20000)
+        # IDs as lookups.encode_rows would assign them, one per company and per city
+        batch.append((job['title'], f"Company {company}", company + 1, job['location'],
+                      CITIES.index(job['location'].rsplit(', United States', 1)[0]) + 1, job['salary'],
+                      f"bench:{i}", now - timedelta(minutes=i), 1, fields['salary_min'], fields['salary_max'],
+                      fields['salary_period'], fields['city'], fields['state'], fields['job_type']))
+        if len(batch) == 10000 or i == rows - 1:
+            raw.executemany(
+                "INSERT INTO jobs (title, company, company_id, location, location_id, salary, job_key, posted_date, "
+                "is_active, salary_min, salary_max, salary_period, city, state, job_type) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                batch)
+            raw.commit()
+            batch = []
+    raw.execute("ANALYZE")
+    raw.close()
+    return engine
+
+def timed(repository, repeat: int = 5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stats = repository.get_job_statistics()
+        timings.append(time.perf_counter() - start)
+    return stats, min(timings) * 1000, max(timings) * 1000
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000_000]
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = populate(os.path.join(tmp, 'jobs.db'), rows)
+            repository = JobRepository(sessionmaker(bind=engine)())
+            stats, best, worst = timed(repository)
+            print(f"{rows} jobs: get_job_statistics from job_aggregates best {best:.2f}ms, worst {worst:.2f}ms")
+            available, aggregates.aggregates_available = aggregates.aggregates_available, lambda bind: False
+            live, best, worst = timed(repository)
+            aggregates.aggregates_available = available
+            print(f"{rows} jobs: get_job_statistics from live queries best {best:.1f}ms, worst {worst:.1f}ms")
+            print(f"  {stats}")
+            print(f"  {'same as' if live == stats else 'DIFFERENT from'} the live queries")
+            engine.dispose()
+
+if __name__ == '__main__':
+    main()
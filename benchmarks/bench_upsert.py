@@ -0,0 +1,80 @@
+"""Compare per-row JobRepository.create against batched upsert_many.
+
+Usage: python benchmarks/bench_upsert.py [rows] [--skip-per-row]
+"""
+import os
+import sys
+import random
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Job
+from app.database.repository import JobRepository
+
+TITLES = ['Software Engineer', 'Backend Engineer', 'Full Stack Developer', 'Java Developer', 'Data Engineer']
+CITIES = ['Austin, TX', 'Seattle, WA', 'New York, NY', 'Remote', 'Denver, CO']
+
+def make_jobs(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        {
+            'title': rng.choice(TITLES),
+            'company': f"Company {rng.randrange(count // 20 + 1)}",
+            'location': f"{rng.choice(CITIES)}, United States",
+            'description': 'Build and operate services. ' * rng.randrange(5, 40),
+            'url': f"https://www.linkedin.com/jobs/view/role-{i}?trackingId={rng.random()}",
+            'source': 'LinkedIn',
+            'salary': f"${rng.randrange(80, 200)}k - ${rng.randrange(200, 300)}k"
+        }
+        for i in range(count)
+    ]
+
+def new_repository(path: str) -> JobRepository:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return JobRepository(sessionmaker(bind=engine)())
+
+def per_row(path: str, jobs) -> float:
+    repo = new_repository(path)
+    start = time.perf_counter()
+    for job in jobs:
+        # What the scripts did: look up the URL, then insert and commit one row
+        if not repo.session.query(Job.id).filter(Job.url == job['url']).first():
+            repo.create(dict(job))
+    return time.perf_counter() - start
+
+def batched(path: str, jobs):
+    repo = new_repository(path)
+    start = time.perf_counter()
+    counts = repo.upsert_many(jobs)
+    first = time.perf_counter() - start
+
+    # Re-ingest the same postings with every tenth one changed
+    changed = [dict(job, title=job['title'] + ' II') if i % 10 == 0 else job for i, job in enumerate(jobs)]
+    start = time.perf_counter()
+    again = repo.upsert_many(changed)
+    return first, counts, time.perf_counter() - start, again
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 100_000
+    jobs = make_jobs(rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first, counts, second, again = batched(os.path.join(tmp, 'upsert.db'), jobs)
+        print(f"upsert_many  insert {rows} rows: {first:8.2f}s {rows / first:10.0f} rows/s {counts}")
+        print(f"upsert_many  re-ingest       : {second:8.2f}s {rows / second:10.0f} rows/s {again}")
+
+        if '--skip-per-row' not in sys.argv:
+            elapsed = per_row(os.path.join(tmp, 'per_row.db'), jobs)
+            print(f"per-row create {rows} rows   : {elapsed:8.2f}s {rows / elapsed:10.0f} rows/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""/api/jobs latency across worker processes: no cache, per-worker cache, shared cache.
+
+Loads `rows` jobs (default 50,000), then starts `workers` processes
+(default 4), as gunicorn would, each issuing `requests` requests (default
+500) drawn from the same skewed mix of keyword, location and company
+filters and sort orders. Runs with the cache off, with a per-worker memory
+cache and with the shared SQLite store; halfway through, the data version
+is bumped as an ingest batch would. Reports latency percentiles,
+throughput and the combined hit rate.
+
+Usage: python benchmarks/bench_web_cache.py [rows] [requests] [workers]   (default: 50000 500 4)
+"""
+import os
+import random
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+from sqlalchemy.orm import Session
+
+from app.database.cache_store import SQLiteCacheStore, bump_data_version
+from app.database.engine import get_engine
+from app.database.models import Base
+from app.database.repository import JobRepository
+from config.config import Config
+from bench_upsert import make_jobs
+
+KEYWORDS = ['', '', '', 'backend', 'java', 'data']
+CITIES = ['', '', 'austin', 'seattle', 'remote']
+SORTS = ['posted_date', 'posted_date', 'company', 'title']
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def request_mix(rng: random.Random, count: int, companies: int):
+    """Listing paths skewed towards popular filters, as real traffic is"""
+    paths = []
+    for _ in range(count):
+        company = f"company {int(rng.paretovariate(1.2)) % companies}" if rng.random() < 0.3 else ''
+        paths.append(f"/api/jobs?keyword={rng.choice(KEYWORDS)}&location={rng.choice(CITIES)}"
+                     f"&company={company}&sort={rng.choice(SORTS)}&per_page=50")
+    return paths
+
+def worker(uri: str, backend: str, cache_path: str, paths, bumps: bool, results):
+    from app.web import create_app
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = uri
+        WEB_CACHE_BACKEND = backend or 'memory'
+        WEB_CACHE_ENTRIES = Config.WEB_CACHE_ENTRIES if backend else 0
+        WEB_CACHE_PATH = cache_path
+
+    app = create_app(BenchConfig)
+    client = app.test_client()
+    times = []
+    for i, path in enumerate(paths):
+        if bumps and i == len(paths) // 2:
+            # As if an ingest batch landed halfway through the run
+            bump_data_version(SQLiteCacheStore(cache_path))
+        start = time.perf_counter()
+        response = client.get(path)
+        times.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, path
+    stats = app.extensions['cache'].stats()
+    results.put((times, stats['hits'], stats['misses']))
+
+def run(uri: str, backend: str, cache_path: str, paths_per_worker):
+    """Every worker's latencies, the hit rate and the wall time"""
+    results = multiprocessing.Queue()
+    started = time.perf_counter()
+    processes = [multiprocessing.Process(target=worker, args=(uri, backend, cache_path, paths, n == 0, results))
+                 for n, paths in enumerate(paths_per_worker)]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    times = [value for result in collected for value in result[0]]
+    hits, misses = sum(result[1] for result in collected), sum(result[2] for result in collected)
+    return times, hits / max(1, hits + misses), time.perf_counter() - started
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uri = f"sqlite:///{os.path.join(tmp, 'jobs.db')}"
+        engine = get_engine(uri)
+        Base.metadata.create_all(engine)
+        session = Session(bind=engine)
+        JobRepository(session).upsert_many(make_jobs(rows))
+        session.close()
+        engine.dispose()
+
+        rng = random.Random(7)
+        paths = [request_mix(rng, requests, rows // 20 + 1) for _ in range(workers)]
+        print(f"{rows} jobs, {workers} worker processes x {requests} requests")
+        print(f"{'cache':<8}{'p50':>9}{'p90':>9}{'p99':>9}{'req/s':>9}{'hit rate':>10}")
+        for backend in (None, 'memory', 'sqlite'):
+            cache_path = os.path.join(tmp, f"web_cache_{backend}.db")
+            times, hit_rate, elapsed = run(uri, backend, cache_path, paths)
+            print(f"{backend or 'off':<8}{statistics.median(times):>7.2f}ms{percentile(times, 0.9):>7.2f}ms"
+                  f"{percentile(times, 0.99):>7.2f}ms{len(times) / elapsed:>9.0f}{hit_rate if backend else 0:>10.1%}")
+
+if __name__ == '__main__':
+    main()
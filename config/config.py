@@ -11,14 +11,78 @@ class Config:
     
     # Database Settings
     DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'jobs.db')
-    SQLALCHEMY_DATABASE_URI = f'sqlite:///{DATABASE_PATH}'
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', f'sqlite:///{DATABASE_PATH}')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    
+    # SQLite Settings (pragmas applied to every pooled connection)
+    SQLITE_AUTO_VACUUM = os.getenv('SQLITE_AUTO_VACUUM', 'INCREMENTAL')  # takes effect on new databases or after VACUUM
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')  # readers don't block on the ingest writer
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # safe with WAL; fsync only at checkpoints
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))  # bytes
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', '-65536'))  # negative = KiB per connection
+    SQLITE_TEMP_STORE = os.getenv('SQLITE_TEMP_STORE', 'MEMORY')
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000'))  # milliseconds
+    SQLITE_MAINTENANCE_INTERVAL = int(os.getenv('SQLITE_MAINTENANCE_INTERVAL', '30'))  # minutes between checkpoint/optimize
+    
+    # Archive Settings (hot/cold tiering; see app/database/archive.py)
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '90'))  # 0 disables scheduled archiving
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '1000'))
+    
+    # Backup Settings (online backup API; see app/database/backup.py)
+    BACKUP_DIRECTORY = os.getenv('BACKUP_DIRECTORY', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'backups'))
+    BACKUP_KEEP = int(os.getenv('BACKUP_KEEP', '5'))  # full backups kept, each with its incrementals
+    BACKUP_STEP_PAGES = int(os.getenv('BACKUP_STEP_PAGES', '256'))  # pages copied per step before yielding to writers
+    
+    # Read Snapshot Settings (immutable copies the web tier reads; see app/database/snapshots.py)
+    WEB_SNAPSHOTS = os.getenv('WEB_SNAPSHOTS', 'False').lower() == 'true'
+    SNAPSHOT_DIRECTORY = os.getenv('SNAPSHOT_DIRECTORY', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'snapshots'))
+    SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', '3'))  # snapshots kept on disk, the current one included
+    SNAPSHOT_MMAP_SIZE = int(os.getenv('SNAPSHOT_MMAP_SIZE', str(1024 * 1024 * 1024)))  # bytes; a snapshot never changes, so map it all
+    
+    # Job Index Settings (in-memory listing index in the web tier; see app/database/job_index.py)
+    JOB_INDEX = os.getenv('JOB_INDEX', 'False').lower() == 'true'
+    JOB_INDEX_REFRESH = float(os.getenv('JOB_INDEX_REFRESH', '30'))  # seconds between incremental refreshes; 0 turns them off
+    
+    # Web Cache Settings (listing and stats results; see app/web/cache.py and app/database/cache_store.py)
+    WEB_CACHE_BACKEND = os.getenv('WEB_CACHE_BACKEND', 'sqlite')  # 'sqlite' and 'redis' are shared by all workers, 'memory' is per worker
+    WEB_CACHE_PATH = os.getenv('WEB_CACHE_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'web_cache.db'))
+    WEB_CACHE_REDIS_URL = os.getenv('WEB_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    WEB_CACHE_ENTRIES = int(os.getenv('WEB_CACHE_ENTRIES', '2048'))  # cached results per worker ('memory'); 0 turns caching off
+    WEB_CACHE_MAX_MB = float(os.getenv('WEB_CACHE_MAX_MB', '64'))  # approximate bound per worker ('memory') or on the SQLite file
+    WEB_CACHE_TTL = int(os.getenv('WEB_CACHE_TTL', '300'))  # seconds a listing page or the site stats stay cached
+    WEB_CACHE_STRIPES = int(os.getenv('WEB_CACHE_STRIPES', '16'))  # independently locked segments
+    
+    # HTTP Caching Settings (ETag/Last-Modified validators; see app/web/conditional.py)
+    CACHE_CONTROL_API_JOBS = os.getenv('CACHE_CONTROL_API_JOBS', 'private, no-cache')  # '' sends no Cache-Control header
+    CACHE_CONTROL_JOB_LIST = os.getenv('CACHE_CONTROL_JOB_LIST', 'private, no-cache')
+    CACHE_CONTROL_JOB_DETAIL = os.getenv('CACHE_CONTROL_JOB_DETAIL', 'private, no-cache')
+    
+    # Ingest Settings (write-behind queue between scrapers and the database)
+    INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', '500'))
+    INGEST_FLUSH_INTERVAL = float(os.getenv('INGEST_FLUSH_INTERVAL', '2.0'))  # seconds
+    INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', '10000'))
+    INGEST_PUT_TIMEOUT = float(os.getenv('INGEST_PUT_TIMEOUT', '5.0'))  # seconds before spilling to disk
+    INGEST_SPILL_PATH = os.getenv('INGEST_SPILL_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'ingest_spill.jsonl'))
+    
+    # Duplicate Detection Settings (cross-source near duplicates; see app/database/dedup.py)
+    DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', '0.7'))  # estimated similarity at which postings are the same job
     
     # Scraping Settings
     SCRAPING_INTERVAL = int(os.getenv('SCRAPING_INTERVAL', '12'))  # hours
     MAX_RETRIES = 3
     REQUEST_TIMEOUT = 30  # seconds
     
+    # Rate Limiting Settings
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'sqlite')  # 'sqlite' is shared by all processes, 'memory' is per process
+    RATE_LIMIT_STATE_PATH = os.getenv('RATE_LIMIT_STATE_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'rate_limits.db'))
+    RATE_LIMIT_MAX_REQUESTS = int(os.getenv('RATE_LIMIT_MAX_REQUESTS', '300'))  # bucket size across all sites
+    RATE_LIMIT_WINDOW = int(os.getenv('RATE_LIMIT_WINDOW', '3600'))  # seconds for an empty bucket to refill
+    
     # Job Board URLs
     INDEED_URL = "https://www.indeed.com"
     LINKEDIN_URL = "https://www.linkedin.com/jobs"
@@ -31,4 +95,9 @@ class Config:
     
     # User Interface Settings
     ITEMS_PER_PAGE = 20
-    MAX_SEARCH_RESULTS = 100
\ No newline at end of file
+    MAX_SEARCH_RESULTS = 100
+    JOB_LIST_PER_PAGE = 50
+    API_MAX_PER_PAGE = int(os.getenv('API_MAX_PER_PAGE', '100'))
+    LISTING_COUNT_LIMIT = int(os.getenv('LISTING_COUNT_LIMIT', '10000'))  # filtered totals above this are shown as "10000+"
+    LISTING_COUNT_TTL = int(os.getenv('LISTING_COUNT_TTL', '60'))  # seconds a filtered total is cached
+    KEYWORD_SCAN_DENSITY = float(os.getenv('KEYWORD_SCAN_DENSITY', '0.1'))  # keywords in this share of the newest jobs skip the FTS index
\ No newline at end of file
@@ -0,0 +1,53 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.database import aggregates, fts
+from app.database.engine import get_engine
+from app.database.models import Base
+from config.config import Config
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave out the tables created in raw SQL (FTS index, aggregate counters) when comparing"""
+    if type_ == 'table' and reflected and compare_to is None:
+        return not (name.startswith(fts.FTS_TABLE) or name == aggregates.AGGREGATE_TABLE)
+    return True
+
+def get_url() -> str:
+    return config.get_main_option('sqlalchemy.url') or Config.SQLALCHEMY_DATABASE_URI
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of running against a database"""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=include_object,
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """Run migrations on the shared engine"""
+    with get_engine(get_url()).connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=True  # SQLite needs table rebuilds for most ALTERs
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
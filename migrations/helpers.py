@@ -0,0 +1,20 @@
+"""Inspection helpers so migrations also apply cleanly to databases created by create_all()"""
+import sqlalchemy as sa
+from alembic import op
+
+def has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+def has_column(table: str, column: str) -> bool:
+    return any(col['name'] == column for col in sa.inspect(op.get_bind()).get_columns(table))
+
+def has_index(table: str, name: str) -> bool:
+    return any(index['name'] == name for index in sa.inspect(op.get_bind()).get_indexes(table))
+
+def create_index_if_missing(name: str, table: str, columns, unique: bool = False):
+    if not has_index(table, name):
+        op.create_index(name, table, columns, unique=unique)
+
+def drop_index_if_present(name: str, table: str):
+    if has_index(table, name):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,112 @@
+"""Baseline schema: jobs, applications, run history and job identity
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.identity import job_key
+from migrations.helpers import has_table, has_column, create_index_if_missing
+
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _backfill_job_keys():
+    """Give existing rows a job_key; later duplicates of a key are left without one"""
+    conn = op.get_bind()
+    taken = {row[0] for row in conn.execute(sa.text("SELECT job_key FROM jobs WHERE job_key IS NOT NULL"))}
+    rows = conn.execute(sa.text("SELECT id, url, source FROM jobs WHERE job_key IS NULL ORDER BY id")).fetchall()
+    updates = []
+    for job_id, url, source in rows:
+        key = job_key({'url': url, 'source': source})
+        if key and key not in taken:
+            taken.add(key)
+            updates.append({'id': job_id, 'job_key': key})
+    if updates:
+        conn.execute(sa.text("UPDATE jobs SET job_key = :job_key WHERE id = :id"), updates)
+
+def upgrade():
+    if not has_table('jobs'):
+        op.create_table(
+            'jobs',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('title', sa.String(200), nullable=False),
+            sa.Column('company', sa.String(200), nullable=False),
+            sa.Column('location', sa.String(200)),
+            sa.Column('description', sa.Text),
+            sa.Column('url', sa.String(500)),
+            sa.Column('source', sa.String(50)),
+            sa.Column('posted_date', sa.DateTime),
+            sa.Column('created_at', sa.DateTime),
+            sa.Column('salary', sa.String(200))
+        )
+
+    # Columns added with upsert ingestion
+    if not has_column('jobs', 'job_key'):
+        op.add_column('jobs', sa.Column('job_key', sa.String(500)))
+    if not has_column('jobs', 'updated_at'):
+        op.add_column('jobs', sa.Column('updated_at', sa.DateTime))
+    _backfill_job_keys()
+    create_index_if_missing('ix_jobs_job_key', 'jobs', ['job_key'], unique=True)
+
+    if not has_table('job_applications'):
+        op.create_table(
+            'job_applications',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('job_id', sa.Integer, sa.ForeignKey('jobs.id'), nullable=False),
+            sa.Column('status', sa.String(50)),
+            sa.Column('notes', sa.Text),
+            sa.Column('applied_date', sa.DateTime),
+            sa.Column('created_at', sa.DateTime),
+            sa.Column('updated_at', sa.DateTime)
+        )
+
+    if not has_table('scrape_runs'):
+        op.create_table(
+            'scrape_runs',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('started_at', sa.DateTime),
+            sa.Column('finished_at', sa.DateTime),
+            sa.Column('status', sa.String(20)),
+            sa.Column('requests', sa.Integer),
+            sa.Column('pages_fetched', sa.Integer),
+            sa.Column('cards_parsed', sa.Integer),
+            sa.Column('new_jobs', sa.Integer),
+            sa.Column('duplicate_jobs', sa.Integer),
+            sa.Column('errors', sa.Integer),
+            sa.Column('p50_latency_ms', sa.Float),
+            sa.Column('p95_latency_ms', sa.Float)
+        )
+    create_index_if_missing('ix_scrape_runs_started_at', 'scrape_runs', ['started_at'])
+
+    if not has_table('scrape_run_sources'):
+        op.create_table(
+            'scrape_run_sources',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('run_id', sa.Integer, sa.ForeignKey('scrape_runs.id'), nullable=False),
+            sa.Column('source', sa.String(50), nullable=False),
+            sa.Column('query', sa.String(200)),
+            sa.Column('location', sa.String(200)),
+            sa.Column('started_at', sa.DateTime),
+            sa.Column('finished_at', sa.DateTime),
+            sa.Column('requests', sa.Integer),
+            sa.Column('pages_fetched', sa.Integer),
+            sa.Column('cards_parsed', sa.Integer),
+            sa.Column('new_jobs', sa.Integer),
+            sa.Column('duplicate_jobs', sa.Integer),
+            sa.Column('errors', sa.Integer),
+            sa.Column('p50_latency_ms', sa.Float),
+            sa.Column('p95_latency_ms', sa.Float),
+            sa.Column('error_message', sa.Text)
+        )
+    create_index_if_missing('ix_scrape_run_sources_run_id', 'scrape_run_sources', ['run_id'])
+
+def downgrade():
+    op.drop_table('scrape_run_sources')
+    op.drop_table('scrape_runs')
+    op.drop_table('job_applications')
+    op.drop_table('jobs')
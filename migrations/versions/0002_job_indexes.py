@@ -0,0 +1,32 @@
+"""Indexes for the jobs table hot filters and sorts
+
+Revision ID: 0002_job_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from migrations.helpers import create_index_if_missing, drop_index_if_present
+
+revision = '0002_job_indexes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # name, table, columns
+    ('ix_jobs_posted_date', 'jobs', ['posted_date']),
+    ('ix_jobs_source_posted_date', 'jobs', ['source', 'posted_date']),
+    ('ix_jobs_company', 'jobs', ['company']),
+    ('ix_jobs_title', 'jobs', ['title']),
+    ('ix_job_applications_job_id', 'job_applications', ['job_id']),
+]
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        create_index_if_missing(name, table, columns)
+    op.execute('ANALYZE')
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        drop_index_if_present(name, table)
@@ -0,0 +1,28 @@
+"""FTS5 full-text index over job title, company and description (SQLite only)
+
+Revision ID: 0003_jobs_fts
+Revises: 0002_job_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from app.database import fts
+
+revision = '0003_jobs_fts'
+down_revision = '0002_job_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in fts.CREATE_STATEMENTS:
+        op.execute(statement)
+    # Index the rows that existed before the triggers
+    op.execute(fts.REBUILD_STATEMENT)
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in fts.DROP_STATEMENTS:
+        op.execute(statement)
@@ -0,0 +1,57 @@
+"""Precomputed classification columns for the web listing subset
+
+Revision ID: 0004_job_classification
+Revises: 0003_jobs_fts
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.classifier import classify
+from migrations.helpers import has_column, create_index_if_missing, drop_index_if_present
+
+revision = '0004_job_classification'
+down_revision = '0003_jobs_fts'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ('is_us', sa.Boolean()),
+    ('role_family', sa.String(20)),
+    ('is_remote', sa.Boolean()),
+]
+
+INDEXES = [
+    ('ix_jobs_classification_posted_date', ['is_us', 'role_family', 'posted_date']),
+    ('ix_jobs_classification_company', ['is_us', 'role_family', 'company']),
+    ('ix_jobs_classification_title', ['is_us', 'role_family', 'title']),
+]
+
+def _backfill_classification():
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, title, location FROM jobs WHERE role_family IS NULL")).fetchall()
+    updates = [{'id': job_id, **classify(title, location)} for job_id, title, location in rows]
+    if updates:
+        conn.execute(
+            sa.text("UPDATE jobs SET is_us = :is_us, role_family = :role_family, is_remote = :is_remote WHERE id = :id"),
+            updates
+        )
+
+def upgrade():
+    for name, type_ in COLUMNS:
+        if not has_column('jobs', name):
+            op.add_column('jobs', sa.Column(name, type_))
+    _backfill_classification()
+
+    for name, columns in INDEXES:
+        create_index_if_missing(name, 'jobs', columns)
+    # Title sorting now goes through ix_jobs_classification_title
+    drop_index_if_present('ix_jobs_title', 'jobs')
+    op.execute('ANALYZE')
+
+def downgrade():
+    create_index_if_missing('ix_jobs_title', 'jobs', ['title'])
+    for name, _ in reversed(INDEXES):
+        drop_index_if_present(name, 'jobs')
+    for name, _ in reversed(COLUMNS):
+        op.drop_column('jobs', name)
@@ -0,0 +1,71 @@
+"""Structured salary, location and job type columns plus is_active
+
+Revision ID: 0005_job_structured_fields
+Revises: 0004_job_classification
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.fields import structured_fields
+from migrations.helpers import has_column, create_index_if_missing, drop_index_if_present
+
+revision = '0005_job_structured_fields'
+down_revision = '0004_job_classification'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ('salary_min', sa.Float()),
+    ('salary_max', sa.Float()),
+    ('salary_period', sa.String(10)),
+    ('city', sa.String(100)),
+    ('state', sa.String(2)),
+    ('job_type', sa.String(20)),
+]
+
+INDEXES = [
+    ('ix_jobs_active_company', ['is_active', 'company']),
+    ('ix_jobs_active_location', ['is_active', 'state', 'city']),
+    ('ix_jobs_active_salary', ['is_active', 'salary_period', 'salary_min', 'salary_max']),
+    ('ix_jobs_active_job_type', ['is_active', 'job_type']),
+]
+
+def _backfill_structured_fields(batch_size: int = 5000):
+    conn = op.get_bind()
+    update = sa.text(
+        "UPDATE jobs SET salary_min = :salary_min, salary_max = :salary_max, salary_period = :salary_period, "
+        "city = :city, state = :state, job_type = :job_type WHERE id = :id"
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, title, location, salary, job_type FROM jobs WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {'last_id': last_id, 'limit': batch_size}
+        ).mappings().all()
+        if not rows:
+            break
+        conn.execute(update, [{'id': row['id'], **structured_fields(row)} for row in rows])
+        last_id = rows[-1]['id']
+
+def upgrade():
+    for name, type_ in COLUMNS:
+        if not has_column('jobs', name):
+            op.add_column('jobs', sa.Column(name, type_))
+    if not has_column('jobs', 'is_active'):
+        op.add_column('jobs', sa.Column('is_active', sa.Boolean(), server_default=sa.true(), nullable=False))
+    _backfill_structured_fields()
+
+    for name, columns in INDEXES:
+        create_index_if_missing(name, 'jobs', columns)
+    # Distinct-company lookups now go through ix_jobs_active_company
+    drop_index_if_present('ix_jobs_company', 'jobs')
+    op.execute('ANALYZE')
+
+def downgrade():
+    create_index_if_missing('ix_jobs_company', 'jobs', ['company'])
+    for name, _ in reversed(INDEXES):
+        drop_index_if_present(name, 'jobs')
+    op.drop_column('jobs', 'is_active')
+    for name, _ in reversed(COLUMNS):
+        op.drop_column('jobs', name)
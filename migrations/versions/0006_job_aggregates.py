@@ -0,0 +1,29 @@
+"""Trigger-maintained job and application counters (SQLite only)
+
+Revision ID: 0006_job_aggregates
+Revises: 0005_job_structured_fields
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from app.database import aggregates
+
+revision = '0006_job_aggregates'
+down_revision = '0005_job_structured_fields'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in aggregates.CREATE_STATEMENTS + aggregates.APPLICATION_CREATE_STATEMENTS:
+        op.execute(statement)
+    # Count the rows that existed before the triggers
+    for statement in aggregates.REBUILD_STATEMENTS:
+        op.execute(statement)
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in aggregates.APPLICATION_DROP_STATEMENTS + aggregates.DROP_STATEMENTS:
+        op.execute(statement)
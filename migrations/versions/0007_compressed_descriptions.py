@@ -0,0 +1,84 @@
+"""Dictionary-compressed job descriptions (SQLite only)
+
+Revision ID: 0007_compressed_descriptions
+Revises: 0006_job_aggregates
+Create Date: 2026-10-19
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database import fts
+from app.database.compression import DICTIONARY_TABLE, MIN_LENGTH, forget_newest_dictionary, train_dictionary
+from migrations.helpers import has_table
+
+revision = '0007_compressed_descriptions'
+down_revision = '0006_job_aggregates'
+branch_labels = None
+depends_on = None
+
+# jobs_fts as 0003 created it, reading descriptions straight from jobs
+PLAIN_FTS_STATEMENTS = [
+    statement.replace(f"content='{fts.CONTENT_VIEW}'", "content='jobs'")
+             .replace('job_text(new.description)', 'new.description')
+             .replace('job_text(old.description)', 'old.description')
+    for statement in fts.CREATE_STATEMENTS[1:]
+]
+
+def _compress_descriptions(batch_size: int = 1000):
+    conn = op.get_bind()
+    samples = conn.execute(sa.text(
+        "SELECT description FROM jobs WHERE description IS NOT NULL ORDER BY id DESC LIMIT 5000"
+    )).scalars().all()
+    dictionary = train_dictionary(samples)
+    if dictionary:
+        conn.execute(
+            sa.text(f"INSERT INTO {DICTIONARY_TABLE} (data, sample_size, created_at) VALUES (:data, :size, :now)"),
+            {'data': dictionary, 'size': len(samples), 'now': datetime.utcnow()}
+        )
+        forget_newest_dictionary(conn)
+    last_id = 0
+    while True:
+        ids = conn.execute(
+            sa.text("SELECT id FROM jobs WHERE id > :last_id AND typeof(description) = 'text' "
+                    "AND length(description) >= :min ORDER BY id LIMIT :limit"),
+            {'last_id': last_id, 'min': MIN_LENGTH, 'limit': batch_size}
+        ).scalars().all()
+        if not ids:
+            break
+        conn.execute(
+            sa.text("UPDATE jobs SET description = job_compress(description) WHERE id IN :ids")
+              .bindparams(sa.bindparam('ids', expanding=True)),
+            {'ids': ids}
+        )
+        last_id = ids[-1]
+
+def upgrade():
+    if not has_table(DICTIONARY_TABLE):
+        op.create_table(
+            DICTIONARY_TABLE,
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('data', sa.LargeBinary(), nullable=False),
+            sa.Column('sample_size', sa.Integer()),
+            sa.Column('created_at', sa.DateTime())
+        )
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # Compress with the index dropped, then index the decompressed text once
+    for statement in fts.DROP_STATEMENTS:
+        op.execute(statement)
+    _compress_descriptions()
+    for statement in fts.CREATE_STATEMENTS:
+        op.execute(statement)
+    op.execute(fts.REBUILD_STATEMENT)
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in fts.DROP_STATEMENTS:
+            op.execute(statement)
+        op.execute("UPDATE jobs SET description = job_text(description) WHERE typeof(description) = 'blob'")
+        for statement in PLAIN_FTS_STATEMENTS:
+            op.execute(statement)
+        op.execute(fts.REBUILD_STATEMENT)
+    op.drop_table(DICTIONARY_TABLE)
@@ -0,0 +1,48 @@
+"""Near-duplicate detection: canonical_id, MinHash signatures and LSH buckets
+
+Revision ID: 0008_job_near_duplicates
+Revises: 0007_compressed_descriptions
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.database import aggregates
+from migrations.helpers import has_table, has_column, create_index_if_missing, drop_index_if_present
+
+revision = '0008_job_near_duplicates'
+down_revision = '0007_compressed_descriptions'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if not has_column('jobs', 'canonical_id'):
+        op.add_column('jobs', sa.Column('canonical_id', sa.Integer()))
+    create_index_if_missing('ix_jobs_canonical_id', 'jobs', ['canonical_id'])
+    if not has_table('job_signatures'):
+        op.create_table(
+            'job_signatures',
+            sa.Column('job_id', sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column('signature', sa.LargeBinary(), nullable=False)
+        )
+    if not has_table('job_lsh_buckets'):
+        op.create_table(
+            'job_lsh_buckets',
+            sa.Column('key', sa.BigInteger(), primary_key=True, autoincrement=False),
+            sa.Column('job_id', sa.Integer(), primary_key=True, autoincrement=False),
+            sqlite_with_rowid=False
+        )
+    # Existing jobs are indexed by `python -m app.database.dedup`, not here
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in aggregates.DUPLICATE_CREATE_STATEMENTS + aggregates.DUPLICATE_REBUILD_STATEMENTS:
+            op.execute(statement)
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in aggregates.DUPLICATE_DROP_STATEMENTS:
+            op.execute(statement)
+        op.execute(aggregates.DUPLICATE_REBUILD_STATEMENTS[0])
+    op.drop_table('job_lsh_buckets')
+    op.drop_table('job_signatures')
+    drop_index_if_present('ix_jobs_canonical_id', 'jobs')
+    op.drop_column('jobs', 'canonical_id')
@@ -0,0 +1,112 @@
+"""Company and location lookup tables, with company_id/location_id on jobs
+
+Revision ID: 0009_company_location_lookups
+Revises: 0008_job_near_duplicates
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.database import aggregates, lookups
+from migrations.helpers import has_table, has_column, create_index_if_missing, drop_index_if_present
+
+revision = '0009_company_location_lookups'
+down_revision = '0008_job_near_duplicates'
+branch_labels = None
+depends_on = None
+
+JOB_TRIGGERS = ['jobs_aggregates_ai', 'jobs_aggregates_ad', 'jobs_aggregates_au']
+# The per-company and per-location counters as 0006 created them, keyed by the text columns
+LEGACY_DIMENSIONS = aggregates.JOB_DIMENSIONS + [
+    ('company', '{row}.company', '{row}.is_active'),
+    ('location', "coalesce({row}.location, '')", '{row}.is_active'),
+]
+LEGACY_COLUMNS = 'source, posted_date, company, location, is_active, is_us, role_family'
+
+def _legacy_statements(change, row: str) -> str:
+    statements = []
+    for dimension, key, condition in LEGACY_DIMENSIONS:
+        statements += change(dimension, key.format(row=row), condition.format(row=row))
+    return '\n        '.join(statements)
+
+def _recreate_job_triggers(statements):
+    for name in JOB_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for statement in statements:
+        op.execute(statement)
+
+def upgrade():
+    if not has_table('companies'):
+        op.create_table(
+            'companies',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(200), nullable=False),
+            sa.Column('key', sa.String(200), nullable=False, unique=True)
+        )
+    if not has_table('company_aliases'):
+        op.create_table(
+            'company_aliases',
+            sa.Column('key', sa.String(200), primary_key=True),
+            sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False)
+        )
+        op.create_index('ix_company_aliases_company_id', 'company_aliases', ['company_id'])
+    if not has_table('locations'):
+        op.create_table(
+            'locations',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(200), nullable=False),
+            sa.Column('key', sa.String(200), nullable=False, unique=True),
+            sa.Column('city', sa.String(100)),
+            sa.Column('state', sa.String(2))
+        )
+    if not has_column('jobs', 'company_id'):
+        op.add_column('jobs', sa.Column('company_id', sa.Integer()))
+    if not has_column('jobs', 'location_id'):
+        op.add_column('jobs', sa.Column('location_id', sa.Integer()))
+    create_index_if_missing('ix_jobs_active_company_id', 'jobs', ['is_active', 'company_id'])
+    create_index_if_missing('ix_jobs_active_location_id', 'jobs', ['is_active', 'location_id'])
+    drop_index_if_present('ix_jobs_active_company', 'jobs')
+
+    sqlite = op.get_bind().dialect.name == 'sqlite'
+    if sqlite:
+        # Counters move from the text columns to the IDs; encode before the new triggers exist
+        _recreate_job_triggers(aggregates.CREATE_STATEMENTS[2:])
+    lookups.backfill(op.get_bind())
+    if sqlite:
+        for statement in aggregates.ENCODED_CREATE_STATEMENTS + aggregates.ENCODED_REBUILD_STATEMENTS:
+            op.execute(statement)
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in aggregates.ENCODED_DROP_STATEMENTS:
+            op.execute(statement)
+        _recreate_job_triggers([
+            f"""
+            CREATE TRIGGER jobs_aggregates_ai AFTER INSERT ON jobs BEGIN
+                {_legacy_statements(aggregates._increment, 'new')}
+            END
+            """,
+            f"""
+            CREATE TRIGGER jobs_aggregates_ad AFTER DELETE ON jobs BEGIN
+                {_legacy_statements(aggregates._decrement, 'old')}
+            END
+            """,
+            f"""
+            CREATE TRIGGER jobs_aggregates_au AFTER UPDATE OF {LEGACY_COLUMNS} ON jobs BEGIN
+                {_legacy_statements(aggregates._decrement, 'old')}
+                {_legacy_statements(aggregates._increment, 'new')}
+            END
+            """,
+        ])
+        op.execute(f"DELETE FROM {aggregates.AGGREGATE_TABLE} WHERE dimension IN ('company', 'location')")
+        for dimension in LEGACY_DIMENSIONS[-2:]:
+            op.execute(aggregates._rebuild_job_dimension(*dimension))
+        op.execute(aggregates.RECOUNT_DISTINCT)
+    create_index_if_missing('ix_jobs_active_company', 'jobs', ['is_active', 'company'])
+    drop_index_if_present('ix_jobs_active_location_id', 'jobs')
+    drop_index_if_present('ix_jobs_active_company_id', 'jobs')
+    op.drop_column('jobs', 'location_id')
+    op.drop_column('jobs', 'company_id')
+    op.drop_table('locations')
+    op.drop_table('company_aliases')
+    op.drop_table('companies')
@@ -0,0 +1,21 @@
+"""Index on jobs.updated_at for incremental readers (see app/database/job_index.py)
+
+Revision ID: 0010_jobs_updated_at_index
+Revises: 0009_company_location_lookups
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from migrations.helpers import create_index_if_missing, drop_index_if_present
+
+revision = '0010_jobs_updated_at_index'
+down_revision = '0009_company_location_lookups'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    create_index_if_missing('ix_jobs_updated_at', 'jobs', ['updated_at'])
+    op.execute('ANALYZE jobs')
+
+def downgrade():
+    drop_index_if_present('ix_jobs_updated_at', 'jobs')
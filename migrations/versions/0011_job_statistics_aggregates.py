@@ -0,0 +1,24 @@
+"""Job type, state and salary counters in job_aggregates (see app/database/aggregates.py)
+
+Revision ID: 0011_job_statistics_aggregates
+Revises: 0010_jobs_updated_at_index
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from app.database import aggregates
+
+revision = '0011_job_statistics_aggregates'
+down_revision = '0010_jobs_updated_at_index'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in aggregates.STATISTICS_CREATE_STATEMENTS + aggregates.STATISTICS_REBUILD_STATEMENTS:
+            op.execute(statement)
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in aggregates.STATISTICS_DROP_STATEMENTS + aggregates.STATISTICS_REBUILD_STATEMENTS[:1]:
+            op.execute(statement)
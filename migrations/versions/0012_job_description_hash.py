@@ -0,0 +1,41 @@
+"""Digest of each job's description, for change detection on re-ingest
+
+Revision ID: 0012_job_description_hash
+Revises: 0011_job_statistics_aggregates
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.compression import digest
+from migrations.helpers import has_column
+
+revision = '0012_job_description_hash'
+down_revision = '0011_job_statistics_aggregates'
+branch_labels = None
+depends_on = None
+
+def _backfill_description_hashes(batch_size: int = 1000):
+    conn = op.get_bind()
+    # Descriptions are compressed on SQLite (see 0007)
+    description = 'job_text(description)' if conn.dialect.name == 'sqlite' else 'description'
+    update = sa.text("UPDATE jobs SET description_hash = :description_hash WHERE id = :id")
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(f"SELECT id, {description} AS description FROM jobs "
+                    "WHERE id > :last_id AND description IS NOT NULL ORDER BY id LIMIT :limit"),
+            {'last_id': last_id, 'limit': batch_size}
+        ).mappings().all()
+        if not rows:
+            break
+        conn.execute(update, [{'id': row['id'], 'description_hash': digest(row['description'])} for row in rows])
+        last_id = rows[-1]['id']
+
+def upgrade():
+    if not has_column('jobs', 'description_hash'):
+        op.add_column('jobs', sa.Column('description_hash', sa.LargeBinary(8)))
+    _backfill_description_hashes()
+
+def downgrade():
+    op.drop_column('jobs', 'description_hash')
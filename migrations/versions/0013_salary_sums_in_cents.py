@@ -0,0 +1,32 @@
+"""Salary sums in job_aggregates kept in whole cents (see app/database/aggregates.py)
+
+Revision ID: 0013_salary_sums_in_cents
+Revises: 0012_job_description_hash
+Create Date: 2026-10-19
+"""
+import re
+
+from alembic import op
+
+from app.database import aggregates
+
+revision = '0013_salary_sums_in_cents'
+down_revision = '0012_job_description_hash'
+branch_labels = None
+depends_on = None
+
+CENTS = re.compile(r'CAST\(round\((\w+\.salary_m(?:in|ax)) \* 100\) AS INTEGER\)')
+
+def _rebuild(create_statements, rebuild_statements):
+    for statement in aggregates.STATISTICS_DROP_STATEMENTS + create_statements + rebuild_statements:
+        op.execute(statement)
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        _rebuild(aggregates.STATISTICS_CREATE_STATEMENTS, aggregates.STATISTICS_REBUILD_STATEMENTS)
+
+def downgrade():
+    # Back to 0011's triggers, which add the salaries themselves
+    if op.get_bind().dialect.name == 'sqlite':
+        _rebuild([CENTS.sub(r'\1', statement) for statement in aggregates.STATISTICS_CREATE_STATEMENTS],
+                 [CENTS.sub(r'\1', statement) for statement in aggregates.STATISTICS_REBUILD_STATEMENTS])
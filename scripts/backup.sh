@@ -9,28 +9,26 @@ timestamp=$(date +"%Y%m%d_%H%M%S")
 # Create backups directory if it doesn't exist
 mkdir -p data/backups
 
-# Backup database
+# Backup database (online backup API; compressed, verified and pruned to BACKUP_KEEP)
 echo "Creating database backup..."
-cp data/jobs.db "data/backups/jobs_${timestamp}.db"
+python -m app.database.backup backup ${INCREMENTAL:+--incremental}
 
 # Backup logs
 echo "Creating logs backup..."
 mkdir -p "data/backups/logs_${timestamp}"
 cp logs/* "data/backups/logs_${timestamp}/"
 
-# Compress backup
-echo "Compressing backup..."
+# Compress logs
+echo "Compressing logs..."
 tar -czf "data/backups/backup_${timestamp}.tar.gz" \
-    "data/backups/jobs_${timestamp}.db" \
     "data/backups/logs_${timestamp}"
 
 # Remove temporary files
-rm "data/backups/jobs_${timestamp}.db"
 rm -r "data/backups/logs_${timestamp}"
 
-# Keep only last 5 backups
+# Keep only last 5 log backups
 cd data/backups
 ls -t backup_*.tar.gz | tail -n +6 | xargs -r rm
 
 echo "Backup completed successfully!"
-echo "Backup file: data/backups/backup_${timestamp}.tar.gz"
\ No newline at end of file
+echo "Log backup: data/backups/backup_${timestamp}.tar.gz"
\ No newline at end of file
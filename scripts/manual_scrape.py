@@ -1,19 +1,14 @@
 from app.scraper.glassdoor_scraper import GlassdoorScraper
-from app.database.models import Job
+from app.database import get_session
 from app.database.repository import JobRepository
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
-import os
 from dotenv import load_dotenv
 
 def main():
     # Load environment variables
     load_dotenv()
     
-    # Initialize database
-    db_url = os.getenv('DATABASE_URL', 'sqlite:///jobs.db')
-    engine = create_engine(db_url)
-    session = Session(engine)
+    # Initialize database (shared engine on Config.SQLALCHEMY_DATABASE_URI)
+    session = get_session()
     job_repository = JobRepository(session)
     
     try:
@@ -30,12 +25,12 @@ def main():
         
         # Save jobs to database
         print(f"\nFound {len(jobs)} jobs, saving to database...")
-        for job in jobs:
-            try:
-                job_repository.create(job)
-                print(f"Saved: {job['title']} at {job['company']}")
-            except Exception as e:
-                print(f"Error saving job: {str(e)}")
+        try:
+            counts = job_repository.upsert_many(jobs)
+            print(f"Saved: {counts['inserted']} new, {counts['updated']} updated, "
+                  f"{counts['unchanged']} unchanged")
+        except Exception as e:
+            print(f"Error saving jobs: {str(e)}")
         
         print("\nScraping completed!")
         
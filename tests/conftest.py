@@ -0,0 +1,49 @@
+import contextlib
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.engine import get_engine
+from app.database.models import Base
+
+def _make_job(i, **overrides):
+    job = {'title': 'Software Engineer', 'company': f'Company {i % 4}', 'location': 'Austin, TX, United States',
+           'source': 'LinkedIn', 'url': f'https://www.linkedin.com/jobs/view/{i}'}
+    job.update(overrides)
+    return job
+
+@pytest.fixture
+def make_job():
+    """Factory for scraped job_data dicts: make_job(i, **overrides), posting i on LinkedIn"""
+    return _make_job
+
+@pytest.fixture
+def engine(tmp_path):
+    """A SQLite database file opened as the app does, with the full schema, FTS index and counters"""
+    engine = get_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+@contextlib.contextmanager
+def _count_queries(engine):
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+@pytest.fixture
+def count_queries():
+    """Context manager collecting the SQL statements run on an engine inside the block"""
+    return _count_queries
@@ -0,0 +1,83 @@
+from sqlalchemy import text
+
+from app.database import aggregates
+from app.database.models import Job, JobApplication
+from app.database.repository import JobRepository, JobApplicationRepository, StatsRepository
+
+def snapshot(session):
+    return sorted(session.execute(text("SELECT dimension, key, count FROM job_aggregates")).fetchall())
+
+def test_counters_follow_writes(session, make_job):
+    repository = JobRepository(session)
+    repository.upsert_many([make_job(1, company='A'), make_job(2, company='A'),
+                            make_job(3, company='B', title='Nurse')])
+    stats = StatsRepository(session)
+
+    assert stats.overview() == {'total_jobs': 2, 'active_jobs': 3, 'total_companies': 2, 'total_locations': 1}
+
+    # Moving the only B job to A drops a distinct company; deactivating removes it from the counts
+    job = session.query(Job).filter_by(company='B').one()
+    repository.update(job.id, {'company': 'A'})
+    assert stats.overview()['total_companies'] == 1
+    repository.update(job.id, {'is_active': False})
+    assert stats.overview()['active_jobs'] == 2
+    assert stats.breakdown()['sources'] == {'LinkedIn': 2}
+
+    repository.delete(session.query(Job).filter_by(company='A').first().id)
+    assert stats.overview()['total_jobs'] == 1
+
+def test_application_status_counts(session, make_job):
+    job = JobRepository(session).create(make_job(1, company='A'))
+    applications = JobApplicationRepository(session)
+    application = applications.create({'job_id': job.id, 'status': 'viewed'})
+    assert applications.get_application_stats() == {'viewed': 1}
+
+    application.status = 'applied'
+    session.commit()
+    assert applications.get_application_stats() == {'applied': 1}
+
+def test_rebuild_matches_incremental(session, make_job):
+    repository = JobRepository(session)
+    repository.upsert_many([make_job(i, company=f'C{i % 3}', location=f'City {i % 4}') for i in range(20)])
+    repository.upsert_many([make_job(i, company=f'D{i % 2}') for i in range(10, 30)])
+    repository.delete(session.query(Job).first().id)
+    session.add(JobApplication(job_id=session.query(Job.id).first()[0], status='interested'))
+    session.commit()
+    incremental = snapshot(session)
+
+    StatsRepository(session).rebuild()
+
+    assert snapshot(session) == incremental
+
+def test_job_statistics_match_live_queries(session, monkeypatch, make_job):
+    repository = JobRepository(session)
+    locations = ['Austin, TX', 'Dallas, TX', 'Houston, TX', 'Seattle, WA', 'Tacoma, WA', 'Denver, CO']
+    salaries = ['$100K/yr - $140K/yr', '$60/hr', '$120,000 - $160,000 a year', None]
+    repository.upsert_many([
+        make_job(i, company=f'C{i % 5}', location=locations[i % 6], salary=salaries[i % 4],
+                 job_type=['Full-time', 'Contract', None][i % 3])
+        for i in range(24)
+    ])
+    jobs = session.query(Job).order_by(Job.id).all()
+    repository.update(jobs[0].id, {'salary_min': 90000.0, 'salary_max': 95000.0})
+    repository.update(jobs[2].id, {'is_active': False})
+    repository.delete(jobs[4].id)
+
+    materialized = repository.get_job_statistics()
+    assert materialized['total_jobs'] == 22 and materialized['top_states'][0] == {'state': 'TX', 'count': 11}
+    monkeypatch.setattr(aggregates, 'aggregates_available', lambda bind: False)
+    assert repository.get_job_statistics() == materialized
+
+def test_fractional_salary_sums_stay_exact(session, make_job):
+    repository = JobRepository(session)
+    repository.upsert_many([make_job(i, company='A', salary='$100K/yr - $140K/yr') for i in range(3)])
+    jobs = session.query(Job).order_by(Job.id).all()
+    for value in (90000.1, 90000.2, 90000.3):
+        repository.update(jobs[0].id, {'salary_min': value})
+    repository.update(jobs[1].id, {'salary_min': 100000.05})
+
+    assert aggregates.salaries(session, 'year')['salary_min_sum'] == 290000.35
+    assert {kind for (kind,) in session.execute(text(
+        "SELECT DISTINCT typeof(count) FROM job_aggregates WHERE dimension LIKE 'salary_%'"))} == {'integer'}
+    StatsRepository(session).rebuild()
+    assert aggregates.salaries(session, 'year')['salary_min_sum'] == 290000.35
@@ -0,0 +1,60 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from app.database import archive
+from app.database.models import Job, JobApplication
+from app.database.repository import JobRepository
+
+@pytest.fixture
+def session(session):
+    now = datetime.utcnow()
+    session.add_all([
+        Job(title=f'Software Engineer {i}', company='Acme', location='Austin, TX, United States',
+            description='Python services ' * 50, job_key=f'linkedin:{i}', posted_date=now - timedelta(days=i * 10),
+            is_us=True, role_family='software')
+        for i in range(20)
+    ])
+    session.commit()
+    return session
+
+def test_old_unreferenced_jobs_move_to_the_archive(session):
+    # Referenced jobs stay in the hot table however old they are
+    session.add(JobApplication(job_id=20, status='applied'))
+    session.commit()
+
+    result = archive.archive_jobs(session.get_bind(), older_than_days=95, batch_size=3)
+    assert result['archived'] == 9  # jobs 11-20 are over 95 days old, but 20 has an application
+    hot = {job.id for job in session.query(Job)}
+    assert hot == set(range(1, 11)) | {20}
+    assert result['freed_pages'] > 0
+
+    cold = archive.archive_session(session.get_bind())
+    assert {job.id for job in cold.query(Job)} == set(range(11, 20))
+    # The archive keeps its own full-text index and counters
+    assert cold.execute(text("SELECT count(*) FROM jobs_fts WHERE jobs_fts MATCH 'python'")).scalar() == 9
+    cold.close()
+
+def test_queries_opt_in_to_the_archive(session):
+    archive.archive_jobs(session.get_bind(), older_than_days=95)
+    repository = JobRepository(session)
+
+    assert repository.get(15) is None
+    assert repository.get(15, include_archive=True).title == 'Software Engineer 14'
+    # Jobs 11-19 are archived; 20 is old too but, as the newest ID, always stays
+    assert len(repository.search(keywords='python')) == 11
+    jobs = repository.search(keywords='python', include_archive=True)
+    assert [job.id for job in jobs] == list(range(1, 21))
+
+def test_rearchiving_replaces_the_archived_copy(session):
+    archive.archive_jobs(session.get_bind(), older_than_days=95)
+    # The same posting scraped again, then aged out again
+    session.add(Job(title='Software Engineer 15 (updated)', company='Acme', job_key='linkedin:15',
+                    posted_date=datetime.utcnow() - timedelta(days=200)))
+    session.add(Job(title='Newest', company='Acme', job_key='linkedin:new'))
+    session.commit()
+    archive.archive_jobs(session.get_bind(), older_than_days=95)
+
+    cold = archive.archive_session(session.get_bind())
+    assert cold.query(Job).filter_by(job_key='linkedin:15').one().title == 'Software Engineer 15 (updated)'
+    cold.close()
@@ -0,0 +1,88 @@
+import gzip
+import os
+import sqlite3
+import pytest
+
+from app.database.backup import create_backup, restore_backup, verify_backup, list_backups, prune_backups
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY, title TEXT)")
+    conn.executemany("INSERT INTO jobs (title) VALUES (?)", [(f'Software Engineer {i}' * 10,) for i in range(2000)])
+    conn.commit()
+    yield path, conn
+    conn.close()
+
+def titles(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT id, title FROM jobs ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+def test_incremental_chain_restores(database, tmp_path):
+    path, conn = database
+    backup_dir = str(tmp_path / 'backups')
+    full = create_backup(path, backup_dir, step_pages=16)
+    assert full['kind'] == 'full' and full['verification']['ok']
+
+    # Uncheckpointed WAL writes are part of the snapshot
+    conn.execute("UPDATE jobs SET title = 'Staff Engineer' WHERE id = 1500")
+    conn.commit()
+    incremental = create_backup(path, backup_dir, incremental=True)
+    assert incremental['kind'] == 'incremental' and incremental['parent'] == full['name']
+    assert incremental['pages_written'] < full['pages_written'] / 10
+    assert incremental['size_bytes'] < full['size_bytes']
+
+    restored = str(tmp_path / 'restored.db')
+    assert restore_backup(backup_dir, incremental['name'], restored)['ok']
+    assert titles(restored) == titles(path)
+
+    with pytest.raises(FileExistsError):
+        restore_backup(backup_dir, full['name'], restored)
+    restore_backup(backup_dir, full['name'], restored, overwrite=True)
+    assert dict(titles(restored))[1500].startswith('Software Engineer')
+
+def test_corrupt_backup_fails_verification(database, tmp_path):
+    path, _ = database
+    backup_dir = str(tmp_path / 'backups')
+    full = create_backup(path, backup_dir, verify=False)
+    data_path = os.path.join(backup_dir, full['data'])
+    with gzip.open(data_path, 'rb') as f:
+        data = bytearray(f.read())
+    data[len(data) // 2] ^= 0xFF
+    with gzip.open(data_path, 'wb') as f:
+        f.write(bytes(data))
+
+    result = verify_backup(backup_dir, full['name'])
+    assert not result['ok']
+
+def test_retention_keeps_whole_chains(database, tmp_path):
+    path, _ = database
+    backup_dir = str(tmp_path / 'backups')
+    first = create_backup(path, backup_dir, verify=False)
+    create_backup(path, backup_dir, incremental=True, verify=False)
+    second = create_backup(path, backup_dir, verify=False)
+    create_backup(path, backup_dir, incremental=True, verify=False)
+
+    removed = prune_backups(backup_dir, keep=1)
+    assert len(removed) == 2 and first['name'] in removed
+    remaining = list_backups(backup_dir)
+    assert [manifest['kind'] for manifest in remaining] == ['full', 'incremental']
+    assert remaining[0]['name'] == second['name']
+    assert sorted(os.listdir(backup_dir)) == sorted(
+        name for manifest in remaining for name in (manifest['data'], manifest['hashes'], manifest['name'] + '.json'))
+
+def test_scheduled_backups_share_the_configured_directory(database, tmp_path, monkeypatch):
+    from app.database.db import Database
+    from config.config import Config
+
+    path, _ = database
+    backup_dir = str(tmp_path / 'configured')
+    monkeypatch.setattr(Config, 'BACKUP_DIRECTORY', backup_dir)
+    manifest = Database(f"sqlite:///{path}", path).backup_database()
+    assert [entry['name'] for entry in list_backups(backup_dir)] == [manifest['name']]
+    assert create_backup(path, backup_dir, incremental=True)['parent'] == manifest['name']
@@ -0,0 +1,35 @@
+from app.database.models import Job
+from app.database.classifier import classify
+from app.database.queries import apply_job_filters
+from app.database.repository import JobRepository
+
+def test_classify():
+    assert classify('Senior Software Engineer', 'Austin, TX, United States') == \
+        {'is_us': True, 'role_family': 'software', 'is_remote': False}
+    assert classify('Data Engineer / Backend Engineer', 'Remote, United States')['role_family'] == 'software'
+    assert classify('Data Scientist (Remote)', 'Toronto, Canada') == \
+        {'is_us': False, 'role_family': 'data', 'is_remote': True}
+    assert classify('Product Manager', None) == {'is_us': None, 'role_family': 'other', 'is_remote': False}
+
+def test_listing_filters_on_classification(session):
+    repository = JobRepository(session)
+    repository.upsert_many([
+        {'title': 'Java Developer', 'company': 'A', 'location': 'Denver, CO, United States',
+         'url': 'https://example.com/jobs/view/1', 'source': 'LinkedIn'},
+        {'title': 'Java Developer', 'company': 'B', 'location': 'Berlin, Germany',
+         'url': 'https://example.com/jobs/view/2', 'source': 'LinkedIn'},
+        {'title': 'Product Manager', 'company': 'C', 'location': 'Denver, CO, United States',
+         'url': 'https://example.com/jobs/view/3', 'source': 'LinkedIn'},
+    ])
+    # A row written before classification existed is picked up by the backfill
+    session.execute(Job.__table__.insert(), [{'title': 'Software Developer', 'company': 'D',
+                                              'location': 'Remote, United States', 'job_key': 'legacy'}])
+    session.commit()
+
+    assert [job.company for job in apply_job_filters(session.query(Job))] == ['A']
+    assert repository.backfill_classification() == {'updated': 1}
+    assert sorted(job.company for job in apply_job_filters(session.query(Job))) == ['A', 'D']
+
+    job = session.query(Job).filter_by(company='B').one()
+    repository.update(job.id, {'location': 'Boston, MA, United States'})
+    assert job.is_us is True
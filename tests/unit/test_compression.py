@@ -0,0 +1,121 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.database import compression
+from app.database.models import Base, Job
+from app.database.repository import JobRepository
+
+BOILERPLATE = ("We are an equal opportunity employer and value diversity at our company. "
+               "We offer a competitive salary, health insurance, 401k matching and unlimited PTO. ")
+
+def description(i, language):
+    return f"Build {language} services for job {i}. " + BOILERPLATE
+
+@pytest.fixture
+def posting(make_job):
+    """Job i, its description mostly boilerplate shared with the others"""
+    return lambda i, language: make_job(i, description=description(i, language))
+
+def stored(session):
+    return session.execute(text("SELECT typeof(description), length(description) FROM jobs ORDER BY id")).all()
+
+def test_descriptions_round_trip_compressed(session, posting):
+    repository = JobRepository(session)
+    repository.upsert_many([posting(i, 'Python') for i in range(20)])
+    plain = len(description(0, 'Python'))
+    assert all(kind == 'blob' and size < plain for kind, size in stored(session))
+
+    # A dictionary trained on the corpus shrinks new rows much further
+    assert compression.train(session.get_bind(), samples=20)
+    repository.upsert_many([posting(i, 'Rust') for i in range(20, 25)])
+    sizes = [size for _, size in stored(session)]
+    assert max(sizes[20:]) < min(sizes[:20]) / 2
+
+    session.expunge_all()
+    job = session.get(Job, 22)
+    assert 'description' not in job.__dict__  # deferred until accessed
+    assert job.description == description(21, 'Rust')
+    assert 'description' not in job.to_dict()
+    assert job.to_dict(include_description=True)['description'] == job.description
+
+def test_rescrapes_compare_description_digests(session, posting, count_queries):
+    repository = JobRepository(session)
+    repository.upsert_many([posting(i, 'Python') for i in range(5)])
+    with count_queries(session.get_bind()) as statements:
+        assert repository.upsert_many([posting(i, 'Python') for i in range(5)])['unchanged'] == 5
+    # Nothing was decompressed to tell
+    assert not any('job_text' in statement for statement in statements)
+    assert repository.upsert_many([posting(0, 'Go'), posting(1, 'Python')]) == \
+        {'inserted': 0, 'updated': 1, 'unchanged': 1}
+
+    # ORM writes keep the digest in step
+    job = session.get(Job, 2)
+    repository.update(job.id, {'description': description(1, 'Rust')})
+    assert job.description_hash == compression.digest(description(1, 'Rust'))
+    assert repository.upsert_many([posting(1, 'Rust')])['unchanged'] == 1
+
+def test_search_and_fts_see_plain_text(session, posting):
+    repository = JobRepository(session)
+    repository.upsert_many([posting(i, 'Python' if i % 2 else 'Go') for i in range(10)])
+    compression.train(session.get_bind(), samples=10)
+    repository.create(posting(10, 'Python'))
+    # Rows written before compression was enabled stay readable and get compressed in place
+    session.execute(text("UPDATE jobs SET description = 'Legacy Python posting stored as plain text, "
+                         "long enough to be worth compressing.' WHERE id = 1"))
+    session.commit()
+    assert compression.compress_stored(session.get_bind()) == 1
+
+    assert len(repository.search(keywords='python')) == 7  # five odd jobs, job 11 and the legacy row
+    repository.update(2, {'description': 'Now a Kotlin role. ' + BOILERPLATE})
+    assert [job.id for job in repository.search(keywords='kotlin')] == [2]
+    session.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('integrity-check')"))
+
+def test_short_and_missing_descriptions_stay_as_they_are():
+    assert compression.compress(None) is None
+    assert compression.compress('Short text') == 'Short text'
+    blob = compression.compress('x' * 200)
+    assert isinstance(blob, bytes) and compression.decompress(blob, {}) == 'x' * 200
+
+def test_newest_dictionary_is_looked_up_again_only_after_other_commits(tmp_path):
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    writer, trainer = create_engine(url, poolclass=StaticPool), create_engine(url)
+    Base.metadata.create_all(writer)
+    statements = []
+    writer.raw_connection().driver_connection.set_trace_callback(statements.append)
+
+    def dictionary_ids():
+        with writer.connect() as conn:
+            return conn.execute(text("SELECT DISTINCT hex(substr(description, 2, 4)) FROM jobs "
+                                     "WHERE id > 20")).scalars().all()
+
+    with writer.begin() as conn:
+        conn.execute(text("INSERT INTO jobs (title, company, description) VALUES ('Engineer', 'Acme', "
+                          "job_compress(:description))"),
+                     [{'description': description(i, 'Python')} for i in range(30)])
+    assert sum('max(id)' in statement for statement in statements) == 1
+
+    # A dictionary trained on another connection is used for the next rows
+    assert compression.train(trainer, samples=30) == 1
+    with writer.begin() as conn:
+        conn.execute(text("INSERT INTO jobs (title, company, description) VALUES ('Engineer', 'Acme', "
+                          "job_compress(:description))"),
+                     [{'description': description(i, 'Rust')} for i in range(5)])
+    assert sum('max(id)' in statement for statement in statements) == 2
+    assert sorted(dictionary_ids()) == ['00000000', '00000001']
+    trainer.dispose()
+    writer.dispose()
+
+def test_plain_sqlite3_connections_write_once_functions_are_registered(engine, tmp_path):
+    engine.dispose()
+    insert = "INSERT INTO jobs (title, company, description) VALUES ('Engineer', 'Acme', 'Kotlin services')"
+    conn = sqlite3.connect(tmp_path / 'jobs.db')
+    # The FTS triggers index the decompressed text
+    with pytest.raises(sqlite3.OperationalError, match='job_text'):
+        conn.execute(insert)
+    compression.register_functions(conn)
+    conn.execute(insert)
+    assert conn.execute("SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH 'kotlin'").fetchall() == [(1,)]
+    conn.close()
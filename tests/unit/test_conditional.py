@@ -0,0 +1,105 @@
+import pytest
+
+from app.database.cache_store import APPLICATIONS_VERSION, SQLiteCacheStore, bump_data_version
+from app.database.repository import JobRepository
+
+@pytest.fixture
+def app(engine, session, make_job, tmp_path):
+    from app.web import create_app
+    from config.config import Config
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = str(engine.url)
+        WEB_CACHE_PATH = str(tmp_path / 'web_cache.db')
+
+    JobRepository(session).upsert_many([make_job(i) for i in range(12)])
+    app = create_app(TestConfig)
+    app.config['TESTING'] = True
+    return app
+
+def test_api_jobs_answers_304_without_queries(app, monkeypatch, count_queries):
+    from app.database.database_init import db
+    from config.config import Config
+
+    monkeypatch.setattr(Config, 'CACHE_CONTROL_API_JOBS', 'max-age=5')
+    client = app.test_client()
+    with app.app_context():
+        first = client.get('/api/jobs?company=company 1')
+        etag = first.headers['ETag']
+        assert first.status_code == 200 and first.headers['Cache-Control'] == 'max-age=5'
+
+        with count_queries(db.engine) as statements:
+            again = client.get('/api/jobs?company=company 1', headers={'If-None-Match': etag})
+            # The same parameters in another order and spelling are the same page
+            reordered = client.get('/api/jobs?sort=posted_date&count=1&company=company 1',
+                                   headers={'If-None-Match': etag})
+        assert (again.status_code, reordered.status_code) == (304, 304) and statements == []
+        assert again.data == b'' and again.headers['ETag'] == etag and again.headers['Cache-Control'] == 'max-age=5'
+        assert client.get('/api/jobs?company=company 2', headers={'If-None-Match': etag}).status_code == 200
+
+        # New data, or a changed application status, changes every listing's ETag
+        store = SQLiteCacheStore(app.extensions['cache_store'].path)
+        bump_data_version(store)
+        fresh = client.get('/api/jobs?company=company 1', headers={'If-None-Match': etag})
+        assert fresh.status_code == 200 and fresh.headers['ETag'] != etag
+        modified = fresh.headers['Last-Modified']
+        assert client.get('/api/jobs?company=company 1', headers={'If-Modified-Since': modified}).status_code == 304
+
+        bump_data_version(store, APPLICATIONS_VERSION)
+        assert client.get('/api/jobs?company=company 1',
+                          headers={'If-None-Match': fresh.headers['ETag']}).status_code == 200
+
+def test_job_detail_is_validated_by_its_stamps(app, count_queries):
+    from app.database.database_init import db
+    from app.database.models import Job
+    from app.web.conditional import detail_validators
+
+    def etag(job_id):
+        with app.test_request_context(f'/jobs/{job_id}'):
+            stamps = JobRepository(db.session).detail_stamps(job_id)
+            return detail_validators(job_id, *stamps).etag
+
+    with app.app_context():
+        job_id = db.session.query(Job.id).order_by(Job.id).first()[0]
+        before = etag(job_id)
+        assert etag(job_id + 1) != before
+        with count_queries(db.engine) as statements:
+            response = app.test_client().get(f'/jobs/{job_id}', headers={'If-None-Match': f'"{before}"'})
+        # Only the stamp lookup ran, not the detail query
+        assert response.status_code == 304 and len(statements) == 1
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+        assert app.test_client().post(f'/jobs/{job_id}/status', data={'status': 'applied'}).status_code == 302
+        after = etag(job_id)
+        assert after != before
+        assert app.test_client().get(f'/jobs/{job_id}', headers={'If-None-Match': f'"{after}"'}).status_code == 304
+
+def test_job_detail_renders_in_one_query(app, monkeypatch, count_queries):
+    from app.database.database_init import db
+    from app.database.models import Job
+    from app.web import routes
+
+    rendered = []
+    monkeypatch.setattr(routes, 'render_template', lambda template, **context: rendered.append(context) or template)
+    with app.app_context():
+        job_id = db.session.query(Job.id).order_by(Job.id).first()[0]
+        with count_queries(db.engine) as statements:
+            response = app.test_client().get(f'/jobs/{job_id}')
+        assert response.status_code == 200 and len(statements) == 1
+        assert rendered[0]['job'].id == job_id and rendered[0]['next_job_id'] == job_id + 1
+        # Its ETag is the one a revalidation computes from the stamps
+        assert app.test_client().get(f'/jobs/{job_id}', headers={'If-None-Match': response.headers['ETag']})\
+            .status_code == 304
+
+def test_stale_job_index_sends_no_validators(app):
+    from app.database.job_index import JobIndex
+    from app.database.database_init import db
+
+    job_index = app.extensions['job_index'] = JobIndex(version=lambda: -1)
+    with app.app_context():
+        job_index.load(db.engine)
+        response = app.test_client().get('/api/jobs')
+        assert response.status_code == 200 and 'ETag' not in response.headers
+        job_index.version = lambda: 0
+        job_index.refresh(db.engine)
+        assert 'ETag' in app.test_client().get('/api/jobs').headers
@@ -5,6 +5,8 @@ from sqlalchemy.orm import sessionmaker
 
 from app.database.models import Base, Job, JobApplication
 from app.database.repository import JobRepository
+from app.database.queries import keyword_filter
+from config.config import Config
 
 @pytest.fixture
 def test_db():
@@ -133,4 +135,111 @@ def test_search_jobs(job_repository):
     assert len(remote_jobs) == 1
     
     full_time_jobs = job_repository.search(job_type='Full Time')
-    assert len(full_time_jobs) == 1
\ No newline at end of file
+    assert len(full_time_jobs) == 1
+
+def test_upsert_many(job_repository):
+    jobs_data = [
+        {
+            'title': 'Software Engineer',
+            'company': 'Tech Co',
+            'location': 'Austin, TX',
+            'url': 'https://www.linkedin.com/jobs/view/software-engineer-at-tech-co-101?refId=abc',
+            'source': 'LinkedIn'
+        },
+        {
+            'title': 'Backend Engineer',
+            'company': 'Software Inc',
+            'location': 'Remote',
+            'url': 'https://test.com/job/2?utm_source=feed',
+            'source': 'Test'
+        }
+    ]
+
+    counts = job_repository.upsert_many(jobs_data)
+    assert counts == {'inserted': 2, 'updated': 0, 'unchanged': 0}
+
+    # Same postings seen again with new tracking params, one with a changed title
+    rescraped = [
+        dict(jobs_data[0], url='https://www.linkedin.com/jobs/view/software-engineer-at-tech-co-101?trackingId=xyz'),
+        dict(jobs_data[1], title='Senior Backend Engineer', url='https://test.com/job/2/'),
+        dict(jobs_data[1], title='Senior Backend Engineer', url='https://test.com/job/2/')
+    ]
+    counts = job_repository.upsert_many(rescraped)
+    assert counts == {'inserted': 0, 'updated': 1, 'unchanged': 1}
+
+    jobs = job_repository.session.query(Job).order_by(Job.id).all()
+    assert [job.job_key for job in jobs] == ['linkedin:101', 'https://test.com/job/2']
+    assert jobs[1].title == 'Senior Backend Engineer'
+
+def test_keyword_filter_uses_fts(job_repository, monkeypatch):
+    # A lone job matches every keyword; keep it on the index anyway
+    monkeypatch.setattr(Config, 'KEYWORD_SCAN_DENSITY', 2.0)
+    job = job_repository.create({
+        'title': 'Python Developer',
+        'company': 'Tech Co',
+        'location': 'Austin, TX',
+        'description': 'Work on distributed systems',
+        'url': 'https://test.com/job/1',
+        'source': 'Test'
+    })
+
+    def search(keyword):
+        query = keyword_filter(job_repository.session.query(Job), keyword)
+        return [j.id for j in query]
+
+    assert search('pyth') == [job.id]
+    assert search('distributed system') == [job.id]
+    assert search('"distributed*') == [job.id]  # FTS syntax in user input is quoted away
+
+    job_repository.update(job.id, {'description': 'Work on compilers'})
+    assert search('distributed') == []
+    assert search('compilers') == [job.id]
+
+    job_repository.delete(job.id)
+    assert search('compilers') == []
+
+def test_common_keywords_scan_instead_of_using_fts(job_repository, monkeypatch):
+    job_repository.upsert_many([
+        {'title': 'Backend Engineer', 'company': 'Tech Co', 'url': f'https://test.com/job/{i}',
+         'description': 'Python services' + (' and Kotlin tooling' if i == 7 else '')}
+        for i in range(40)
+    ])
+
+    def search(keyword):
+        query = keyword_filter(job_repository.session.query(Job), keyword)
+        return 'jobs_fts' in str(query.statement), sorted(job.id for job in query)
+
+    assert search('kotlin') == (True, [8])
+    uses_fts, python_jobs = search('python')
+    assert not uses_fts and len(python_jobs) == 40
+    assert search('python kotlin') == (True, [8])
+    # Both ways of matching agree: word prefixes, not substrings
+    monkeypatch.setattr(Config, 'KEYWORD_SCAN_DENSITY', 2.0)
+    assert search('python') == (True, python_jobs)
+    assert search('end') == (True, [])
+    monkeypatch.setattr(Config, 'KEYWORD_SCAN_DENSITY', 0.0)
+    assert search('end') == (False, [])
+    assert search('kot') == (False, [8])
+    assert search('back serv') == (False, python_jobs)
+
+def test_job_statistics(job_repository):
+    job_repository.upsert_many([
+        {'title': 'Backend Engineer', 'company': 'A', 'location': 'Austin, TX, United States',
+         'salary': '$100K/yr - $140K/yr', 'job_type': 'Full-time', 'url': 'https://test.com/jobs/view/1'},
+        {'title': 'Java Developer', 'company': 'A', 'location': 'Dallas, TX',
+         'salary': '$60/hr', 'job_type': 'Contract', 'url': 'https://test.com/jobs/view/2'},
+        {'title': 'Software Engineer', 'company': 'B', 'location': 'Denver, CO',
+         'salary': '$120,000 - $160,000 a year', 'url': 'https://test.com/jobs/view/3'},
+    ])
+
+    stats = job_repository.get_job_statistics()
+
+    assert stats['total_jobs'] == 3
+    assert stats['unique_companies'] == 2
+    assert stats['unique_locations'] == 3
+    # Hourly salaries are left out of the yearly averages
+    assert stats['jobs_with_salary'] == 2
+    assert stats['avg_salary_min'] == 110000
+    assert stats['avg_salary_max'] == 150000
+    assert stats['job_types'] == {'Full-time': 1, 'Contract': 1, 'Unknown': 1}
+    assert stats['top_states'][0] == {'state': 'TX', 'count': 2}
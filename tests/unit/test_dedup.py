@@ -0,0 +1,80 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from app.database import archive, dedup
+from app.database.models import Job, JobSignature
+from app.database.queries import apply_job_filters
+from app.database.repository import JobRepository, StatsRepository
+
+DESCRIPTION = ("We are looking for a backend engineer to design, build and operate the Python services "
+               "behind our payments platform. You will own APIs end to end, from schema design to on-call, "
+               "and work closely with product and data teams on reliability and performance.")
+
+def posting(source, number, title='Senior Software Engineer', company='Acme', location='Austin, TX, United States',
+            description=DESCRIPTION, **extra):
+    return {'title': title, 'company': company, 'location': location, 'description': description,
+            'source': source, 'job_key': f'{source.lower()}:{number}', 'posted_date': extra.pop('posted_date', None), **extra}
+
+def listed(session):
+    return [job.job_key for job in apply_job_filters(session.query(Job)).order_by(Job.id)]
+
+def test_cross_source_postings_collapse_to_the_first_one(session):
+    repository = JobRepository(session)
+    repository.upsert_many([posting('LinkedIn', 1)])
+    repository.upsert_many([
+        # Same opening, reworded title and location on other boards
+        posting('Indeed', 1, title='Sr. Software Engineer', company='Acme, Inc.', location='Austin, Texas, United States'),
+        posting('Glassdoor', 1, title='Senior Software Engineer - Payments', description=DESCRIPTION + ' Hybrid.'),
+        # Different company, and a different opening at the same company
+        posting('Indeed', 2, company='Globex'),
+        posting('Indeed', 3, title='Senior Software Engineer, Search',
+                description='Build the relevance models and Java indexing pipeline for product search at scale.'),
+    ])
+
+    canonical = {job.job_key: job.canonical_id for job in session.query(Job)}
+    assert canonical == {'linkedin:1': None, 'indeed:1': 1, 'glassdoor:1': 1, 'indeed:2': None, 'indeed:3': None}
+    assert listed(session) == ['linkedin:1', 'indeed:2', 'indeed:3']
+    # Counted like the listing
+    counters = dict(session.execute(text(
+        "SELECT key, count FROM job_aggregates WHERE key IN ('us_software', 'us_software_duplicates')"
+    )).fetchall())
+    assert counters == {'us_software': 5, 'us_software_duplicates': 2}
+    assert StatsRepository(session).overview()['total_jobs'] == 3
+
+def test_same_source_postings_stay_separate(session):
+    # Two identical cards on one board are two openings; a duplicate in the same batch still links
+    JobRepository(session).upsert_many([posting('LinkedIn', 1), posting('LinkedIn', 2), posting('Indeed', 7)])
+    assert [job.canonical_id for job in session.query(Job).order_by(Job.id)] == [None, None, 1]
+
+def test_signatures_agree_with_the_shingle_similarity():
+    first = dedup.shingles(posting('LinkedIn', 1))
+    second = dedup.shingles(posting('Indeed', 1, description=DESCRIPTION.replace('payments', 'billing')))
+    jaccard = len(first & second) / len(first | second)
+    estimate = dedup.similarity(dedup.signature(first), dedup.signature(second))
+    assert abs(estimate - jaccard) < 0.15
+    assert dedup.signature({'t:engineer'}) is None
+
+def test_backfill_indexes_older_jobs_oldest_first(session):
+    session.add_all([Job(**posting(source, 1)) for source in ('Indeed', 'LinkedIn')])
+    session.commit()
+    assert dedup.backfill(session) == {'indexed': 2, 'duplicates': 1}
+    assert session.query(Job).filter_by(job_key='linkedin:1').one().canonical_id == 1
+    assert session.query(JobSignature).count() == 2
+    assert dedup.backfill(session) == {'indexed': 0, 'duplicates': 0}
+
+def test_archiving_the_canonical_job_promotes_a_duplicate(session):
+    old = datetime.utcnow() - timedelta(days=200)
+    JobRepository(session).upsert_many([
+        posting('LinkedIn', 1, posted_date=old),
+        posting('Indeed', 1),
+        posting('Glassdoor', 1),
+    ])
+    archive.archive_jobs(session.get_bind(), older_than_days=90)
+    session.expire_all()
+
+    assert {job.job_key: job.canonical_id for job in session.query(Job)} == {'indeed:1': None, 'glassdoor:1': 2}
+    assert session.query(JobSignature.job_id).order_by(JobSignature.job_id).all() == [(2,), (3,)]
+    # The archived posting no longer matches new ones
+    JobRepository(session).upsert_many([posting('Dice', 1)])
+    assert session.query(Job).filter_by(job_key='dice:1').one().canonical_id == 2
@@ -0,0 +1,55 @@
+import threading
+
+from app.database.db import Database
+from app.database.engine import get_engine, get_scoped_session, pool_status, MeteredQueuePool, \
+    sqlite_settings, maintain_sqlite
+from config.config import Config
+
+def test_engine_is_shared_per_uri(tmp_path):
+    db_path = str(tmp_path / 'jobs.db')
+    db_uri = f"sqlite:///{db_path}"
+
+    first = Database(db_uri=db_uri, db_path=db_path)
+    second = Database(db_uri=db_uri, db_path=db_path)
+
+    assert first.engine is second.engine
+    assert first.engine is get_engine(db_uri)
+    assert first.Session is get_scoped_session(db_uri)
+    assert isinstance(first.engine.pool, MeteredQueuePool)
+
+def test_pool_metrics_count_checkouts(tmp_path):
+    db_uri = f"sqlite:///{tmp_path / 'jobs.db'}"
+    engine = get_engine(db_uri)
+
+    def query():
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+
+    threads = [threading.Thread(target=query) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    status = pool_status(db_uri)
+    assert status['checkouts'] == 8
+    assert status['checkins'] == 8
+    assert status['checked_out'] == 0
+    assert status['max_checked_out'] >= 1
+
+def test_sqlite_profile_is_applied(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+
+    settings = sqlite_settings(engine)
+    assert settings['journal_mode'] == 'wal'
+    assert settings['auto_vacuum'] == 2  # INCREMENTAL, as the database is new
+    assert settings['synchronous'] == 1  # NORMAL
+    assert settings['temp_store'] == 2  # MEMORY
+    assert settings['busy_timeout'] == Config.SQLITE_BUSY_TIMEOUT
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        conn.exec_driver_sql("INSERT INTO t VALUES (1)")
+    result = maintain_sqlite(engine)
+    assert not result['busy']
+    assert result['wal_pages'] == 0  # TRUNCATE empties the log
@@ -0,0 +1,34 @@
+from app.database.fields import parse_salary, parse_location, normalize_job_type
+
+def test_parse_salary():
+    test_cases = [
+        ("$120,000.00/yr - $150,000.00/yr", (120000.0, 150000.0, 'year')),
+        ("$80K - $100K", (80000.0, 100000.0, 'year')),
+        ("$50/hr - $70/hr", (50.0, 70.0, 'hour')),
+        ("$30 an hour", (30.0, 30.0, 'hour')),
+        ("$8,000/month", (8000.0, 8000.0, 'month')),
+        ("Competitive", (None, None, None)),
+        (None, (None, None, None))
+    ]
+
+    for input_text, expected in test_cases:
+        assert parse_salary(input_text) == expected
+
+def test_parse_location():
+    test_cases = [
+        ("Austin, TX, United States", ('Austin', 'TX')),
+        ("Seattle, Washington", ('Seattle', 'WA')),
+        ("California, United States", (None, 'CA')),
+        ("Remote", (None, None)),
+        ("Toronto, Ontario, Canada", ('Toronto', None)),
+        (None, (None, None))
+    ]
+
+    for input_text, expected in test_cases:
+        assert parse_location(input_text) == expected
+
+def test_normalize_job_type():
+    assert normalize_job_type('Full Time') == 'Full-time'
+    assert normalize_job_type('Seasonal') == 'Other'
+    assert normalize_job_type(None, 'Software Engineer Intern') == 'Internship'
+    assert normalize_job_type(None, 'Internal Tools Engineer') is None
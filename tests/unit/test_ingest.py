@@ -0,0 +1,105 @@
+import os
+import threading
+import pytest
+from sqlalchemy.orm import sessionmaker, scoped_session
+
+from app.database.models import Job
+from app.database.ingest import IngestQueue
+
+@pytest.fixture
+def Session(engine):
+    registry = scoped_session(sessionmaker(bind=engine))
+    yield registry
+    registry.remove()
+
+def test_writer_batches_and_counts(Session, make_job, tmp_path):
+    ingest = IngestQueue(Session, batch_size=10, flush_interval=0.05,
+                         spill_path=str(tmp_path / 'spill.jsonl'))
+    ingest.start()
+    ingest.put_many([make_job(i) for i in range(25)], tag='run')
+    ingest.put(make_job(0), tag='run')
+    ingest.flush()
+
+    assert ingest.counts('run') == {'inserted': 25, 'updated': 0, 'unchanged': 1}
+    assert ingest.get_stats()['batches'] >= 3
+    ingest.stop()
+    assert Session().query(Job).count() == 25
+
+def test_overflow_spills_and_replays_on_drain(Session, make_job, tmp_path):
+    spill_path = str(tmp_path / 'spill.jsonl')
+    ingest = IngestQueue(Session, batch_size=5, flush_interval=0.05, max_queue=3,
+                         put_timeout=0, spill_path=spill_path)
+
+    # Writer not running yet, so everything past the queue bound goes to disk
+    ingest.put_many([make_job(i) for i in range(10)], tag='run')
+    assert ingest.get_stats()['spilled'] == 7
+    assert os.path.exists(spill_path)
+
+    ingest.start()
+    ingest.stop()
+
+    assert not os.path.exists(spill_path)
+    assert ingest.get_stats()['replayed'] == 7
+    assert Session().query(Job).count() == 10
+
+def test_flush_writes_jobs_spilled_while_writing(Session, make_job, tmp_path):
+    ingest = IngestQueue(Session, batch_size=1, flush_interval=0.01, max_queue=1,
+                         put_timeout=0, spill_path=str(tmp_path / 'spill.jsonl'))
+    writing, release = threading.Event(), threading.Event()
+    write = ingest._write
+    ingest._write = lambda batch: (writing.set(), release.wait(), write(batch))
+    ingest.start()
+    ingest.put(make_job(0), tag='run')
+    writing.wait(5)
+    # The writer is busy and the queue is full, so these go to the spill file
+    ingest.put_many([make_job(i) for i in range(1, 5)], tag='run')
+    assert ingest.get_stats()['spilled'] >= 3
+
+    release.set()
+    ingest.flush()
+    assert ingest.counts('run')['inserted'] == 5
+    assert Session().query(Job).count() == 5
+    ingest.stop()
+
+def test_session_errors_spill_without_stalling_flush(Session, make_job, tmp_path):
+    def session_factory():
+        if not session_factory.failed:
+            session_factory.failed = True
+            raise ConnectionError('database is locked')
+        return Session()
+    session_factory.failed = False
+    ingest = IngestQueue(session_factory, batch_size=10, flush_interval=0.01,
+                         spill_path=str(tmp_path / 'spill.jsonl'))
+    ingest.start()
+    ingest.put_many([make_job(i) for i in range(3)], tag='run')
+
+    flushed = threading.Thread(target=ingest.flush, daemon=True)
+    flushed.start()
+    flushed.join(5)
+    assert not flushed.is_alive()
+    assert ingest._thread.is_alive()
+    assert ingest.get_stats()['errors'] == 1
+    assert ingest.counts('run')['inserted'] == 3
+    ingest.stop()
+
+def test_stop_timeout_keeps_the_draining_writer(Session, make_job, tmp_path):
+    ingest = IngestQueue(Session, batch_size=1, flush_interval=0.01, spill_path=str(tmp_path / 'spill.jsonl'))
+    release = threading.Event()
+    write = ingest._write
+    ingest._write = lambda batch: (release.wait(), write(batch))
+    ingest.start()
+    ingest.put(make_job(1))
+
+    assert ingest.stop(timeout=0.05) is False
+    writer = ingest._thread
+    ingest.start()
+    # Still the one writer: a second would race it on the queue and spill file
+    assert ingest._thread is writer and writer.is_alive()
+
+    release.set()
+    assert ingest.stop(timeout=5) is True
+    assert ingest._thread is None and Session().query(Job).count() == 1
+    ingest.start()
+    ingest.put(make_job(2))
+    ingest.flush()
+    assert ingest.stop(timeout=5) is True and Session().query(Job).count() == 2
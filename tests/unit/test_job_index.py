@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, event, update
+from sqlalchemy.orm import sessionmaker
+
+from app.database.job_index import JobIndex
+from app.database.models import Job
+from app.database.pagination import keyset_page
+from app.database.queries import apply_job_filters
+from app.database.repository import JobRepository
+
+COMPANIES = ['Acme, Inc.', 'Globex', 'Initech LLC', 'Umbrella', 'Hooli']
+LOCATIONS = ['Austin, TX, United States', 'Seattle, WA, United States', 'New York, NY, United States',
+             'Remote, United States']
+
+@pytest.fixture
+def posting(make_job):
+    def posting(i, **overrides):
+        job = {'title': ['Software Engineer', 'Backend Engineer', 'Full Stack Developer'][i % 3],
+               'company': COMPANIES[i % len(COMPANIES)], 'location': LOCATIONS[i % len(LOCATIONS)],
+               # Every date is shared by three postings, so ids break the ties
+               'posted_date': datetime(2026, 10, 1) - timedelta(hours=i // 3)}
+        job.update(overrides)
+        return make_job(i, **job)
+    return posting
+
+@pytest.fixture
+def engine(engine, session, posting):
+    JobRepository(session).upsert_many([posting(i) for i in range(60)] + [
+        posting(60, title='Registered Nurse'),
+        posting(61, location='London, United Kingdom'),
+    ])
+    return engine
+
+def walk(fetch):
+    """Every page forwards, then back again from the last one: [(ids, next?, prev?)]"""
+    pages, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        pages.append(([job.id for job in page.items], page.has_next, page.has_prev))
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+    while page.prev_cursor:
+        page = fetch(page.prev_cursor)
+        pages.append(([job.id for job in page.items], page.has_next, page.has_prev))
+    return pages
+
+@pytest.mark.parametrize('sort', ['posted_date', 'company', 'title'])
+@pytest.mark.parametrize('filters', [{}, {'company': 'acme'}, {'location': 'tx'},
+                                     {'company': 'globex', 'location': 'seattle'}, {'company': 'nobody'}])
+def test_pages_match_sql(engine, session, sort, filters):
+    index = JobIndex()
+    assert index.load(engine) == 60
+    query = apply_job_filters(session.query(Job), **filters)
+
+    expected = walk(lambda cursor: keyset_page(query, sort, cursor, 7))
+    assert walk(lambda cursor: index.page(sort, cursor, 7, **filters)) == expected
+    # Cursors are interchangeable with the SQL path
+    cursor = keyset_page(query, sort, None, 7).next_cursor
+    if cursor:
+        first = index.page(sort, cursor, 7, **filters).items[0]
+        assert first.to_dict() == session.get(Job, first.id).to_dict()
+
+def test_suffix_only_company_is_left_to_sql(engine):
+    index = JobIndex()
+    index.load(engine)
+    assert index.page('posted_date', None, 7, company='Inc') is None
+
+def test_refresh_applies_changes(engine, session, posting):
+    index = JobIndex()
+    index.load(engine)
+    repository = JobRepository(session)
+    repository.upsert_many([posting(100, posted_date=datetime(2026, 11, 1)),
+                            posting(5, title='Principal Software Engineer')])
+    session.execute(update(Job).where(Job.id == 8).values(location='London, United Kingdom', is_us=False))
+    session.commit()
+
+    result = index.refresh(engine)
+    assert result['reloaded'] == 0 and result['changed'] == 3
+    assert len(index) == 60
+    first = index.page('posted_date', None, 5).items
+    assert first[0].url.endswith('/100') and first[0].posted_date == datetime(2026, 11, 1)
+    titles = {job.id: job.title for job in index.page('title', None, 100).items}
+    assert titles[6] == 'Principal Software Engineer' and 8 not in titles
+    # Unchanged rows seen again stay in the main segment
+    assert index.refresh(engine)['changed'] == 0
+
+    # Deleted rows (archiving) rebuild the index
+    session.execute(delete(Job).where(Job.id <= 10))
+    session.commit()
+    assert index.refresh(engine)['reloaded'] == 1
+    assert len(index) == 51
+
+def test_refresh_sees_deletions_offset_by_inserts(engine, session, posting):
+    index = JobIndex()
+    index.load(engine)
+    session.execute(delete(Job).where(Job.id <= 3))
+    session.commit()
+
+    # As many jobs are committed by the ingest queue while the refresh runs, so the table's total is unchanged
+    def ingest(conn, cursor, statement, parameters, context, executemany):
+        if 'count(' in statement and not ingest.done:
+            ingest.done = True
+            JobRepository(sessionmaker(bind=engine)()).upsert_many([posting(i) for i in range(200, 203)])
+    ingest.done = False
+    event.listen(engine, 'before_cursor_execute', ingest)
+    try:
+        assert index.refresh(engine)['reloaded'] == 1
+    finally:
+        event.remove(engine, 'before_cursor_execute', ingest)
+    assert 1 not in {job.id for job in index.page('posted_date', None, 100).items}
+
+def test_web_listing_is_served_from_the_index(engine, count_queries):
+    from app.web import create_app
+    from app.database.database_init import db
+    from config.config import Config
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = str(engine.url)
+        JOB_INDEX = True
+        JOB_INDEX_REFRESH = 0
+
+    app = create_app(TestConfig)
+    # The index loads in the background
+    assert app.extensions['job_index'].wait(10)
+    client = app.test_client()
+
+    with app.app_context():
+        with count_queries(db.engine) as statements:
+            response = client.get('/api/jobs?count=0&company=acme&per_page=5').get_json()
+        assert len(response['jobs']) == 5 and {job['company'] for job in response['jobs']} == {'Acme, Inc.'}
+        # Only the application statuses were read from the database
+        assert len(statements) == 1 and 'job_applications' in statements[0]
+
+        with count_queries(db.engine) as statements:
+            client.get('/api/jobs?count=0&keyword=backend')
+        assert any('jobs_fts' in statement for statement in statements)
+    app.extensions['job_index'].stop()
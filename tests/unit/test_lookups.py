@@ -0,0 +1,67 @@
+from sqlalchemy import text
+
+from app.database import lookups
+from app.database.models import Job, Company, Location
+from app.database.queries import apply_job_filters
+from app.database.repository import JobRepository, StatsRepository
+
+def test_spellings_share_one_company_and_location(session, make_job):
+    JobRepository(session).upsert_many([
+        make_job(1, company='Acme, Inc.'),
+        make_job(2, company='ACME', location='Austin, Texas'),
+        make_job(3, company='Acme Corporation', location='austin, tx'),
+        make_job(4, company='Globex', location='Remote'),
+    ])
+    jobs = session.query(Job).order_by(Job.id).all()
+    assert len({job.company_id for job in jobs[:3]}) == 1
+    assert jobs[3].company_id != jobs[0].company_id
+    assert len({job.location_id for job in jobs[:3]}) == 1
+    # The text is kept as scraped
+    assert [job.company for job in jobs[:2]] == ['Acme, Inc.', 'ACME']
+    assert session.query(Company).count() == 2
+    assert [(row.key, row.name, row.state) for row in session.query(Location).order_by(Location.id)] == \
+        [('austin|TX', 'Austin, TX', 'TX'), ('remote', 'Remote', None)]
+
+def test_orm_writes_are_encoded(session, make_job):
+    job = Job(**make_job(1, company='Initech LLC'))
+    session.add(job)
+    session.commit()
+    assert session.get(Company, job.company_id).name == 'Initech LLC'
+    job.company = 'Initrode'
+    session.commit()
+    assert session.get(Company, job.company_id).name == 'Initrode'
+
+def test_company_filter_matches_any_spelling(session, make_job):
+    repository = JobRepository(session)
+    repository.upsert_many([make_job(1, company='Acme, Inc.'), make_job(2, company='Globex')])
+    assert [job.company for job in repository.search(company='acme inc')] == ['Acme, Inc.']
+    assert [job.company for job in apply_job_filters(session.query(Job), company='ACME')] == ['Acme, Inc.']
+
+def test_suffix_only_company_filter_matches_the_text(session, make_job):
+    repository = JobRepository(session)
+    repository.upsert_many([make_job(1, company='Acme, Inc.'), make_job(2, company='Globex LLC'),
+                            make_job(3, company='Initech')])
+    assert [job.company for job in repository.search(company='Inc')] == ['Acme, Inc.']
+    assert [job.company for job in apply_job_filters(session.query(Job), company='LLC')] == ['Globex LLC']
+
+def test_alias_merges_companies_and_counters(session, make_job):
+    JobRepository(session).upsert_many([make_job(1, company='Facebook'), make_job(2, company='Meta, Inc.'),
+                                        make_job(3, company='Meta')])
+    stats = StatsRepository(session)
+    assert stats.overview()['total_companies'] == 2
+
+    assert lookups.add_alias(session.connection(), 'Facebook', 'Meta') == 1
+    session.commit()
+    assert stats.overview()['total_companies'] == 1
+    assert stats.breakdown()['top_companies'] == {'Meta, Inc.': 3}
+    # New postings under the alias land on the same company
+    JobRepository(session).upsert_many([make_job(4, company='Facebook, Inc.')])
+    assert len({job.company_id for job in session.query(Job)}) == 1
+
+def test_backfill_encodes_older_rows(session, make_job):
+    JobRepository(session).upsert_many([make_job(1, company='Acme'),
+                                        make_job(2, company='Globex', location='Denver, CO')])
+    session.execute(text("UPDATE jobs SET company_id = NULL, location_id = NULL"))
+    assert lookups.backfill(session.connection(), batch_size=1) == {'updated': 2}
+    assert session.query(Job).filter(Job.company_id.is_(None) | Job.location_id.is_(None)).count() == 0
+    assert session.query(Company).count() == 2
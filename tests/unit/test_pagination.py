@@ -0,0 +1,61 @@
+import pytest
+from datetime import datetime, timedelta
+
+from app.database.models import Job
+from app.database.pagination import keyset_page, capped_count, encode_cursor, InvalidCursor
+from app.database.queries import apply_job_filters
+
+@pytest.fixture
+def session(session):
+    now = datetime(2026, 1, 1)
+    # Repeated dates and companies so the id tie-breaker matters
+    session.add_all([
+        Job(title=f'Software Engineer {i % 7}', company=f'Company {i % 5}', location='Austin, TX, United States',
+            posted_date=now - timedelta(days=i // 3), is_us=True, role_family='software')
+        for i in range(47)
+    ])
+    session.commit()
+    return session
+
+def walk(query, sort, per_page):
+    ids, cursor = [], None
+    while True:
+        page = keyset_page(query, sort, cursor, per_page)
+        ids.extend(job.id for job in page.items)
+        if not page.has_next:
+            return ids, page
+        cursor = page.next_cursor
+
+@pytest.mark.parametrize('sort, order', [
+    ('posted_date', lambda job: (-job.posted_date.timestamp(), -job.id)),
+    ('company', lambda job: (job.company, job.id)),
+    ('title', lambda job: (job.title, job.id)),
+])
+def test_pages_cover_the_listing_in_order(session, sort, order):
+    query = apply_job_filters(session.query(Job))
+    expected = [job.id for job in sorted(query.all(), key=order)]
+
+    ids, last = walk(query, sort, per_page=10)
+    assert ids == expected
+
+    # Walking back from the last page returns the previous pages in order
+    back = keyset_page(query, sort, last.prev_cursor, 10)
+    assert [job.id for job in back.items] == expected[30:40]
+    assert back.has_next and back.has_prev
+
+def test_first_page_has_no_prev(session):
+    page = keyset_page(apply_job_filters(session.query(Job)), 'posted_date', None, 10)
+    assert not page.has_prev
+    assert len(page.items) == 10
+
+def test_cursor_is_tied_to_its_sort(session):
+    cursor = encode_cursor('company', 'next', ['Company 1', 3])
+    with pytest.raises(InvalidCursor):
+        keyset_page(session.query(Job), 'posted_date', cursor, 10)
+    with pytest.raises(InvalidCursor):
+        keyset_page(session.query(Job), 'posted_date', 'not-a-cursor', 10)
+
+def test_capped_count(session):
+    query = apply_job_filters(session.query(Job))
+    assert capped_count(query, 100) == (47, False)
+    assert capped_count(query, 20) == (20, True)
@@ -0,0 +1,78 @@
+import pytest
+
+from app.database.models import Job, JobApplication
+from app.database.repository import JobRepository, JobApplicationRepository
+
+@pytest.fixture
+def session(session):
+    session.add_all([Job(title=f'Software Engineer {i}', company='Acme', url=f'https://x.com/{i}') for i in range(10)])
+    session.flush()
+    session.add_all([JobApplication(job_id=2, status='applied'), JobApplication(job_id=5, status='viewed')])
+    session.commit()
+    session.expunge_all()
+    return session
+
+def test_job_detail_is_one_query(session, count_queries):
+    with count_queries(session.bind) as statements:
+        detail = JobRepository(session).get_detail(5)
+        # Everything the detail template reads is already loaded
+        assert (detail['job'].title, detail['application'].status) == ('Software Engineer 4', 'viewed')
+        assert detail['job'].description is None
+        assert (detail['prev_id'], detail['next_id']) == (4, 6)
+        assert detail['stamps'] == (detail['job'].updated_at, detail['application'].updated_at)
+    assert len(statements) == 1
+
+def test_job_detail_edges(session):
+    repository = JobRepository(session)
+    first, last = repository.get_detail(1), repository.get_detail(10)
+    assert first['prev_id'] is None and first['application'] is None
+    assert last['next_id'] is None
+    assert repository.get_detail(99) is None
+
+@pytest.mark.parametrize('page_size', [1, 10])
+def test_statuses_are_batch_loaded(session, page_size, count_queries):
+    job_ids = list(range(1, page_size + 1))
+    with count_queries(session.bind) as statements:
+        statuses = JobApplicationRepository(session).statuses_for(job_ids)
+    assert len(statements) == 1
+    assert statuses == {job_id: status for job_id, status in {2: 'applied', 5: 'viewed'}.items() if job_id in job_ids}
+
+@pytest.fixture
+def app(engine):
+    from app.web import create_app
+    from app.database.database_init import db
+    from config.config import Config
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = str(engine.url)
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.session.add_all([Job(title=f'Software Engineer {i}', company='Acme', location='Austin, TX, United States',
+                                is_us=True, role_family='software') for i in range(30)])
+        db.session.commit()
+    return app
+
+def test_api_jobs_query_count(app, count_queries):
+    from app.database.database_init import db
+
+    with app.app_context():
+        client = app.test_client()
+        # One query for the page and one for its application statuses, however many jobs it has
+        for per_page in (5, 25):
+            with count_queries(db.engine) as statements:
+                response = client.get(f'/api/jobs?count=0&per_page={per_page}')
+            assert len(response.get_json()['jobs']) == per_page
+            assert len(statements) == 2
+
+def test_keyword_path_is_probed_once(app, count_queries):
+    from app.database.database_init import db
+
+    with app.app_context():
+        client = app.test_client()
+        # The page and the total share one decision, and later pages reuse it
+        with count_queries(db.engine) as statements:
+            first = client.get('/api/jobs?keyword=soft&per_page=5').get_json()
+            client.get(f"/api/jobs?keyword=soft&per_page=5&cursor={first['next_cursor']}")
+        assert first['total'] == 30
+        assert len([statement for statement in statements if 'rowid > ' in statement]) == 1
@@ -0,0 +1,7 @@
+from app.database.query_plan import check_web_query_plans
+
+def test_web_queries_use_indexes(session):
+    results = check_web_query_plans(session)
+
+    failures = {name: result['plan'] for name, result in results.items() if not result['ok']}
+    assert not failures
@@ -0,0 +1,56 @@
+import time
+import pytest
+from multiprocessing import Process
+
+from app.scraper.rate_limiter import (
+    GlobalRateLimiter,
+    MemoryRateLimitBackend,
+    SQLiteRateLimitBackend
+)
+
+def _spend(path, site, count):
+    backend = SQLiteRateLimitBackend(path, window_seconds=3600)
+    for _ in range(count):
+        backend.try_acquire({site: 10})
+
+@pytest.fixture
+def limiter(tmp_path):
+    limiter = GlobalRateLimiter()
+    limiter.initialize(SQLiteRateLimitBackend(str(tmp_path / 'limits.db'), window_seconds=3600))
+    yield limiter
+    limiter.initialize(MemoryRateLimitBackend(3600))
+
+def test_site_bucket_is_exhausted(limiter):
+    for _ in range(limiter.site_limit):
+        assert limiter.can_make_request('TestSite')
+        assert limiter.try_acquire('TestSite')
+
+    assert not limiter.can_make_request('TestSite')
+    assert not limiter.try_acquire('TestSite')
+    assert limiter.can_make_request('OtherSite')
+
+    stats = limiter.get_stats()
+    assert stats['total_requests'] == limiter.site_limit
+    assert stats['requests_per_site'] == {'TestSite': limiter.site_limit}
+    assert stats['backend'] == 'sqlite'
+
+def test_bucket_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / 'limits.db')
+    workers = [Process(target=_spend, args=(path, 'TestSite', 4)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    backend = SQLiteRateLimitBackend(path, window_seconds=3600)
+    # 12 attempts against a bucket of 10: the last two are refused, never overdrawn
+    assert backend.request_counts() == {'TestSite': 10}
+    assert 0 <= backend.available({'TestSite': 10})['TestSite'] < 1
+
+def test_bucket_refills_over_window(tmp_path):
+    backend = MemoryRateLimitBackend(window_seconds=0.1)
+    backend.consume({'TestSite': 1})
+    assert backend.available({'TestSite': 1})['TestSite'] < 1
+
+    time.sleep(0.15)
+    assert backend.available({'TestSite': 1})['TestSite'] == 1
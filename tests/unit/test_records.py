@@ -0,0 +1,50 @@
+from bs4 import BeautifulSoup
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Job
+from app.database.records import JobRecord
+from app.database.repository import JobRepository
+from app.scraper.linkedin_scraper import LinkedInScraper
+
+CARD = """
+<div class="base-card">
+  <a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/backend-engineer-at-acme-123?trk=x"></a>
+  <h3 class="base-search-card__title"> Backend Engineer </h3>
+  <h4 class="base-search-card__subtitle"> Acme </h4>
+  <span class="job-search-card__location">Austin, TX, United States</span>
+  <span class="job-search-card__salary-info">$150K/yr - $180K/yr</span>
+  <time class="job-search-card__listdate" datetime="2026-10-18">1 day ago</time>
+</div>
+"""
+
+def test_repeated_strings_are_shared():
+    first = JobRecord(title='Engineer', company=''.join(['Ac', 'me']), location=' '.join(['Austin,', 'TX']),
+                      source=''.join(['Linked', 'In']))
+    second = JobRecord(title='Engineer', company='Acme', location='Austin, TX', source='LinkedIn')
+    assert first.company is second.company and first.location is second.location and first.source is second.source
+    assert not hasattr(first, '__dict__')
+    assert first.get('url') is None and first.get('salary', '') == ''
+    assert first.to_dict() == {'title': 'Engineer', 'company': 'Acme', 'location': 'Austin, TX', 'source': 'LinkedIn'}
+
+def test_card_parses_into_a_record():
+    scraper = LinkedInScraper.__new__(LinkedInScraper)
+    scraper.site_name, scraper.driver = 'LinkedIn', None
+    record = scraper._parse_job_card(BeautifulSoup(CARD, 'html.parser').div)
+    assert record == JobRecord(title='Backend Engineer', company='Acme', location='Austin, TX, United States',
+                               url='https://www.linkedin.com/jobs/view/backend-engineer-at-acme-123?trk=x',
+                               source='LinkedIn', posted_date='2026-10-18', salary='$150K/yr - $180K/yr')
+
+def test_records_and_dicts_store_the_same_rows(make_job):
+    stored = []
+    for make in (JobRecord, dict):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        jobs = [make(**make_job(i, company='Acme', posted_date='2026-10-18', salary='$150K/yr')) for i in range(3)]
+        jobs.append(make(**make_job(0, title='Senior Software Engineer', company='Acme', posted_date='2026-10-18')))
+        assert JobRepository(session).upsert_many(jobs) == {'inserted': 3, 'updated': 0, 'unchanged': 0}
+        stored.append([job.to_dict() for job in session.query(Job).order_by(Job.id)])
+        session.close()
+    assert stored[0] == stored[1]
+    assert stored[0][0]['title'] == 'Senior Software Engineer' and stored[0][1]['salary_period'] == 'year'
@@ -0,0 +1,68 @@
+import pytest
+
+from app.database.repository import RunHistoryRepository
+from app.scraper.metrics import ScrapeMetrics, percentile
+
+@pytest.fixture
+def history(session):
+    return RunHistoryRepository(session)
+
+def test_percentile():
+    values = [0.1 * i for i in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(5.0)
+    assert percentile(values, 95) == pytest.approx(9.5)
+    assert percentile([], 50) is None
+
+def test_run_is_recorded_with_sources(history):
+    metrics = ScrapeMetrics()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        metrics.record_request(seconds)
+    metrics.pages_fetched = 2
+    metrics.cards_parsed = 40
+
+    run = history.start_run()
+    history.record_source(run, {
+        'source': 'LinkedIn',
+        'query': 'software engineer',
+        'started_at': run.started_at,
+        'new_jobs': 10,
+        'duplicate_jobs': 30,
+        **metrics.to_dict()
+    })
+    history.finish_run(run, {'status': 'success', 'new_jobs': 10, **metrics.to_dict()})
+
+    latest = history.latest_run().to_dict()
+    assert latest['status'] == 'success'
+    assert latest['finished_at'] is not None
+    assert latest['p50_latency_ms'] == 200.0
+    assert latest['sources'][0]['cards_parsed'] == 40
+
+def test_efficiency_trend(history):
+    for new_jobs in (5, 15):
+        run = history.start_run()
+        history.record_source(run, {
+            'source': 'LinkedIn',
+            'started_at': run.started_at,
+            'requests': 20,
+            'new_jobs': new_jobs
+        })
+
+    trend = history.efficiency_trend(days=30)
+    assert len(trend) == 1
+    assert trend[0]['runs'] == 2
+    assert trend[0]['requests'] == 40
+    assert trend[0]['requests_per_new_job'] == 2.0
+    assert history.efficiency_trend(days=30, source='Indeed') == []
+
+def test_recent_runs_load_sources_in_one_query(history, count_queries):
+    for _ in range(3):
+        run = history.start_run()
+        for source in ('LinkedIn', 'Indeed'):
+            history.record_source(run, {'source': source, 'started_at': run.started_at, 'new_jobs': 1})
+        history.finish_run(run, {'status': 'success'})
+    history.session.expunge_all()
+
+    with count_queries(history.session.bind) as statements:
+        runs = [run.to_dict() for run in history.recent_runs()]
+    assert [len(run['sources']) for run in runs] == [2, 2, 2]
+    assert len(statements) == 2
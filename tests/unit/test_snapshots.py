@@ -0,0 +1,79 @@
+import os
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.database import snapshots
+from app.database.repository import JobRepository
+
+@pytest.fixture
+def live(engine, session, make_job):
+    JobRepository(session).upsert_many([make_job(i, company='Acme') for i in range(3)])
+    return engine.url.database, session
+
+def test_publish_swaps_in_an_analyzed_read_only_copy(live, tmp_path):
+    path, session = live
+    directory = str(tmp_path / 'snapshots')
+    first = snapshots.publish(path, directory, keep=2)
+    assert snapshots.current_snapshot(directory) == os.path.join(directory, first['name'])
+
+    engine = snapshots.snapshot_engine(snapshots.current_snapshot(directory))
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM jobs")).scalar() == 3
+        assert conn.execute(text("SELECT count(*) FROM sqlite_stat1")).scalar() > 0
+        with pytest.raises(OperationalError):
+            conn.execute(text("DELETE FROM jobs"))
+    engine.dispose()
+
+    for _ in range(2):
+        latest = snapshots.publish(path, directory, keep=2)
+    assert snapshots.list_snapshots(directory)[-1] == latest['name']
+    assert len(snapshots.list_snapshots(directory)) == 2
+    assert not any(name.endswith('.tmp') for name in os.listdir(directory))
+
+def test_reader_switches_to_the_newest_snapshot(live, make_job, tmp_path):
+    path, session = live
+    directory = str(tmp_path / 'snapshots')
+    reader = snapshots.SnapshotReader(directory)
+    assert reader.engine() is None
+
+    snapshots.publish(path, directory)
+    first = reader.engine()
+    assert reader.engine() is first
+    JobRepository(session).upsert_many([make_job(3, company='Acme')])
+    snapshots.publish(path, directory)
+    with reader.engine().connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM jobs")).scalar() == 4
+    assert reader.engine() is not first
+    reader.dispose()
+
+def test_web_reads_come_from_the_snapshot(live, make_job, tmp_path):
+    from app.web import create_app
+    from config.config import Config
+
+    path, session = live
+    directory = str(tmp_path / 'snapshots')
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        WEB_SNAPSHOTS = True
+        SNAPSHOT_DIRECTORY = directory
+
+    app = create_app(TestConfig)
+    client = app.test_client()
+    # Until a snapshot exists, reads go to the live database
+    assert len(client.get('/api/jobs?count=0').get_json()['jobs']) == 3
+
+    snapshots.publish(path, directory)
+    JobRepository(session).upsert_many([make_job(3, company='Acme')])
+    assert len(client.get('/api/jobs?count=0').get_json()['jobs']) == 3
+
+    # Applications are written and read live, so a status shows up before the next snapshot
+    response = client.post('/jobs/1/status', data={'status': 'applied'})
+    assert response.status_code == 302
+    statuses = {job['id']: job['application_status'] for job in client.get('/api/jobs?count=0').get_json()['jobs']}
+    assert statuses[1] == 'applied'
+
+    snapshots.publish(path, directory)
+    assert len(client.get('/api/jobs?count=0').get_json()['jobs']) == 4
+    app.extensions['snapshots'].dispose()
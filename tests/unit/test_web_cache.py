@@ -0,0 +1,253 @@
+import fnmatch
+import threading
+import time
+from datetime import datetime
+from multiprocessing import Process
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.database.cache_store import (APPLICATIONS_VERSION, DATA_MODIFIED, DATA_VERSION, RedisCacheStore,
+                                      SQLiteCacheStore, bump_data_version, data_state)
+from app.database.ingest import IngestQueue
+from app.database.repository import JobRepository
+from app.web.cache import Cache, SharedCache, approximate_size, cached
+
+class LocalRedis:
+    """Stand-in for a redis-py client: the commands the store uses, in process memory"""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def _live(self, key):
+        if self.down:
+            raise ConnectionError('Connection refused')
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def get(self, key):
+        return self._live(key)
+
+    def mget(self, keys):
+        return [self._live(key) for key in keys]
+
+    def set(self, key, value, px=None):
+        self._live(key)
+        self.data[key] = (value, time.monotonic() + px / 1000 if px else None)
+
+    def delete(self, key):
+        self.data.pop(key.decode() if isinstance(key, bytes) else key, None)
+
+    def incr(self, key):
+        value = int(self._live(key) or 0) + 1
+        self.data[key] = (str(value).encode(), None)
+        return value
+
+    def scan_iter(self, match='*'):
+        return [key.encode() for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+    def pipeline(self):
+        client, calls = self, []
+
+        class Pipeline:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(client, name)(*args, **kwargs) for name, args, kwargs in calls]
+        return Pipeline()
+
+def test_lru_eviction_and_ttl():
+    cache = Cache(max_entries=3, stripes=1)
+    for key in 'abc':
+        cache.set(key, key.upper())
+    assert cache.get('a') == 'A'  # now most recently used
+    cache.set('d', 'D')
+    assert cache.get('b') is None and [cache.get(key) for key in 'acd'] == ['A', 'C', 'D']
+
+    cache.set('e', 'E', ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert cache.get('e', 'gone') == 'gone'
+    stats = cache.stats()
+    assert (stats['entries'], stats['evictions'], stats['expirations']) == (2, 2, 1)
+    assert (stats['hits'], stats['misses']) == (4, 2)
+
+def test_memory_bound():
+    row = {'title': 'Software Engineer', 'company': 'Acme', 'description': 'x' * 1000}
+    size = approximate_size(row)
+    cache = Cache(max_entries=100, max_bytes=size * 5, stripes=1)
+    for i in range(20):
+        cache.set(i, dict(row))
+    stats = cache.stats()
+    assert stats['entries'] == 5 and stats['bytes'] <= size * 5 and stats['evictions'] == 15
+    # Bigger than the whole stripe: not stored, and nothing else is pushed out for it
+    cache.set('big', [row] * 10 + ['y' * size * 5])
+    assert cache.get('big') is None and len(cache) == 5 and cache.stats()['oversized'] == 1
+
+def test_none_results_are_cached():
+    calls = []
+
+    @cached(ttl_seconds=60)
+    def lookup(name, limit=None):
+        calls.append((name, limit))
+        return None
+
+    assert lookup('acme') is None and lookup('acme') is None
+    assert lookup('acme', limit=5) is None and lookup('acme', limit=5) is None
+    # Unhashable arguments are passed through rather than stringified into a key
+    assert lookup(['acme']) is None and lookup(['acme']) is None
+    assert calls == [('acme', None), ('acme', 5), (['acme'], None), (['acme'], None)]
+
+def test_version_change_clears_and_drops_stale_results():
+    version = [1]
+    cache = Cache(version=lambda: version[0])
+    seen = cache.check_version()
+    cache.set('page', 'old', version=seen)
+    version[0] = 2
+    # Computed before the change: not stored once the cache has moved on
+    assert cache.check_version() == 2 and cache.get('page') is None
+    cache.set('page', 'stale', version=seen)
+    assert cache.get('page') is None
+    assert cache.stats()['invalidations'] == 1
+
+def test_concurrent_use_keeps_bounds():
+    cache = Cache(max_entries=64, stripes=8)
+    def work(offset):
+        for i in range(2000):
+            key = (offset + i) % 200
+            if cache.get(key) is None:
+                cache.set(key, str(key))
+    threads = [threading.Thread(target=work, args=(n * 50,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats['entries'] <= 64 and stats['hits'] + stats['misses'] == 16000
+    assert stats['bytes'] == sum(approximate_size(str(key)) for stripe in cache._stripes for key in stripe.entries)
+
+def _bump(path, count):
+    store = SQLiteCacheStore(path)
+    for _ in range(count):
+        bump_data_version(store)
+
+def test_sqlite_store_is_bounded_and_shared_across_processes(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    store = SQLiteCacheStore(path, max_bytes=10_000)
+    for i in range(30):
+        store.set(f'page:{i}', bytes(1000), ttl_seconds=60 + i)
+    stats = store.stats()
+    # The entries closest to expiry went first
+    assert stats['bytes'] <= 10_000 and stats['entries'] == 10 and store.get('page:29') is not None
+    assert store.get('page:0') is None
+    store.set('short', b'x', ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert store.get('short') is None
+
+    workers = [Process(target=_bump, args=(path, 5)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert SQLiteCacheStore(path).counter(DATA_VERSION) == 15
+
+@pytest.mark.parametrize('backend', ['sqlite', 'redis'])
+def test_workers_share_results_until_the_version_moves(tmp_path, backend):
+    if backend == 'redis':
+        client = LocalRedis()
+        store = RedisCacheStore(client)
+    else:
+        store = SQLiteCacheStore(str(tmp_path / 'cache.db'))
+    first, second = SharedCache(store, namespace='sqlite:///jobs.db'), SharedCache(store, namespace='sqlite:///jobs.db')
+    other = SharedCache(store, namespace='sqlite:///other.db')
+
+    version = first.check_version()
+    first.set((version, 'page', 1), {'jobs': [1, 2, 3]}, version=version)
+    first.set((version, 'total'), None)
+    assert second.get((second.check_version(), 'page', 1)) == {'jobs': [1, 2, 3]}
+    assert second.get((version, 'total'), 'miss') is None
+    assert other.get((version, 'page', 1)) is None
+
+    assert bump_data_version(store) == version + 1
+    assert second.get((second.check_version(), 'page', 1)) is None
+    assert second.stats()['hits'] == 2 and second.stats()['store'][DATA_VERSION] == version + 1
+    # Application changes move their own counter; both stamp the time, and clearing keeps them
+    assert bump_data_version(store, APPLICATIONS_VERSION) == 1
+    store.clear()
+    state = data_state(store)
+    assert (state[DATA_VERSION], state[APPLICATIONS_VERSION]) == (version + 1, 1)
+    assert abs(state[DATA_MODIFIED] - time.time()) < 5
+
+    if backend == 'redis':
+        # An unreachable server degrades to misses instead of failing the request
+        client.down = True
+        assert first.check_version() is None and first.get((None, 'page', 1), 'miss') == 'miss'
+        first.set((None, 'page', 1), 'value')
+        assert first.stats()['errors'] == 3
+
+def test_routes_are_cached_until_ingest(engine, session, make_job, count_queries, tmp_path):
+    from app.web import create_app
+    from app.database.database_init import db
+    from config.config import Config
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = str(engine.url)
+        WEB_CACHE_PATH = str(tmp_path / 'web_cache.db')
+
+    JobRepository(session).upsert_many([make_job(i) for i in range(12)])
+
+    app = create_app(TestConfig)
+    client = app.test_client()
+
+    with app.app_context():
+        from app.web.routes import site_overview
+        first = client.get('/api/jobs?company=company 1&description=1').get_json()
+        assert first['total'] == 3 and len(first['jobs']) == 3
+        overview = site_overview()
+        assert overview['total_jobs'] == 12
+
+        # A second worker on the same store answers from the first one's results
+        worker = create_app(TestConfig).test_client()
+        with count_queries(db.engine) as statements:
+            assert worker.get('/api/jobs?company=company 1&description=1').get_json() == first
+            assert site_overview() == overview
+        # Only the application statuses were read again
+        assert len(statements) == 1 and 'job_applications' in statements[0]
+
+        # The scheduler's ingest queue, in another process, bumps the data version after writing
+        ingest = IngestQueue(sessionmaker(bind=engine), flush_interval=0.01,
+                             version_store=SQLiteCacheStore(TestConfig.WEB_CACHE_PATH))
+        ingest.start()
+        ingest.put(make_job(100, company='Company 1'))
+        ingest.stop()
+        assert client.get('/api/jobs?company=company 1').get_json()['total'] == 4
+        assert site_overview()['total_jobs'] == 13
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_cached_listing_pages_hold_no_orm_state(engine, session, make_job, tmp_path, backend):
+    from app.web import create_app
+    from app.web.routes import query_listing_page, query_listing_rows
+    from config.config import Config
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = str(engine.url)
+        WEB_CACHE_BACKEND = backend
+        WEB_CACHE_PATH = str(tmp_path / 'web_cache.db')
+
+    JobRepository(session).upsert_many([make_job(i) for i in range(12)])
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        args = ('', '', 'company 1', 'posted_date', None, 5, False)
+        rows, _, _ = query_listing_rows(*args)
+        assert all(type(value) in (int, str, float, bool, datetime, type(None))
+                   for row in rows for value in row.values())
+        first, second = query_listing_page(*args), query_listing_page(*args)
+        assert [job.id for job in first.items] == [job.id for job in second.items]
+        # Each request gets its own jobs; deferred and relationship attributes don't load or raise
+        assert first.items[0] is not second.items[0]
+        assert second.items[0].description is None and second.items[0].applications == []